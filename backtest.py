@@ -0,0 +1,323 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                   BACKTEST SOBRE TODAS LAS FECHAS DE LAS CURVAS
+#
+#             'Bonoscurvas.xlsx' guarda una pestaña por fecha y por curva
+#          ('{fecha} CER', 'Pesos', 'DL' y 'USD'). Aquí se obtienen las
+#          fechas disponibles del catálogo de pestañas del libro (sin leer
+#          ninguna pestaña), y se corre 'analisis_rt' para cada fecha, con
+#          esa fecha como fecha de cálculo ('as_of'). Las fechas se recorren
+#          de a una: mientras se calcula una fecha, se leen las curvas de la
+#          siguiente; los cálculos se reparten en un pool de procesos con
+#          pocas fechas pendientes a la vez, y cada resultado se escribe
+#          apenas está listo. Así la memoria no crece con la cantidad de
+#                                 fechas.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+TIPOS_CURVA=['CER','Pesos','DL','USD']
+
+# Datos comunes del backtest en cada proceso del pool.
+_contexto_bt=None
+
+
+def fechas_disponibles(directorio='.',nombre_archivo_curvas='Bonoscurvas'):
+    """
+    Devuelve, ordenadas de la más antigua a la más reciente, las fechas que
+    tienen las cuatro pestañas de curvas en el libro. Sólo se lee el catálogo
+    de pestañas ('xl/workbook.xml'), sin abrir ninguna de ellas.
+
+    PARAMETROS
+    ----------
+    directorio: String, opcional.
+    Descripción: Es la carpeta donde se encuentra el libro. Por defecto es la
+    carpeta actual.
+
+    nombre_archivo_curvas: String, opcional.
+    Descripción: Es el nombre del libro de curvas. Por defecto es 'Bonoscurvas'.
+
+    RESULTADO
+    -------
+    fechas: lista de Strings.
+    Descripción: Son las fechas con el formato de las pestañas, por ejemplo,
+    '17-01-23'.
+
+    """
+    import zipfile
+    import xml.etree.ElementTree as ET
+    from datetime import datetime
+
+    with zipfile.ZipFile(f'{directorio}/{nombre_archivo_curvas}.xlsx') as libro:
+        catalogo=ET.fromstring(libro.read('xl/workbook.xml'))
+    nombres=[hoja.get('name') for hoja in catalogo.iter()
+             if hoja.tag.endswith('}sheet')]
+
+    pestañas={}
+    for nombre in nombres:
+        fecha,_,tipo=nombre.rpartition(' ')
+        if tipo in TIPOS_CURVA:
+            pestañas.setdefault(fecha,set()).add(tipo)
+
+    fechas=[]
+    for fecha,tipos in pestañas.items():
+        try:
+            dia=datetime.strptime(fecha,'%d-%m-%y')
+        except ValueError:
+            continue
+        if tipos==set(TIPOS_CURVA):
+            fechas.append((dia,fecha))
+
+    return [fecha for _,fecha in sorted(fechas)]
+
+
+def _leer_curvas(ruta,fecha1):
+    from cache import leer_excel
+
+    hojas=leer_excel(ruta,sheet_name=[f'{fecha1} {tipo}' for tipo in TIPOS_CURVA])
+    return {tipo:hojas[f'{fecha1} {tipo}'] for tipo in TIPOS_CURVA}
+
+
+def _precios_fecha(bonos,curvas):
+    """
+    Devuelve una copia de las características de los bonos con el precio de
+    las curvas de la fecha en los tickets que figuran en ellas.
+
+    """
+    import pandas as pd
+
+    precios=pd.concat([curva.set_index('ticket').precio for curva in curvas.values()
+                       if 'precio' in curva])
+    precios=precios[~precios.index.duplicated(keep='last')]
+    bonos=bonos.copy()
+    comunes=bonos.index.intersection(precios.index)
+    bonos.loc[comunes,'precio']=precios.loc[comunes].values
+
+    return bonos
+
+
+def _datos_fijos(directorio,nombre_archivo,nombre_archivo_cer,nombre_archivo_tc,
+                 nombre_archivo_rem):
+    """
+    Lee una sola vez los datos que no dependen de la fecha: las características
+    de los bonos, las series CER y tcA3500, y el REM.
+
+    """
+    from cache import leer_excel
+
+    bonos=leer_excel(f'{directorio}/{nombre_archivo}.xlsx').set_index('Ticket')
+    serie_cer=leer_excel(f'{directorio}/{nombre_archivo_cer}.xlsx').set_index('Fecha')
+    serie_tca3500=leer_excel(f'{directorio}/{nombre_archivo_tc}.xlsx').set_index('Fecha')
+    rem=None
+    if nombre_archivo_rem is not None:
+        rem=leer_excel(f'{directorio}/{nombre_archivo_rem}.xlsx',
+                       sheet_name='Resultados TOP 10',header=31,usecols='B:D',nrows=8)
+
+    return bonos,serie_cer,serie_tca3500,rem
+
+
+def _iniciar_bt(contexto):
+    global _contexto_bt
+    _contexto_bt=contexto
+
+
+def _fecha_bt_pool(fecha1,curvas):
+    return _fecha_bt(fecha1,curvas,**_contexto_bt)
+
+
+def _fecha_bt(fecha1,curvas,bonos,serie_cer,serie_tca3500,rem,int_tabla,
+              plazo_meses,meses_tabla,parametros_dev,monto_invertido):
+    """
+    Corre 'analisis_rt' para una fecha, con los precios de las curvas de esa
+    fecha, y devuelve la tabla con la fecha y el horizonte como columnas.
+
+    """
+    import pandas as pd
+    from datetime import datetime
+    from mercado import MarketSnapshot
+    from curvas import limpiar_curvas
+    from indices import limpiar_proyecciones
+    from funciones import tabla_infla, tabla_dev, tasabadlar, analisis_rt
+
+    as_of=datetime.strptime(fecha1,'%d-%m-%y')
+    f_horizonte=(pd.Timestamp(as_of)+pd.DateOffset(months=plazo_meses)).strftime('%Y-%m-%d')
+
+    # Los precios de los bonos que figuran en las curvas son los de la fecha.
+    bonos=_precios_fecha(bonos,curvas)
+    mercado=MarketSnapshot(bonos,curvas,fecha=fecha1,serie_cer=serie_cer,
+                           serie_tca3500=serie_tca3500,rem=rem)
+    i_cer_hoy=float(serie_cer.loc[:as_of].iloc[-1,0])
+    tcn_hoy=float(serie_tca3500.loc[:as_of].iloc[-1,0])
+    if int_tabla is None:
+        int_tabla=tasabadlar(mercado=mercado)
+
+    parametros=dict(f_limite=f_horizonte,tcn_rofex=None,ticket_usd=None,
+                    ticket_cer=None,ticket_dl=None,ticket_pesos=None,
+                    meses_adelante=meses_tabla)
+    parametros.update(parametros_dev)
+
+    try:
+        infla=tabla_infla(fecha1,cant_meses=meses_tabla,mercado=mercado,as_of=as_of)
+        deva=tabla_dev(fecha1=fecha1,tcn_hoy=tcn_hoy,mercado=mercado,as_of=as_of,
+                       **parametros)
+        tabla=analisis_rt(infla,deva,int_tabla,f_horizonte,i_cer_hoy,tcn_hoy,fecha1,
+                          monto_invertido=monto_invertido,mercado=mercado,as_of=as_of)
+    finally:
+        # Las curvas ajustadas y las proyecciones de cada fecha no se vuelven a
+        # usar; se borran para que la memoria no crezca con las fechas.
+        limpiar_curvas()
+        limpiar_proyecciones()
+
+    tabla.index.name='Ticket'
+    tabla=tabla.astype(float).reset_index()
+    tabla.insert(0,'fecha',as_of.strftime('%Y-%m-%d'))
+    tabla.insert(1,'f_horizonte',f_horizonte)
+
+    return tabla
+
+
+def backtest_rt(parametros_dev,archivo=None,fechas=None,plazo_meses=6,meses_tabla=None,
+                int_tabla=None,monto_invertido=50_000,n_jobs=1,directorio='.',
+                nombre_archivo='Bonoscaracteristicas',
+                nombre_archivo_curvas='Bonoscurvas',nombre_archivo_cer='Serie CER',
+                nombre_archivo_tc='A3500',nombre_archivo_rem='REM'):
+    """
+    Corre 'analisis_rt' para cada fecha con curvas en 'Bonoscurvas.xlsx', como
+    si se hubiese calculado ese día: la fecha de cálculo ('as_of') es la de la
+    pestaña, los precios de los bonos son los de las curvas de esa fecha, y el
+    índice CER y el tcA3500 son los de ese día en sus series.
+
+    PARAMETROS
+    ----------
+    parametros_dev: Diccionario, obligatorio.
+    Descripción: Son los argumentos de 'tabla_dev' que definen la dep/dev
+    esperada, por ejemplo: {'tipo': 'usd-cer', 'ticket_usd': 'AL30',
+    'ticket_cer': 'TX26'}. 'f_limite' es por defecto la fecha horizonte.
+
+    archivo: String, opcional.
+    Descripción: Es el archivo CSV donde se agregan los resultados de cada
+    fecha apenas están listos. Si no se indica, se devuelve un único DataFrame
+    con todas las fechas.
+
+    fechas: lista de Strings, opcional.
+    Descripción: Son las fechas de las pestañas a evaluar. Por defecto, todas
+    las disponibles (ver 'fechas_disponibles').
+
+    plazo_meses: Integer, opcional.
+    Descripción: Es la cantidad de meses entre cada fecha y su fecha horizonte.
+    Por defecto es 6.
+
+    meses_tabla: Integer, opcional.
+    Descripción: Es la cantidad de meses de las tablas de inflación y de
+    dep/dev. Por defecto es plazo_meses+2.
+
+    int_tabla: DataFrame, opcional.
+    Descripción: Es la tabla de tasas badlar esperadas. Si no se indica, se
+    obtiene con 'tasabadlar' a partir del REM, por lo que 'nombre_archivo_rem'
+    no puede ser None.
+
+    monto_invertido: Integer o Float, opcional.
+    Descripción: Es el mismo argumento de 'analisis_rt'.
+
+    n_jobs: Integer, opcional.
+    Descripción: Es la cantidad de fechas que se calculan en paralelo. Por
+    defecto es 1. Si es -1 o None, se usan todos los procesadores.
+
+    directorio, nombre_archivo, nombre_archivo_curvas, nombre_archivo_cer,
+    nombre_archivo_tc, nombre_archivo_rem: Strings, opcional.
+    Descripción: Son la carpeta y los nombres de los libros de excel, igual que
+    en 'MarketSnapshot.cargar'. El REM sólo se lee si no se indica 'int_tabla'.
+
+    RESULTADO
+    -------
+    resultado: DataFrame o String.
+    Descripción: Es la tabla de 'analisis_rt' de cada fecha, una debajo de la
+    otra, con las columnas 'fecha' y 'f_horizonte' al principio. Si se indicó
+    'archivo', se devuelve su ruta.
+
+    """
+    import os
+    import warnings
+    import pandas as pd
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    from funciones import tasabadlar
+    from mercado import MarketSnapshot
+
+    if int_tabla is None and nombre_archivo_rem is None:
+        raise ValueError("Sin 'int_tabla' se necesita el REM: falta 'nombre_archivo_rem'.")
+    if int_tabla is not None:
+        nombre_archivo_rem=None
+    if fechas is None:
+        fechas=fechas_disponibles(directorio,nombre_archivo_curvas)
+    if meses_tabla is None:
+        meses_tabla=plazo_meses+2
+    if n_jobs is None or n_jobs<0:
+        n_jobs=os.cpu_count()
+
+    # Los datos que no dependen de la fecha se leen una sola vez.
+    bonos,serie_cer,serie_tca3500,rem=_datos_fijos(directorio,nombre_archivo,
+                                                   nombre_archivo_cer,nombre_archivo_tc,
+                                                   nombre_archivo_rem)
+    if int_tabla is None:
+        int_tabla=tasabadlar(mercado=MarketSnapshot(bonos,{},rem=rem))
+    contexto=dict(bonos=bonos,serie_cer=serie_cer,serie_tca3500=serie_tca3500,rem=rem,
+                  int_tabla=int_tabla,plazo_meses=plazo_meses,meses_tabla=meses_tabla,
+                  parametros_dev=parametros_dev,monto_invertido=monto_invertido)
+
+    if archivo is not None and os.path.exists(archivo):
+        os.remove(archivo)
+    tablas=[]
+
+    def escribir(fecha1,resultado):
+        try:
+            tabla=resultado.result() if hasattr(resultado,'result') else resultado
+        except Exception as error:
+            warnings.warn(f'No se pudo calcular la fecha {fecha1}: {error}')
+            return
+        if archivo is None:
+            tablas.append(tabla)
+        else:
+            tabla.to_csv(archivo,mode='a',index=False,header=not os.path.exists(archivo))
+
+    ruta_curvas=f'{directorio}/{nombre_archivo_curvas}.xlsx'
+    with ThreadPoolExecutor(max_workers=1) as lector:
+        # Las curvas de la fecha siguiente se leen mientras se calcula la actual.
+        siguientes=deque(lector.submit(_leer_curvas,ruta_curvas,fecha1)
+                         for fecha1 in fechas[:1])
+        pendientes=fechas[1:]
+
+        def proximas_curvas():
+            futuro=siguientes.popleft()
+            if pendientes:
+                siguientes.append(lector.submit(_leer_curvas,ruta_curvas,pendientes.pop(0)))
+            return futuro.result()
+
+        if n_jobs==1:
+            for fecha1 in fechas:
+                curvas=proximas_curvas()
+                try:
+                    tabla=_fecha_bt(fecha1,curvas,**contexto)
+                except Exception as error:
+                    warnings.warn(f'No se pudo calcular la fecha {fecha1}: {error}')
+                    continue
+                escribir(fecha1,tabla)
+        else:
+            # Como máximo hay 2*n_jobs fechas en curso; los resultados se
+            # escriben en el orden de las fechas.
+            with ProcessPoolExecutor(max_workers=n_jobs,initializer=_iniciar_bt,
+                                     initargs=(contexto,)) as pool:
+                en_curso=deque()
+                for fecha1 in fechas:
+                    en_curso.append((fecha1,pool.submit(_fecha_bt_pool,fecha1,
+                                                        proximas_curvas())))
+                    if len(en_curso)>=2*n_jobs:
+                        escribir(*en_curso.popleft())
+                while en_curso:
+                    escribir(*en_curso.popleft())
+
+    if archivo is not None:
+        return archivo
+    if not tablas:
+        return pd.DataFrame()
+    return pd.concat(tablas,ignore_index=True)
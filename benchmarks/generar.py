@@ -0,0 +1,49 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                    GENERADOR DE ARCHIVOS DE MERCADO SINTETICOS
+#
+#             Escribe con 'escribir_mercado' (ver 'sinteticos.py') los
+#          libros de excel y las tablas Parquet de un mercado sintético, con
+#          la cantidad de bonos y de fechas que se indique. Con la misma
+#             semilla se obtienen siempre los mismos datos.
+#
+#          Uso:
+#            python benchmarks/generar.py datos --tickets 1000 --fechas 500
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+import os
+import sys
+
+RAIZ=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,RAIZ)
+
+
+def main(argumentos=None):
+    import argparse
+    import time
+    from sinteticos import escribir_mercado
+
+    parser=argparse.ArgumentParser(description='Genera archivos de mercado sintéticos.')
+    parser.add_argument('directorio')
+    parser.add_argument('--tickets',type=int,default=60)
+    parser.add_argument('--fechas',type=int,default=20)
+    parser.add_argument('--fecha',default='16-10-26')
+    parser.add_argument('--años',type=float,default=10)
+    parser.add_argument('--semilla',type=int,default=0)
+    parser.add_argument('--formatos',nargs='+',default=['xlsx','parquet'],
+                        choices=['xlsx','parquet'])
+    args=parser.parse_args(argumentos)
+
+    inicio=time.perf_counter()
+    escribir_mercado(args.directorio,args.tickets,args.fecha,args.fechas,args.años,
+                     args.semilla,args.formatos)
+    print(f'{args.tickets} tickets y {args.fechas} fechas escritos en {args.directorio} '
+          f'en {time.perf_counter()-inicio:.1f} s.')
+
+    return 0
+
+
+if __name__=='__main__':
+    sys.exit(main())
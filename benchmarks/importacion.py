@@ -0,0 +1,134 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                    PRESUPUESTO DE TIEMPO DE IMPORTACION
+#
+#             Verifica que importar los módulos de la librería sea barato:
+#          el cálculo de precios y rendimientos ('ffbonocap' hasta
+#          'analisis_rt') sólo necesita NumPy y pandas, que se importan
+#          dentro de cada función, y matplotlib y statsmodels sólo se
+#          importan al graficar ('grafica_bonos') o al pedir el diagnóstico
+#          de una regresión ('diagnostico_curva'). Se comprueba de dos
+#          maneras: midiendo 'python -X importtime' en un proceso nuevo, y
+#          revisando los 'import' de cada función del código fuente.
+#
+#          Uso: python benchmarks/importacion.py [--presupuesto-ms 150]
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+import os
+import sys
+
+RAIZ=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS=['funciones','mercado','cache','curvas','flujos','indices','tablas',
+         'calendario','escenarios','montecarlo','reprecio','backtest','estrategia',
+         'sinteticos','perfil','grafo']
+
+# Paquetes que no pueden importarse al importar la librería ni en el cálculo.
+PESADOS=['matplotlib','statsmodels','patsy','scipy']
+
+# Paquetes de terceros permitidos en el cálculo de precios y rendimientos.
+PERMITIDOS=['numpy','pandas']
+
+# Funciones que pueden importar paquetes pesados, por módulo.
+EXCEPCIONES={'funciones':['grafica_bonos'],'curvas':['diagnostico_curva']}
+
+PRESUPUESTO_MS=150
+
+
+def medir_importacion():
+    """
+    Importa todos los módulos de la librería en un proceso nuevo con
+    'python -X importtime'. Devuelve el tiempo acumulado de cada paquete de
+    primer nivel (en microsegundos) y el conjunto de todos los módulos
+    importados.
+
+    """
+    import subprocess
+
+    codigo=f'import sys; sys.path.insert(0,{RAIZ!r}); import '+', '.join(MODULOS)
+    salida=subprocess.run([sys.executable,'-X','importtime','-c',codigo],
+                          capture_output=True,text=True,check=True).stderr
+
+    tiempos={}
+    importados=set()
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _,acumulado,nombre=linea[len('import time:'):].split('|')
+        importados.add(nombre.strip())
+        # Sólo los paquetes de primer nivel (sin sangría).
+        if nombre.startswith(' ') and not nombre.startswith('  '):
+            tiempos[nombre.strip()]=int(acumulado)
+
+    return tiempos,importados
+
+
+def revisar_fuentes():
+    """
+    Devuelve la lista de 'import' de paquetes de terceros que no son NumPy ni
+    pandas, en las funciones de la librería que no son excepciones.
+
+    """
+    import ast
+
+    locales=set(MODULOS)
+    problemas=[]
+    for modulo in MODULOS:
+        with open(os.path.join(RAIZ,f'{modulo}.py'),encoding='utf-8') as archivo:
+            arbol=ast.parse(archivo.read())
+
+        for nodo in arbol.body:
+            nombre=getattr(nodo,'name',None)
+            if nombre in EXCEPCIONES.get(modulo,[]):
+                continue
+            for imp in ast.walk(nodo):
+                if isinstance(imp,ast.Import):
+                    paquetes=[alias.name.split('.')[0] for alias in imp.names]
+                elif isinstance(imp,ast.ImportFrom) and imp.level==0:
+                    paquetes=[imp.module.split('.')[0]]
+                else:
+                    continue
+                for paquete in paquetes:
+                    if paquete in locales or paquete in PERMITIDOS or \
+                            paquete in sys.stdlib_module_names:
+                        continue
+                    problemas.append(f'{modulo}.{nombre or "<módulo>"}: {paquete}')
+
+    return problemas
+
+
+def main(argumentos=None):
+    import argparse
+
+    parser=argparse.ArgumentParser(
+        description='Presupuesto de tiempo de importación de la librería.')
+    parser.add_argument('--presupuesto-ms',type=float,default=PRESUPUESTO_MS)
+    args=parser.parse_args(argumentos)
+
+    tiempos,importados=medir_importacion()
+    propios=sum(tiempos.get(m,0) for m in MODULOS)/1000
+    pesados=sorted({p.split('.')[0] for p in importados} & set(PESADOS))
+    problemas=revisar_fuentes()
+
+    for modulo in MODULOS:
+        print(f'{modulo:>12}: {tiempos.get(modulo,0)/1000:8.1f} ms')
+    print(f'{"total":>12}: {propios:8.1f} ms (presupuesto {args.presupuesto_ms:.0f} ms)')
+
+    errores=[]
+    if propios>args.presupuesto_ms:
+        errores.append(f'La importación tarda {propios:.1f} ms, más que el presupuesto.')
+    if pesados:
+        errores.append(f'Se importan paquetes pesados: {pesados}.')
+    for problema in problemas:
+        errores.append(f'Import no permitido en el cálculo: {problema}.')
+
+    for error in errores:
+        print(error)
+
+    return 1 if errores else 0
+
+
+if __name__=='__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                 MEMORIA DE CADA ETAPA SEGUN EL PLAZO DEL HORIZONTE
+#
+#             Ejecuta 'tasabadlar', 'tabla_infla', 'tabla_dev' y
+#          'analisis_rt' sobre un mercado sintético (ver 'sinteticos.py')
+#          con fechas horizonte a distintos plazos, mide con tracemalloc la
+#          memoria máxima y la retenida de cada etapa (ver 'perfil.py'), y
+#          marca las etapas cuya memoria crece más que linealmente con el
+#          plazo. Termina con error si hay alguna, para poder usarlo en CI.
+#
+#          Uso:
+#            python benchmarks/memoria.py [--tickets 100] [--años 1 2 5 10]
+#            python benchmarks/memoria.py --detalle 5 --salida memoria.json
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+import os
+import sys
+
+RAIZ=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,RAIZ)
+
+FECHA1='16-10-26'
+AS_OF='2026-10-16'
+AÑOS=[1,2,5,10]
+AÑOS_UNIVERSO=12
+
+
+def pipeline(mercado,años):
+    """
+    Devuelve una función sin argumentos que calcula la tabla de 'analisis_rt'
+    con la fecha horizonte a 'años' años, incluidas las tablas de inflación,
+    dep/dev y tasa BADLAR que necesita.
+
+    """
+    import pandas as pd
+    import funciones as f
+    from curvas import limpiar_curvas
+    from indices import limpiar_proyecciones
+    from calendario import limpiar_calendario
+
+    f_horizonte=(pd.Timestamp(AS_OF)+pd.DateOffset(years=años)).strftime('%Y-%m-%d')
+    meses=12*años+4
+    cer=float(mercado.serie_cer.iloc[-1,0])
+    tc=float(mercado.serie_tca3500.iloc[-1,0])
+
+    def correr():
+        limpiar_curvas()
+        limpiar_proyecciones()
+        limpiar_calendario()
+        infla=f.tabla_infla(FECHA1,cant_meses=meses,mercado=mercado,as_of=AS_OF)
+        deva=f.tabla_dev(f_horizonte,FECHA1,'rofex',tc,tc*1.3,None,None,None,None,
+                         meses_adelante=meses,mercado=mercado,as_of=AS_OF)
+        badlar=f.tasabadlar(mercado=mercado)
+        return f.analisis_rt(infla,deva,badlar,f_horizonte,cer,tc,FECHA1,mercado=mercado,
+                             n_jobs=1,as_of=AS_OF)
+
+    return correr
+
+
+def main(argumentos=None):
+    import argparse
+    import json
+    import cache
+    from perfil import Perfil, escalamiento_memoria
+    from sinteticos import mercado_sintetico
+
+    parser=argparse.ArgumentParser(
+        description='Memoria de cada etapa de analisis_rt según el plazo del horizonte.')
+    parser.add_argument('--tickets',type=int,default=100)
+    parser.add_argument('--años',type=int,nargs='+',default=AÑOS)
+    parser.add_argument('--umbral',type=float,default=1.2)
+    parser.add_argument('--semilla',type=int,default=0)
+    parser.add_argument('--detalle',type=int,
+                        help='Plazo (en años) para el que se muestra la memoria por ticket.')
+    parser.add_argument('--salida')
+    args=parser.parse_args(argumentos)
+
+    # Se mide el cálculo, no la lectura de resultados guardados.
+    cache.MEMO_ACTIVA=False
+    mercado=mercado_sintetico(args.tickets,FECHA1,AÑOS_UNIVERSO,args.semilla)
+
+    escalamiento=escalamiento_memoria(lambda años: pipeline(mercado,años)(),args.años,
+                                      args.umbral)
+    print((escalamiento.drop(columns=['exponente','superlineal'])/1024**2).round(3)
+          .join(escalamiento[['exponente','superlineal']].round(2)).to_string())
+
+    salida={'tickets':args.tickets,'años':args.años,'umbral':args.umbral,
+            'escalamiento':json.loads(escalamiento.to_json(orient='index'))}
+    if args.detalle is not None:
+        with Perfil(memoria=True) as perfil:
+            pipeline(mercado,args.detalle)()
+        por_ticket=perfil.resumen(por_ticket=True)
+        print(por_ticket[['llamadas','pico_bytes','retenido_bytes']].head(30).to_string())
+        salida['por_ticket']=json.loads(por_ticket.reset_index().to_json(orient='records'))
+
+    if args.salida is not None:
+        with open(args.salida,'w',encoding='utf-8') as archivo:
+            json.dump(salida,archivo,indent=1,ensure_ascii=False)
+
+    superlineales=list(escalamiento.index[escalamiento.superlineal])
+    if superlineales:
+        print(f'Etapas con memoria más que lineal en el plazo: {superlineales}.')
+
+    return 1 if superlineales else 0
+
+
+if __name__=='__main__':
+    sys.exit(main())
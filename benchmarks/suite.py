@@ -0,0 +1,301 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                   BENCHMARKS DE LAS FUNCIONES DE LA LIBRERIA
+#
+#             Mide el tiempo y la memoria máxima de cada función pública
+#          de 'funciones.py' sobre mercados sintéticos (ver 'sinteticos.py')
+#          de distintos tamaños: cantidad de tickets y plazo de la fecha
+#          horizonte, en años. No lee ningún archivo ni necesita conexión.
+#          Los resultados se guardan en un JSON, y dos JSON (por ejemplo, de
+#          dos revisiones del repositorio) se pueden comparar. 'grafica_bonos'
+#                  no se mide: sólo grafica y no es parte del cálculo.
+#
+#          Uso:
+#            python benchmarks/suite.py correr --salida actual.json
+#            python benchmarks/suite.py correr --revision HEAD~3 --salida base.json
+#            python benchmarks/suite.py comparar base.json actual.json
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+import os
+import sys
+
+RAIZ=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,RAIZ)
+
+TICKETS=[10,100,1000]
+AÑOS=[1,5,10]
+
+FECHA1='16-10-26'
+AS_OF='2026-10-16'
+
+# Plazo máximo de los vencimientos del universo sintético, en años. Es mayor
+# que el horizonte más largo, para que haya bonos que se revenden.
+AÑOS_UNIVERSO=12
+
+# Módulos de la librería que se vuelven a importar al medir otra revisión.
+MODULOS=['funciones','mercado','cache','curvas','flujos','indices','tablas',
+         'calendario','escenarios','montecarlo','reprecio','backtest','estrategia','sinteticos',
+         'perfil','grafo']
+
+
+def limpiar_memorias():
+    """
+    Borra las curvas, proyecciones y calendarios recordados, y desactiva la
+    memoria de resultados en disco, para que cada medición parta de cero (si
+    la revisión medida los tiene).
+
+    """
+    for modulo,funcion in [('curvas','limpiar_curvas'),('indices','limpiar_proyecciones'),
+                           ('calendario','limpiar_calendario')]:
+        limpiar=getattr(sys.modules.get(modulo),funcion,None)
+        if limpiar is not None:
+            limpiar()
+    cache=sys.modules.get('cache')
+    if hasattr(cache,'MEMO_ACTIVA'):
+        cache.MEMO_ACTIVA=False
+
+
+def preparar(f,mercado,años):
+    """
+    Arma los argumentos de cada función para un horizonte de 'años' años y
+    devuelve un diccionario con el nombre de cada función y una función sin
+    argumentos que la ejecuta.
+
+    """
+    import pandas as pd
+
+    f_horizonte=(pd.Timestamp(AS_OF)+pd.DateOffset(years=años)).strftime('%Y-%m-%d')
+    meses=12*años+4
+    bonos=mercado.bonos
+    cer=float(mercado.serie_cer.iloc[-1,0])
+    tc=float(mercado.serie_tca3500.iloc[-1,0])
+    tickets=[t for t in bonos.index if bonos.tipo_bono1.loc[t] in ['bullet','letra']]
+
+    dev=dict(f_limite=f_horizonte,fecha1=FECHA1,tipo='rofex',tcn_hoy=tc,tcn_rofex=tc*1.3,
+             ticket_usd=None,ticket_cer=None,ticket_dl=None,ticket_pesos=None,
+             meses_adelante=meses,mercado=mercado,as_of=AS_OF)
+    infla=f.tabla_infla(FECHA1,cant_meses=meses,mercado=mercado,as_of=AS_OF)
+    deva=f.tabla_dev(**dev)
+    badlar=f.tasabadlar(mercado=mercado)
+    antes={t:f.ffbonocap(**mercado.condiciones(t),f_horizonte=f_horizonte,as_of=AS_OF)
+           for t in tickets}
+    despues={t:f.ffbonodesc(**mercado.condiciones(t),f_horizonte=f_horizonte,as_of=AS_OF)
+             for t in tickets}
+    horizontes=[h.strftime('%Y-%m-%d') for h in
+                pd.date_range(pd.Timestamp(AS_OF)+pd.DateOffset(months=3),f_horizonte,
+                              freq='3MS')]
+
+    return {
+        'tasabadlar':lambda: f.tasabadlar(mercado=mercado),
+        'ffbonocap':lambda: [f.ffbonocap(**mercado.condiciones(t),f_horizonte=f_horizonte,
+                                         as_of=AS_OF) for t in tickets],
+        'ffbonodesc':lambda: [f.ffbonodesc(**mercado.condiciones(t),f_horizonte=f_horizonte,
+                                           as_of=AS_OF) for t in tickets],
+        'capflujos':lambda: [f.capflujos(badlar,f_horizonte,antes[t]) for t in tickets],
+        'tabla_infla':lambda: f.tabla_infla(FECHA1,cant_meses=meses,mercado=mercado,
+                                            as_of=AS_OF),
+        'tabla_dev':lambda: f.tabla_dev(**dev),
+        'tabla_infla_esc':lambda: f.tabla_infla_esc(0.02,0.001,FECHA1,f_horizonte,
+                                                    mercado=mercado,as_of=AS_OF),
+        'tabla_dev_esc':lambda: f.tabla_dev_esc(0.015,0.001,f_horizonte,**dev),
+        'flujobono_act':lambda: [f.flujobono_act(infla,deva,t,f_horizonte,cer,tc,
+                                                 mercado=mercado,flujo_base=antes[t],
+                                                 as_of=AS_OF) for t in tickets],
+        'p_reventa':lambda: [f.p_reventa(despues[t],infla,deva,FECHA1,f_horizonte,
+                                         bonos.tipo_bono2.loc[t],cer,tc,t,mercado=mercado,
+                                         as_of=AS_OF) for t in tickets],
+        'p_reventa_lote':lambda: f.p_reventa_lote(despues,infla,deva,FECHA1,f_horizonte,
+                                                  cer,tc,mercado=mercado,as_of=AS_OF),
+        'analisis_rt':lambda: f.analisis_rt(infla,deva,badlar,f_horizonte,cer,tc,FECHA1,
+                                            mercado=mercado,as_of=AS_OF),
+        'analisis_rt_horizons':lambda: f.analisis_rt_horizons(infla,deva,badlar,horizontes,
+                                                              cer,tc,FECHA1,mercado=mercado,
+                                                              as_of=AS_OF),
+    }
+
+
+def medir(funcion,repeticiones=3,memoria=True):
+    """
+    Devuelve el menor tiempo (en segundos) de 'repeticiones' ejecuciones de la
+    función y, si 'memoria' es True, la memoria máxima reservada en una
+    ejecución adicional (en MB, con tracemalloc).
+
+    """
+    import time
+    import tracemalloc
+
+    tiempos=[]
+    for _ in range(repeticiones):
+        limpiar_memorias()
+        inicio=time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter()-inicio)
+
+    pico=None
+    if memoria:
+        limpiar_memorias()
+        tracemalloc.start()
+        try:
+            funcion()
+            pico=tracemalloc.get_traced_memory()[1]/1024**2
+        finally:
+            tracemalloc.stop()
+
+    return min(tiempos),pico
+
+
+def importar_libreria(raiz):
+    """
+    Importa 'funciones.py' de la carpeta 'raiz', descartando los módulos de la
+    librería ya importados. La carpeta queda primera en sys.path, porque las
+    funciones importan los demás módulos al ejecutarse.
+
+    """
+    import importlib
+
+    for modulo in MODULOS:
+        sys.modules.pop(modulo,None)
+    sys.path.insert(0,raiz)
+
+    return importlib.import_module('funciones')
+
+
+def correr(tickets=TICKETS,años=AÑOS,funciones=None,repeticiones=3,memoria=True,
+           semilla=0,raiz=RAIZ):
+    """
+    Corre los benchmarks de todas las combinaciones de cantidad de tickets y
+    plazo, y devuelve una lista con un diccionario por medición.
+
+    """
+    from sinteticos import mercado_sintetico
+
+    mercados={n:mercado_sintetico(n,FECHA1,AÑOS_UNIVERSO,semilla) for n in tickets}
+    f=importar_libreria(raiz)
+    limpiar_memorias()
+
+    resultados=[]
+    for n in tickets:
+        for plazo in años:
+            casos=preparar(f,mercados[n],plazo)
+            for nombre,funcion in casos.items():
+                if funciones and nombre not in funciones:
+                    continue
+                fila={'funcion':nombre,'tickets':n,'años':plazo,'segundos':None,
+                      'memoria_pico_mb':None,'error':None}
+                try:
+                    fila['segundos'],fila['memoria_pico_mb']=medir(funcion,repeticiones,
+                                                                   memoria)
+                except Exception as error:
+                    fila['error']=f'{type(error).__name__}: {error}'
+                resultados.append(fila)
+                print(f"{nombre:>22} {n:>5} tickets {plazo:>3} años: "
+                      f"{fila['segundos'] if fila['error'] is None else fila['error']}",
+                      flush=True)
+
+    return resultados
+
+
+def revision(raiz):
+    """
+    Devuelve el hash del commit de la carpeta 'raiz', o None si no es un
+    repositorio de git.
+
+    """
+    import subprocess
+
+    try:
+        return subprocess.run(['git','-C',raiz,'rev-parse','HEAD'],capture_output=True,
+                              text=True,check=True).stdout.strip()
+    except (OSError,subprocess.CalledProcessError):
+        return None
+
+
+def comparar(base,nuevo,umbral=1.1):
+    """
+    Compara dos archivos de resultados y devuelve una tabla con el tiempo y la
+    memoria de cada uno, el cociente nuevo/base, y una marca en las mediciones
+    que empeoraron más que 'umbral'.
+
+    """
+    import json
+    import pandas as pd
+
+    tablas=[]
+    for ruta,sufijo in [(base,'_base'),(nuevo,'_nuevo')]:
+        with open(ruta,encoding='utf-8') as archivo:
+            datos=json.load(archivo)
+        tabla=pd.DataFrame(datos['resultados']).set_index(['funcion','tickets','años'])
+        tablas.append(tabla[['segundos','memoria_pico_mb']].add_suffix(sufijo))
+
+    tabla=tablas[0].join(tablas[1],how='outer')
+    tabla['cociente_tiempo']=tabla.segundos_nuevo/tabla.segundos_base
+    tabla['cociente_memoria']=tabla.memoria_pico_mb_nuevo/tabla.memoria_pico_mb_base
+    tabla['empeora']=(tabla.cociente_tiempo>umbral) | (tabla.cociente_memoria>umbral)
+
+    return tabla
+
+
+def main(argumentos=None):
+    import argparse
+    import json
+    import platform
+    import shutil
+    import subprocess
+    import tempfile
+    from datetime import datetime
+
+    parser=argparse.ArgumentParser(description='Benchmarks de las funciones de la librería.')
+    comandos=parser.add_subparsers(dest='comando',required=True)
+
+    p_correr=comandos.add_parser('correr')
+    p_correr.add_argument('--tickets',type=int,nargs='+',default=TICKETS)
+    p_correr.add_argument('--años',type=int,nargs='+',default=AÑOS)
+    p_correr.add_argument('--funciones',nargs='+')
+    p_correr.add_argument('--repeticiones',type=int,default=3)
+    p_correr.add_argument('--sin-memoria',action='store_true')
+    p_correr.add_argument('--semilla',type=int,default=0)
+    p_correr.add_argument('--raiz',default=RAIZ)
+    p_correr.add_argument('--revision')
+    p_correr.add_argument('--salida',default='benchmarks.json')
+
+    p_comparar=comandos.add_parser('comparar')
+    p_comparar.add_argument('base')
+    p_comparar.add_argument('nuevo')
+    p_comparar.add_argument('--umbral',type=float,default=1.1)
+
+    args=parser.parse_args(argumentos)
+
+    if args.comando=='comparar':
+        tabla=comparar(args.base,args.nuevo,args.umbral)
+        print(tabla.round(4).to_string())
+        return 1 if tabla.empeora.any() else 0
+
+    raiz=args.raiz
+    temporal=None
+    if args.revision is not None:
+        # La revisión se mide desde una copia de trabajo temporal de git.
+        temporal=tempfile.mkdtemp()
+        raiz=os.path.join(temporal,'revision')
+        subprocess.run(['git','-C',RAIZ,'worktree','add','--detach',raiz,args.revision],
+                       check=True)
+    try:
+        resultados=correr(args.tickets,args.años,args.funciones,args.repeticiones,
+                          not args.sin_memoria,args.semilla,raiz)
+        salida={'revision':revision(raiz),'fecha':datetime.now().isoformat(),
+                'python':platform.python_version(),'semilla':args.semilla,
+                'resultados':resultados}
+    finally:
+        if temporal is not None:
+            subprocess.run(['git','-C',RAIZ,'worktree','remove','--force',raiz])
+            shutil.rmtree(temporal,ignore_errors=True)
+
+    with open(args.salida,'w',encoding='utf-8') as archivo:
+        json.dump(salida,archivo,indent=1,ensure_ascii=False)
+
+    return 0
+
+
+if __name__=='__main__':
+    sys.exit(main())
@@ -0,0 +1,531 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                      CACHE EN DISCO DE LOS LIBROS DE EXCEL
+#
+#             Guarda cada pestaña leída de un excel como un archivo
+#          columnar (Parquet) en una carpeta local. La clave de cada
+#          archivo es la ruta del excel, la pestaña, los argumentos de
+#          lectura, y el hash del contenido del excel, de modo que si el
+#          excel cambia la pestaña se vuelve a leer. Cuando la carpeta
+#          supera un tamaño máximo se borran los archivos usados hace más
+#          tiempo (LRU). Una vez que la cache está "caliente" no se vuelve
+#          a utilizar openpyxl.
+#
+#             En la subcarpeta 'memo' se guardan, además, los resultados de
+#          las funciones deterministas con el decorador 'memorizado'
+#          ('tasabadlar', 'tabla_infla', 'tabla_dev', 'analisis_rt', etc.).
+#          La clave es el hash de los argumentos (el contenido de los
+#          DataFrames y del MarketSnapshot, y el hash de los excel de la
+#          carpeta cuando los datos se leen de los archivos) y del código
+#          fuente de los módulos del cálculo, de modo que el segundo proceso
+#          del día reutiliza lo que calculó el primero, y un cambio en el
+#          código descarta lo guardado. La memoria se activa con la variable
+#                        de entorno RENTA_FIJA_MEMO=1.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+from perfil import medido
+
+# Carpeta de la cache y tamaño máximo (en bytes). La carpeta puede cambiarse
+# con la variable de entorno RENTA_FIJA_CACHE.
+DIRECTORIO_CACHE=None
+TAMAÑO_MAXIMO_CACHE=512*1024**2
+
+# Memoria de resultados en disco: si está activa (None: según la variable de
+# entorno RENTA_FIJA_MEMO) y su tamaño máximo (en bytes). Cambiar la versión
+# descarta todos los resultados guardados.
+MEMO_ACTIVA=None
+TAMAÑO_MAXIMO_MEMO=256*1024**2
+VERSION_MEMO=1
+
+# Módulos cuyo código fuente forma parte de la clave de la memoria: los de
+# las funciones memorizadas y los que éstas usan.
+MODULOS_MEMO=['funciones','flujos','indices','curvas','calendario','tablas','mercado']
+
+# Hash del contenido de cada excel, para no volver a leer el archivo completo
+# mientras no cambien su fecha de modificación y su tamaño.
+_hashes={}
+
+# Hash del código de cada función memorizada y de los módulos que usa. El
+# código no cambia mientras el proceso está corriendo.
+_huellas_funciones={}
+
+
+def directorio_cache():
+    """
+    Devuelve la carpeta donde se guarda la cache, creándola si no existe. Por
+    defecto es '~/.cache/renta_fija_sf', salvo que se indique otra en la
+    variable DIRECTORIO_CACHE o en la variable de entorno RENTA_FIJA_CACHE.
+
+    """
+    import os
+
+    carpeta=DIRECTORIO_CACHE or os.environ.get('RENTA_FIJA_CACHE') or \
+        os.path.join(os.path.expanduser('~'),'.cache','renta_fija_sf')
+    os.makedirs(carpeta,exist_ok=True)
+
+    return carpeta
+
+
+def hash_archivo(ruta):
+    """
+    Devuelve el hash (sha1) del contenido del archivo. El resultado se recuerda
+    mientras el archivo conserve su fecha de modificación y su tamaño.
+
+    """
+    import os
+    import hashlib
+
+    estado=os.stat(ruta)
+    clave=(os.path.abspath(ruta),estado.st_mtime_ns,estado.st_size)
+    if clave not in _hashes:
+        h=hashlib.sha1()
+        with open(ruta,'rb') as archivo:
+            for bloque in iter(lambda: archivo.read(1024**2),b''):
+                h.update(bloque)
+        _hashes[clave]=h.hexdigest()
+
+    return _hashes[clave]
+
+
+@medido()
+def leer_excel(ruta,sheet_name=0,**kwargs):
+    """
+    Reemplazo de 'pd.read_excel' que guarda cada pestaña leída en la cache de
+    disco. Si la pestaña ya está en la cache y el excel no cambió, se lee el
+    archivo Parquet en lugar del excel.
+
+    PARAMETROS
+    ----------
+    ruta: String, obligatorio.
+    Descripción: Es la ruta del archivo excel, por ejemplo, 'Bonoscurvas.xlsx'.
+
+    sheet_name: String, Integer, o lista, opcional.
+    Descripción: Es la pestaña (o lista de pestañas) a leer, igual que en
+    'pd.read_excel'. Por defecto es la primera pestaña. Si es None, se leen
+    todas las pestañas sin pasar por la cache.
+
+    **kwargs: opcional.
+    Descripción: Son el resto de los argumentos de 'pd.read_excel' (header,
+    usecols, nrows, etc.). Forman parte de la clave de la cache.
+
+    RESULTADO
+    -------
+    hoja: DataFrame o diccionario de DataFrames.
+    Descripción: Es lo mismo que devolvería 'pd.read_excel'.
+
+    """
+    import pandas as pd
+
+    if sheet_name is None:
+        return pd.read_excel(ruta,sheet_name=None,**kwargs)
+
+    pestañas=sheet_name if isinstance(sheet_name,list) else [sheet_name]
+    contenido=hash_archivo(ruta)
+
+    # Primero se buscan las pestañas en la cache, y las que falten se leen del
+    # excel todas juntas, en una sola pasada.
+    hojas={}
+    faltantes=[]
+    for pestaña in pestañas:
+        hoja=_leer_cache(_clave(ruta,pestaña,kwargs,contenido))
+        if hoja is None:
+            faltantes.append(pestaña)
+        else:
+            hojas[pestaña]=hoja
+
+    if len(faltantes)>0:
+        nuevas=pd.read_excel(ruta,sheet_name=faltantes,**kwargs)
+        for pestaña in faltantes:
+            _guardar_cache(_clave(ruta,pestaña,kwargs,contenido),nuevas[pestaña])
+            hojas[pestaña]=nuevas[pestaña]
+        _recortar_cache()
+
+    if isinstance(sheet_name,list):
+        return {pestaña:hojas[pestaña] for pestaña in pestañas}
+    return hojas[sheet_name]
+
+
+def limpiar_cache():
+    """
+    Borra todos los archivos de la cache de los excel. La memoria de resultados
+    se borra con 'limpiar_memo'.
+
+    """
+    import os
+
+    carpeta=directorio_cache()
+    for nombre in os.listdir(carpeta):
+        ruta=os.path.join(carpeta,nombre)
+        if os.path.isfile(ruta):
+            os.remove(ruta)
+
+
+def _clave(ruta,pestaña,kwargs,contenido):
+    import os
+    import hashlib
+
+    texto=repr((os.path.abspath(ruta),pestaña,sorted(kwargs.items()),contenido))
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+def _leer_cache(clave):
+    import os
+    import numpy as np
+    import pandas as pd
+
+    for extension in ['parquet','pkl']:
+        ruta=os.path.join(directorio_cache(),f'{clave}.{extension}')
+        if not os.path.exists(ruta):
+            continue
+        try:
+            if extension=='parquet':
+                hoja=pd.read_parquet(ruta)
+                # Parquet devuelve None en las celdas vacías de las columnas de
+                # texto, mientras que el excel devuelve NaN.
+                for columna in hoja.columns[hoja.dtypes==object]:
+                    hoja[columna]=hoja[columna].where(hoja[columna].notna(),np.nan)
+            else:
+                hoja=pd.read_pickle(ruta)
+        except Exception:
+            # Archivo borrado por otro proceso, dañado, o sin pyarrow para
+            # leerlo: se vuelve a leer el excel.
+            return None
+        # Se actualiza la fecha de modificación para que el archivo sea el
+        # último en borrarse (LRU).
+        os.utime(ruta)
+        return hoja
+
+    return None
+
+
+def _guardar_cache(clave,hoja):
+    import os
+
+    carpeta=directorio_cache()
+    temporal=os.path.join(carpeta,f'{clave}.{os.getpid()}.tmp')
+
+    # Las pestañas con columnas que Parquet no admite (por ejemplo, fechas y
+    # texto mezclados) se guardan con pickle.
+    try:
+        hoja.to_parquet(temporal)
+        extension='parquet'
+    except Exception:
+        hoja.to_pickle(temporal)
+        extension='pkl'
+    os.replace(temporal,os.path.join(carpeta,f'{clave}.{extension}'))
+
+
+def _recortar_cache(carpeta=None,tamaño_maximo=None):
+    import os
+    import time
+
+    carpeta=carpeta or directorio_cache()
+    tamaño_maximo=TAMAÑO_MAXIMO_CACHE if tamaño_maximo is None else tamaño_maximo
+    archivos=[]
+    for nombre in os.listdir(carpeta):
+        ruta=os.path.join(carpeta,nombre)
+        try:
+            estado=os.stat(ruta)
+        except FileNotFoundError:
+            # Borrado por otro proceso.
+            continue
+        if not os.path.isfile(ruta):
+            continue
+        if nombre.endswith('.tmp'):
+            # Temporales de procesos que terminaron sin renombrarlos.
+            if time.time()-estado.st_mtime>3600:
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    pass
+            continue
+        archivos.append((estado.st_mtime,estado.st_size,ruta))
+    total=sum(tamaño for _,tamaño,_ in archivos)
+
+    # Se borran los archivos menos usados hasta volver al tamaño máximo.
+    for _,tamaño,ruta in sorted(archivos):
+        if total<=tamaño_maximo:
+            break
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
+        total=total-tamaño
+
+
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                      MEMORIA DE RESULTADOS EN DISCO
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+def memo_activa():
+    """
+    Devuelve True si la memoria de resultados en disco está activa: según
+    MEMO_ACTIVA o, si es None, según la variable de entorno RENTA_FIJA_MEMO.
+
+    """
+    import os
+
+    if MEMO_ACTIVA is not None:
+        return MEMO_ACTIVA
+    return os.environ.get('RENTA_FIJA_MEMO','0').lower() in ('1','true','si','sí')
+
+
+def directorio_memo():
+    """
+    Devuelve la carpeta de la memoria de resultados, dentro de la carpeta de la
+    cache, creándola si no existe.
+
+    """
+    import os
+
+    carpeta=os.path.join(directorio_cache(),'memo')
+    os.makedirs(carpeta,exist_ok=True)
+
+    return carpeta
+
+
+def limpiar_memo():
+    """
+    Borra todos los resultados guardados en la memoria en disco.
+
+    """
+    import os
+
+    carpeta=directorio_memo()
+    for nombre in os.listdir(carpeta):
+        try:
+            os.remove(os.path.join(carpeta,nombre))
+        except FileNotFoundError:
+            pass
+
+
+def huella(valor):
+    """
+    Devuelve un hash (sha1) del contenido de 'valor', que se usa como parte de
+    la clave de la memoria. Los DataFrames, Series y arrays se identifican por
+    su contenido, el índice, las columnas y los tipos de datos; los
+    MarketSnapshot por todos sus datos; y las listas, tuplas y diccionarios
+    por sus elementos.
+
+    """
+    import hashlib
+    import numpy as np
+    import pandas as pd
+    from mercado import MarketSnapshot
+
+    h=hashlib.sha1()
+    if isinstance(valor,(pd.DataFrame,pd.Series)):
+        tabla=valor.to_frame() if isinstance(valor,pd.Series) else valor
+        h.update(repr((type(valor).__name__,list(tabla.columns),
+                       list(tabla.index.names))).encode('utf-8'))
+        h.update(_bytes_array(tabla.index.to_numpy()))
+        for _,columna in tabla.items():
+            h.update(_bytes_array(columna.to_numpy()))
+    elif isinstance(valor,(pd.Index,np.ndarray)):
+        h.update(_bytes_array(np.asarray(valor)))
+    elif isinstance(valor,MarketSnapshot):
+        h.update(huella([valor.bonos,valor.curvas,valor.fecha,valor.serie_cer,
+                         valor.serie_tca3500,valor.rem]).encode('utf-8'))
+    elif isinstance(valor,dict):
+        h.update(b'dict')
+        for clave in sorted(valor,key=repr):
+            h.update(repr(clave).encode('utf-8'))
+            h.update(huella(valor[clave]).encode('utf-8'))
+    elif isinstance(valor,(list,tuple)):
+        h.update(type(valor).__name__.encode('utf-8'))
+        for elemento in valor:
+            h.update(huella(elemento).encode('utf-8'))
+    else:
+        h.update(repr((type(valor).__name__,valor)).encode('utf-8'))
+
+    return h.hexdigest()
+
+
+def _bytes_array(valores):
+    """
+    Devuelve los bytes del contenido de un array: su tipo, su forma y sus datos
+    si es numérico o de fechas, o el texto de sus elementos si es de objetos
+    (texto, fechas mezcladas, etc.). No depende de cómo esté guardado el array
+    en memoria, de modo que un DataFrame y su copia tienen la misma huella.
+
+    """
+    import numpy as np
+
+    encabezado=repr((valores.dtype.str,valores.shape)).encode('utf-8')
+    if valores.dtype.kind in 'biufcmM':
+        return encabezado+np.ascontiguousarray(valores).tobytes()
+    return encabezado+repr(valores.tolist()).encode('utf-8')
+
+
+def _huellas_excel(directorio):
+    """
+    Devuelve el hash de cada excel de la carpeta actual y de 'directorio', que
+    son los archivos que leen las funciones cuando no reciben un
+    MarketSnapshot.
+
+    """
+    import os
+
+    carpetas={os.path.abspath('.')}
+    if isinstance(directorio,str):
+        carpetas.add(os.path.abspath(directorio))
+    huellas=[]
+    for carpeta in sorted(carpetas):
+        if not os.path.isdir(carpeta):
+            continue
+        for nombre in sorted(os.listdir(carpeta)):
+            if nombre.endswith('.xlsx') and not nombre.startswith('~$'):
+                ruta=os.path.join(carpeta,nombre)
+                try:
+                    huellas.append((ruta,hash_archivo(ruta)))
+                except FileNotFoundError:
+                    pass
+
+    return huellas
+
+
+def _huella_codigo(codigo):
+    """
+    Devuelve un hash del código de una función, incluidas las funciones
+    definidas dentro de ella, para que un cambio en el código descarte los
+    resultados guardados.
+
+    """
+    import hashlib
+
+    h=hashlib.sha1(codigo.co_code)
+    for constante in codigo.co_consts:
+        if hasattr(constante,'co_code'):
+            h.update(_huella_codigo(constante).encode('utf-8'))
+        else:
+            h.update(repr(constante).encode('utf-8'))
+
+    return h.hexdigest()
+
+
+def _huella_funcion(funcion):
+    """
+    Devuelve el hash del código de la función y del código fuente de los
+    módulos de 'MODULOS_MEMO', que incluyen las funciones auxiliares que ésta
+    llama. Se calcula una sola vez por proceso.
+
+    """
+    import hashlib
+    from importlib.util import find_spec
+
+    if funcion not in _huellas_funciones:
+        h=hashlib.sha1(_huella_codigo(funcion.__code__).encode('utf-8'))
+        for modulo in MODULOS_MEMO:
+            especificacion=find_spec(modulo)
+            if especificacion is None or especificacion.origin is None:
+                continue
+            with open(especificacion.origin,'rb') as archivo:
+                h.update(modulo.encode('utf-8'))
+                h.update(hashlib.sha1(archivo.read()).digest())
+        _huellas_funciones[funcion]=h.hexdigest()
+
+    return _huellas_funciones[funcion]
+
+
+def _clave_memo(funcion,args,kwargs,ignorar=()):
+    import hashlib
+    from calendario import fecha_calculo
+
+    codigo=funcion.__code__
+    argumentos=dict(zip(codigo.co_varnames[:codigo.co_argcount],args))
+    argumentos.update(kwargs)
+    # Los argumentos que sólo deciden cómo se calcula no cambian el resultado.
+    for nombre in ignorar:
+        argumentos.pop(nombre,None)
+
+    # La fecha de cálculo es siempre un día, sin hora. Sin fecha de cálculo,
+    # se usa el día de hoy.
+    if 'as_of' in codigo.co_varnames:
+        argumentos['as_of']=fecha_calculo(argumentos.get('as_of')).date().isoformat()
+    # Sin MarketSnapshot, los datos se leen de los excel.
+    if 'mercado' in codigo.co_varnames and argumentos.get('mercado') is None:
+        argumentos['excel']=_huellas_excel(argumentos.get('directorio'))
+
+    funcion_id=(funcion.__module__,funcion.__qualname__,VERSION_MEMO,
+                _huella_funcion(funcion))
+    return hashlib.sha1(repr((funcion_id,huella(argumentos))).encode('utf-8')).hexdigest()
+
+
+def _leer_memo(clave):
+    import os
+    import pickle
+
+    ruta=os.path.join(directorio_memo(),f'{clave}.pkl')
+    try:
+        with open(ruta,'rb') as archivo:
+            resultado=pickle.load(archivo)
+        # Se actualiza la fecha de modificación para que el archivo sea el
+        # último en borrarse (LRU).
+        os.utime(ruta)
+    except Exception:
+        # No está, lo borró otro proceso, o está dañado: se vuelve a calcular.
+        return None,False
+
+    return resultado,True
+
+
+def _guardar_memo(clave,resultado):
+    import os
+    import pickle
+
+    carpeta=directorio_memo()
+    temporal=os.path.join(carpeta,f'{clave}.{os.getpid()}.tmp')
+    try:
+        with open(temporal,'wb') as archivo:
+            pickle.dump(resultado,archivo,protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # Resultados que no se pueden guardar: simplemente no se memorizan.
+        try:
+            os.remove(temporal)
+        except FileNotFoundError:
+            pass
+        return
+    # El renombre es atómico: otro proceso ve el archivo completo o no lo ve.
+    os.replace(temporal,os.path.join(carpeta,f'{clave}.pkl'))
+    _recortar_cache(carpeta,TAMAÑO_MAXIMO_MEMO)
+
+
+def memorizado(funcion=None,ignorar=()):
+    """
+    Decorador que guarda en disco el resultado de una función determinista, con
+    la clave del hash de sus argumentos (ver 'huella'), del código de la
+    función y de los módulos que usa (ver 'MODULOS_MEMO') y, si no recibe un
+    MarketSnapshot, de los excel de los que lee los datos. Si la memoria no
+    está activa (ver 'memo_activa'), la función se llama directamente. Se usa
+    como '@memorizado' o, con argumentos, '@memorizado(ignorar=(...))'.
+
+    PARAMETROS
+    ----------
+    ignorar: Tupla de strings, opcional.
+    Descripción: Son los nombres de los argumentos que no cambian el resultado
+    (por ejemplo, 'n_jobs' o 'executor'), y que no forman parte de la clave.
+
+    """
+    from functools import wraps
+
+    def decorador(funcion):
+        @wraps(funcion)
+        def memorizada(*args,**kwargs):
+            if not memo_activa():
+                return funcion(*args,**kwargs)
+            clave=_clave_memo(funcion,args,kwargs,ignorar)
+            resultado,encontrado=_leer_memo(clave)
+            if not encontrado:
+                resultado=funcion(*args,**kwargs)
+                _guardar_memo(clave,resultado)
+            return resultado
+
+        return memorizada
+
+    if funcion is None:
+        return decorador
+    return decorador(funcion)
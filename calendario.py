@@ -0,0 +1,114 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                           CALENDARIO DE FIN DE MES
+#
+#             Genera las fechas de inicio y de fin de cada mes entre dos
+#          fechas cualesquiera, con arrays datetime64 (sin recorrer fila por
+#          fila), y contando los años bisiestos. Cada rango de meses se
+#          calcula una sola vez y se recuerda. Lo utilizan las funciones
+#          'tabla_infla', 'tabla_dev', 'tabla_infla_esc' y 'tabla_dev_esc'
+#          para armar el índice de sus tablas, sin límite en la cantidad de
+#          meses. También define la fecha de cálculo ('as_of') que utilizan
+#                   todas las funciones en lugar de la de hoy.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=256)
+def _meses(inicio,fin):
+    import numpy as np
+
+    meses=np.arange(np.datetime64(inicio,'M'),np.datetime64(fin,'M')+1)
+    inicio_mes=meses.astype('datetime64[D]')
+    fin_mes=(meses+1).astype('datetime64[D]')-1
+    inicio_mes.flags.writeable=False
+    fin_mes.flags.writeable=False
+
+    return inicio_mes,fin_mes
+
+
+def meses(inicio,fin):
+    """
+    Devuelve las fechas de inicio y de fin de cada mes, desde el mes de la
+    fecha 'inicio' hasta el mes de la fecha 'fin', ambos incluidos. El resulta-
+    do de cada par de meses se recuerda, por lo que los arrays devueltos son de
+    sólo lectura.
+
+    PARAMETROS
+    ----------
+    inicio, fin: String, datetime o datetime64, obligatorio.
+    Descripción: Son dos fechas cualesquiera del primer y del último mes. Por
+    ejemplo, '2024-06-15'.
+
+    RESULTADO
+    -------
+    inicio_mes, fin_mes: arrays de datetime64[D].
+    Descripción: Son el primer y el último día de cada mes.
+
+    """
+    import pandas as pd
+
+    def mes(fecha):
+        return str(pd.Timestamp(fecha).to_datetime64().astype('datetime64[M]'))
+
+    return _meses(mes(inicio),mes(fin))
+
+
+def fines_de_mes(inicio,fin):
+    """
+    Devuelve el último día de cada mes, desde el mes de la fecha 'inicio' hasta
+    el mes de la fecha 'fin', como DatetimeIndex.
+
+    """
+    import pandas as pd
+
+    return pd.DatetimeIndex(meses(inicio,fin)[1],name='fecha')
+
+
+def fin_de_mes(fecha):
+    """
+    Devuelve el último día del mes de la fecha indicada, como datetime.
+
+    """
+    import pandas as pd
+
+    return pd.Timestamp(meses(fecha,fecha)[1][0]).to_pydatetime()
+
+
+def fecha_calculo(as_of=None):
+    """
+    Devuelve la fecha de cálculo como datetime, a las cero horas. Todas las
+    funciones que dependen de la fecha de hoy la obtienen de aquí, de modo que
+    con el mismo 'as_of' los mismos datos dan siempre el mismo resultado, y se
+    pueden calcular fechas pasadas.
+
+    PARAMETROS
+    ----------
+    as_of: String, date, datetime o datetime64, opcional.
+    Descripción: Es la fecha de cálculo. Por ejemplo, '2024-06-15'. Si no se
+    indica, se usa el día de hoy. La hora, si la tiene, se descarta.
+
+    RESULTADO
+    -------
+    hoy: datetime.
+    Descripción: Es la fecha de cálculo.
+
+    """
+    import pandas as pd
+    from datetime import datetime
+
+    if as_of is None:
+        as_of=datetime.now()
+
+    return pd.Timestamp(as_of).normalize().to_pydatetime()
+
+
+def limpiar_calendario():
+    """
+    Borra de la memoria todos los rangos de meses calculados.
+
+    """
+    _meses.cache_clear()
@@ -0,0 +1,148 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                        AJUSTE DE LAS CURVAS TIR-DM
+#
+#             Ajusta la regresión lineal log simple TIR = a + b*ln(DM)
+#          que utilizan las funciones 'grafica_bonos', 'tabla_infla' y
+#          'p_reventa'. Los coeficientes se obtienen con la fórmula cerrada
+#          de mínimos cuadrados (NumPy), sin pasar por statsmodels, y cada
+#          curva se ajusta una sola vez por tipo, fecha, y datos. El
+#          diagnóstico completo de statsmodels se importa sólo cuando se
+#                    pide con 'diagnostico_curva'.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+from dataclasses import dataclass
+
+from perfil import medido
+
+# Curvas ya ajustadas, por (tipo de curva, fecha, hash de los datos).
+_curvas={}
+
+
+@dataclass(frozen=True)
+class LogCurve:
+    """
+    Es la curva TIR = intercept + slope*ln(DM) ajustada por mínimos cuadrados.
+
+    PARAMETROS
+    ----------
+    intercept: Float.
+    Descripción: Es la ordenada al origen de la regresión.
+
+    slope: Float.
+    Descripción: Es el coeficiente que acompaña al logaritmo de la DM.
+
+    n: Integer.
+    Descripción: Es la cantidad de bonos utilizados en el ajuste.
+
+    r2: Float.
+    Descripción: Es el coeficiente de determinación de la regresión.
+
+    """
+    intercept: float
+    slope: float
+    n: int
+    r2: float
+
+    def __call__(self,dm):
+        """
+        Devuelve la TIR anual de la curva para una DM (o un array de DMs).
+
+        """
+        import numpy as np
+
+        return self.intercept+self.slope*np.log(dm)
+
+
+@medido()
+def ajustar_curva(curva,tipo=None,fecha=None):
+    """
+    Ajusta la regresión TIR_anual ~ ln(DMdias) de una curva de bonos. El
+    resultado se recuerda, de modo que volver a pedir la misma curva (mismo
+    tipo, fecha, y datos) no repite el ajuste.
+
+    PARAMETROS
+    ----------
+    curva: DataFrame, obligatorio.
+    Descripción: Es la pestaña de 'Bonoscurvas' con las columnas 'TIR_anual' y
+    'DMdias'.
+
+    tipo: String, opcional.
+    Descripción: Es el tipo de curva ('CER', 'Pesos', 'DL' o 'USD'). Sólo se
+    utiliza como parte de la clave de la memoria.
+
+    fecha: String, opcional.
+    Descripción: Es la fecha de la pestaña, por ejemplo, '17-01-23'. Sólo se
+    utiliza como parte de la clave de la memoria.
+
+    RESULTADO
+    -------
+    log_curve: LogCurve.
+    Descripción: Es la curva ajustada, con sus coeficientes, la cantidad de
+    observaciones, y el R2.
+
+    """
+    import hashlib
+    import numpy as np
+
+    x=np.log(np.asarray(curva['DMdias'],dtype=float))
+    y=np.asarray(curva['TIR_anual'],dtype=float)
+
+    clave=(tipo,fecha,hashlib.sha1(x.tobytes()+y.tobytes()).hexdigest())
+    if clave in _curvas:
+        return _curvas[clave]
+
+    # Igual que en la regresión con fórmula, se descartan las observaciones
+    # sin datos.
+    validos=np.isfinite(x) & np.isfinite(y)
+    x=x[validos]
+    y=y[validos]
+
+    x_media=x.mean()
+    y_media=y.mean()
+    slope=((x-x_media)*(y-y_media)).sum()/((x-x_media)**2).sum()
+    intercept=y_media-slope*x_media
+
+    residuos=y-(intercept+slope*x)
+    r2=1-(residuos**2).sum()/((y-y_media)**2).sum()
+
+    log_curve=LogCurve(float(intercept),float(slope),int(x.size),float(r2))
+    _curvas[clave]=log_curve
+
+    return log_curve
+
+
+def diagnostico_curva(curva):
+    """
+    Ajusta la misma regresión que 'ajustar_curva' con statsmodels, para ver el
+    diagnóstico completo (errores estándar, estadísticos t, residuos, etc.).
+    statsmodels sólo se importa al llamar esta función; el cálculo de los
+    precios y rendimientos no lo necesita.
+
+    PARAMETROS
+    ----------
+    curva: DataFrame, obligatorio.
+    Descripción: Es la pestaña de 'Bonoscurvas' con las columnas 'TIR_anual' y
+    'DMdias'.
+
+    RESULTADO
+    -------
+    reg: RegressionResults.
+    Descripción: Es el resultado de la regresión de statsmodels. Por ejemplo,
+    reg.summary() muestra la tabla completa.
+
+    """
+    import numpy as np
+    from statsmodels.formula.api import ols
+
+    return ols('TIR_anual ~ np.log(DMdias)',data=curva).fit()
+
+
+def limpiar_curvas():
+    """
+    Borra de la memoria todas las curvas ajustadas.
+
+    """
+    _curvas.clear()
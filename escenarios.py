@@ -0,0 +1,327 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                  GRILLA DE ESCENARIOS DE INFLACION Y DEP/DEV
+#
+#             Evalúa el rendimiento total esperado de todos los bonos
+#          bullet y letras bajo muchos escenarios lineales de inflación
+#          ('tabla_infla_esc') y de dep/dev ('tabla_dev_esc') a la vez. Las
+#          tablas de escenario se construyen una sola vez como plantilla;
+#          los caminos de todos los escenarios se arman como un array de
+#          dos dimensiones (escenario x mes), y la actualización, la capi-
+#          talización y la reventa de todos los tickets se calculan con
+#                       operaciones sobre esos arrays.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+CONCEPTOS=['RT_Anual_Esp','Cupones','Int_Reinv','Capital_o_Reventa']
+
+
+def caminos_lineales(tabla_esc,bases,variaciones):
+    """
+    Arma los caminos mensuales de todos los escenarios lineales a partir de una
+    tabla de escenario ya calculada, que actúa de plantilla. Igual que en
+    'tabla_infla_esc' y 'tabla_dev_esc', los dos primeros meses (el mes
+    anterior y el actual) no cambian, el tercero es la tasa base, y cada mes
+    siguiente suma la tasa de variación.
+
+    PARAMETROS
+    ----------
+    tabla_esc: DataFrame o TablaMensual, obligatorio.
+    Descripción: Es una tabla de 'tabla_infla_esc' o de 'tabla_dev_esc', con
+    la fecha horizonte que se quiere evaluar.
+
+    bases, variaciones: arrays de Floats, obligatorio.
+    Descripción: Son las tasas base y las tasas de variación de cada escenario.
+    Se evalúan todas las combinaciones.
+
+    RESULTADO
+    -------
+    tasas, acumuladas: arrays de Floats.
+    Descripción: Son las tasas mensuales y acumuladas de cada escenario, con un
+    escenario por fila y un mes de la plantilla por columna. Las filas siguen
+    el orden de todas las combinaciones (base, variación).
+
+    plantilla: TablaMensual.
+    Descripción: Es la plantilla, con los meses y los días de cada mes.
+
+    """
+    import numpy as np
+    from tablas import TablaMensual
+
+    plantilla=tabla_esc if isinstance(tabla_esc,TablaMensual) else \
+        TablaMensual.desde_tabla(tabla_esc)
+
+    base,variacion=np.meshgrid(np.asarray(bases,dtype=float),
+                               np.asarray(variaciones,dtype=float),indexing='ij')
+    base=base.ravel()
+    variacion=variacion.ravel()
+
+    tasas=np.tile(plantilla.tasas,(base.size,1))
+    tasas[:,2:]=base[:,None]+variacion[:,None]*np.arange(len(plantilla)-2)
+
+    # La tasa acumulada se mide desde el mes actual; el mes anterior tiene cero.
+    acumuladas=np.zeros_like(tasas)
+    acumuladas[:,1:]=np.cumprod(1+tasas[:,1:],axis=1)-1
+
+    return tasas,acumuladas,plantilla
+
+
+class EvaluadorRT:
+    """
+    Guarda todo lo que no depende del camino de inflación o de dep/dev para
+    calcular el rendimiento total esperado de los bonos bullet y letras a una
+    fecha horizonte: los flujos por ticket, los factores de capitalización, la
+    ubicación de cada fecha de cobro en las tablas (con su rezago), y el precio
+    de reventa con las tablas plantilla. Luego evalúa muchos caminos a la vez,
+    dados como arrays (camino x mes) sobre los meses de las plantillas.
+
+    Se utiliza en 'grilla_rt' y en 'montecarlo.py'.
+
+    PARAMETROS
+    ----------
+    tabla_infla, tabla_dev : DataFrame o TablaMensual, obligatorio.
+    Descripción: Son las tablas plantilla de inflación y de dep/dev (por
+    ejemplo, de 'tabla_infla_esc' y 'tabla_dev_esc', o de 'tabla_infla' y
+    'tabla_dev'). Los caminos se evalúan sobre sus meses.
+
+    int_tabla, f_horizonte, i_cer_hoy, tcn_hoy, fecha1, monto_invertido, mercado,
+    as_of:
+    Descripción: Son los mismos argumentos de 'analisis_rt'.
+
+    """
+
+    def __init__(self,tabla_infla,tabla_dev,int_tabla,f_horizonte,i_cer_hoy,
+                 tcn_hoy,fecha1,monto_invertido=50_000,mercado=None,as_of=None):
+        import numpy as np
+        from datetime import datetime
+        from calendario import fecha_calculo
+        from mercado import MarketSnapshot
+        from tablas import TablaMensual
+        from flujos import CuboFlujos, construir_cubo, factores_capitalizacion
+        from indices import proyectar_indice, REZAGO_CER, REZAGO_TC
+        from funciones import p_reventa_lote
+
+        if mercado is None:
+            mercado=MarketSnapshot.cargar(fecha1,nombre_archivo_cer=None)
+        bonoss=mercado.bonos
+        ahora=fecha_calculo(as_of)
+
+        self.plantilla_inf=tabla_infla if isinstance(tabla_infla,TablaMensual) else \
+            TablaMensual.desde_tabla(tabla_infla)
+        self.plantilla_dev=tabla_dev if isinstance(tabla_dev,TablaMensual) else \
+            TablaMensual.desde_tabla(tabla_dev)
+        self.monto_invertido=monto_invertido
+
+        # Flujos de todos los tickets hasta y desde la fecha horizonte, escalados
+        # al valor nominal que se compra con el monto invertido.
+        cubo=construir_cubo(bonoss,ahora)
+        self.tickets=list(cubo.tickets)
+        vn=monto_invertido/np.asarray(bonoss.precio.reindex(self.tickets),dtype=float)*100
+        escala=vn[cubo.indice_ticket]/100
+        cubo=CuboFlujos(cubo.tickets,cubo.offsets,cubo.fechas,cubo.cupones*escala,
+                        cubo.saldo*escala)
+        antes,despues=cubo.dividir(f_horizonte)
+        self.antes=antes
+        self.inicio=antes.offsets[:-1]
+
+        indice=antes.indice_ticket
+        tipos=bonoss.tipo_bono2.reindex(self.tickets).values
+        self.es_dl=tipos=='DL'
+        self.es_cer=np.isin(tipos,['CER','DUAL-CER'])
+        cobrados=np.ones(antes.fechas.size,dtype=bool)
+        cobrados[self.inicio]=False
+
+        # Factores de capitalización, iguales en todos los caminos.
+        self.f_cap=factores_capitalizacion(int_tabla,f_horizonte,antes.fechas)
+        self.f_cap[self.inicio]=0
+
+        # Flujos a actualizar por CER y por tcA3500, con el mes y la fracción
+        # del mes del día con rezago de cada fecha de cobro.
+        self.cer=(tipos=='CER')[indice] & cobrados
+        self.dl=self.es_dl[indice] & cobrados
+        self.ubicacion_cer=proyectar_indice(self.plantilla_inf,i_cer_hoy,REZAGO_CER
+                                            ).ubicar(antes.fechas[self.cer])
+        self.ubicacion_dl=proyectar_indice(self.plantilla_dev,tcn_hoy,REZAGO_TC
+                                           ).ubicar(antes.fechas[self.dl])
+        indice_inicial=np.asarray(bonoss.indice_inicial.reindex(self.tickets),dtype=float)
+        self.base_cer=i_cer_hoy/indice_inicial[indice[self.cer]]
+        self.base_dl=tcn_hoy
+
+        # Precio de reventa con las plantillas. En cada camino se reescala por el
+        # índice al cierre del mes horizonte.
+        self.p_base=p_reventa_lote(despues,self.plantilla_inf,self.plantilla_dev,fecha1,
+                                   f_horizonte,i_cer_hoy,tcn_hoy,mercado=mercado,
+                                   as_of=ahora).values
+        self.mes_inf=self.plantilla_inf.posicion(f_horizonte)
+        self.mes_dev=self.plantilla_dev.posicion(f_horizonte)
+
+        vencimientos=np.array([np.datetime64(f,'D')
+                               for f in bonoss.f_vencimiento.reindex(self.tickets)])
+        self.vencido=np.datetime64(f_horizonte,'D')>=vencimientos
+        self.dias=(datetime.strptime(f_horizonte,'%Y-%m-%d')-ahora).days
+
+    def _por_ticket(self,factor):
+        import numpy as np
+
+        antes=self.antes
+        return (np.add.reduceat(factor*antes.cupones,self.inicio,axis=1),
+                np.add.reduceat(factor*antes.saldo,self.inicio,axis=1),
+                np.add.reduceat(factor*antes.flujo_total*self.f_cap,self.inicio,axis=1))
+
+    def _evaluar(self,tasas,acum,flujos,ubicacion,base,mes_h,acum_plantilla,ajustados):
+        import numpy as np
+
+        # Actualización de cada flujo en cada camino: el índice con rezago de su
+        # fecha de cobro, evaluado con las tasas de cada camino.
+        factor=np.ones((tasas.shape[0],self.antes.fechas.size))
+        mes,fraccion=ubicacion
+        r=tasas[:,mes]
+        factor[:,flujos]=base*(1+acum[:,mes])/(1+r)*(1+r)**fraccion
+        cupones,capital,futuro=self._por_ticket(factor)
+
+        reventa=np.tile(self.p_base,(tasas.shape[0],1))
+        reventa[:,ajustados]=reventa[:,ajustados]*(
+            (1+acum[:,[mes_h]])/(1+acum_plantilla[mes_h]))
+
+        return cupones,capital,futuro,reventa
+
+    def caminos_inflacion(self,tasas,acum):
+        """
+        Evalúa caminos de inflación (camino x mes de la plantilla). Devuelve los
+        cupones, el capital, el valor futuro de lo cobrado, y el precio de reven-
+        ta de cada camino (filas) y ticket (columnas). Sólo los tickets CER
+        dependen del camino.
+
+        """
+        return self._evaluar(tasas,acum,self.cer,self.ubicacion_cer,self.base_cer,
+                             self.mes_inf,self.plantilla_inf.acumuladas,self.es_cer)
+
+    def caminos_dev(self,tasas,acum):
+        """
+        Evalúa caminos de dep/dev, igual que 'caminos_inflacion'. Sólo los tickets
+        DL dependen del camino.
+
+        """
+        return self._evaluar(tasas,acum,self.dl,self.ubicacion_dl,self.base_dl,
+                             self.mes_dev,self.plantilla_dev.acumuladas,self.es_dl)
+
+    def rendimiento(self,inflacion,dev,combinaciones=False):
+        """
+        Combina los resultados de 'caminos_inflacion' y 'caminos_dev': los tickets
+        DL toman el camino de dep/dev y el resto el de inflación. Si
+        'combinaciones' es True, se evalúan todos los pares (inflación, dep/dev);
+        si no, el camino i de inflación va con el camino i de dep/dev.
+
+        Devuelve la lista con el rendimiento total anual, y la participación de
+        los cupones, los intereses por reinversión, y el capital o la reventa
+        (en tanto por uno), con un camino por fila y un ticket por columna.
+
+        """
+        import numpy as np
+
+        if combinaciones:
+            def combinar(inf,dev):
+                return np.where(self.es_dl,dev[None,:,:],inf[:,None,:]).reshape(
+                    -1,len(self.tickets))
+        else:
+            def combinar(inf,dev):
+                return np.where(self.es_dl,dev,inf)
+
+        total_cupones,capital,futuro,p_reventaa=[combinar(inf,dev)
+                                                 for inf,dev in zip(inflacion,dev)]
+        int_reinv=futuro-(total_cupones+capital)
+        cap_o_reventa=np.where(self.vencido,capital,p_reventaa)
+
+        # Se calcula y se anualiza la rentabilidad total.
+        total_ganado=total_cupones+int_reinv+cap_o_reventa
+        rent_total=total_ganado/self.monto_invertido-1
+        rent_total=(1+rent_total)**(365/self.dias)-1
+
+        return [rent_total,total_cupones/total_ganado,int_reinv/total_ganado,
+                cap_o_reventa/total_ganado]
+
+
+def grilla_rt(tabla_infla_esc,tabla_dev_esc,int_tabla,f_horizonte,i_cer_hoy,
+              tcn_hoy,fecha1,tem_base,t_var_tem,t_tc_base,var_t_tc,
+              monto_invertido=50_000,mercado=None,as_of=None):
+    """
+    Calcula el rendimiento total esperado de cada bono bullet y letra, como la
+    función 'analisis_rt', para todas las combinaciones de los parámetros de
+    los escenarios de inflación (tem_base, t_var_tem) y de dep/dev (t_tc_base,
+    var_t_tc). Se devuelven los dos tickets de cada bono DUAL.
+
+    PARAMETROS
+    ----------
+    tabla_infla_esc : DataFrame, obligatorio.
+    Descripción: Es una tabla de 'tabla_infla_esc' calculada una vez, con
+    cualquier escenario y la fecha horizonte 'f_horizonte'. Sólo se utilizan
+    sus meses, el mes anterior y el mes actual.
+
+    tabla_dev_esc : DataFrame, obligatorio.
+    Descripción: Es una tabla de 'tabla_dev_esc' calculada una vez, igual que
+    la anterior.
+
+    int_tabla : DataFrame, obligatorio.
+    Descripción: Es la serie de tasas mensuales esperadas (ver 'tasabadlar').
+
+    f_horizonte : String, obligatorio.
+    Descripción: Es la fecha horizonte, por ejemplo, '2024-06-15'.
+
+    i_cer_hoy, tcn_hoy : Float, obligatorio.
+    Descripción: Son el índice CER y el tipo de cambio A3500 de hoy.
+
+    fecha1 : String, obligatorio.
+    Descripción: Es la fecha de la pestaña del Excel llamado 'Bonoscurvas', por
+    ejemplo: '17-01-23'.
+
+    tem_base, t_var_tem : arrays de Floats, obligatorio.
+    Descripción: Son las inflaciones base y sus tasas de variación.
+
+    t_tc_base, var_t_tc : arrays de Floats, obligatorio.
+    Descripción: Son las tasas de dep/dev base y sus tasas de variación.
+
+    monto_invertido : Integer o Float, opcional
+    Descripción: Es la cantidad de dinero utilizada para comprar el bono/letra.
+    Por defecto es de 50_000.
+
+    mercado : MarketSnapshot, opcional.
+    Descripción: Es la foto del mercado (ver 'mercado.py'). Si no se indica, se
+    carga a partir de los archivos de la carpeta actual y la fecha 'fecha1'.
+
+    as_of : String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, igual que en 'analisis_rt'.
+
+    RESULTADO
+    -------
+    cubo_rt : DataFrame.
+    Descripción: Tiene un escenario por fila, identificado por los cuatro pará-
+    metros, y columnas en dos niveles: el concepto ('RT_Anual_Esp', 'Cupones',
+    'Int_Reinv' y 'Capital_o_Reventa', en porcentaje igual que en 'analisis_rt')
+    y el ticket. Por ejemplo, cubo_rt['RT_Anual_Esp'] es la matriz escenario x
+    ticket del rendimiento total anual esperado.
+
+    """
+    import numpy as np
+    import pandas as pd
+
+    evaluador=EvaluadorRT(tabla_infla_esc,tabla_dev_esc,int_tabla,f_horizonte,
+                          i_cer_hoy,tcn_hoy,fecha1,monto_invertido,mercado,as_of)
+
+    # Caminos de inflación y de dep/dev de todos los escenarios.
+    tasas_inf,acum_inf,_=caminos_lineales(evaluador.plantilla_inf,tem_base,t_var_tem)
+    tasas_dev,acum_dev,_=caminos_lineales(evaluador.plantilla_dev,t_tc_base,var_t_tc)
+
+    valores=evaluador.rendimiento(evaluador.caminos_inflacion(tasas_inf,acum_inf),
+                                  evaluador.caminos_dev(tasas_dev,acum_dev),
+                                  combinaciones=True)
+
+    escenarios=pd.MultiIndex.from_product(
+        [np.asarray(tem_base,dtype=float),np.asarray(t_var_tem,dtype=float),
+         np.asarray(t_tc_base,dtype=float),np.asarray(var_t_tc,dtype=float)],
+        names=['tem_base','t_var_tem','t_tc_base','var_t_tc'])
+    cubo_rt=pd.concat([pd.DataFrame(np.round(valor*100,2),index=escenarios,
+                                    columns=pd.Index(evaluador.tickets,name='Ticket'))
+                       for valor in valores],axis=1,keys=CONCEPTOS)
+
+    return cubo_rt
@@ -0,0 +1,231 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                    SIMULACION DE UNA ESTRATEGIA DE INVERSION
+#
+#             Recorre las fechas de 'Bonoscurvas.xlsx' y simula una regla
+#          del tipo "mantener los N bonos de mayor 'RT_Anual_Esp' y rebalan-
+#          cear una vez por mes". En cada rebalanceo la cartera se arma, en
+#          partes iguales, con los primeros N tickets de la tabla de
+#          'analisis_rt' de ese día (ver 'backtest.py'); entre rebalanceos se
+#          valúa con los precios de cada fecha y se cobran los cupones y el
+#          capital del cronograma de pagos, actualizados por el CER o el
+#          tcA3500 efectivamente publicados. Para cada período se compara el
+#                 rendimiento obtenido con el que se esperaba.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+
+def _cobros(cubo,bonos,serie_cer,serie_tca3500,desde,hasta):
+    """
+    Devuelve lo cobrado por cada 100 de valor nominal de cada ticket del cubo
+    entre las fechas 'desde' (excluida) y 'hasta' (incluida), con los flujos de
+    los bonos CER y DL actualizados por el índice publicado de cada fecha de
+    cobro, con el mismo rezago que en 'analisis_rt'. Como en 'flujobono_act',
+    los flujos anteriores al horizonte de los demás tipos (por ejemplo,
+    'DUAL-CER') no se actualizan, para que lo cobrado se compare con el
+    'RT_Anual_Esp' calculado del mismo modo.
+
+    """
+    import numpy as np
+    import pandas as pd
+    from indices import REZAGO_CER, REZAGO_TC
+
+    en_periodo=(cubo.fechas>np.datetime64(desde,'D')) & (cubo.fechas<=np.datetime64(hasta,'D'))
+    indice=cubo.indice_ticket[en_periodo]
+    fechas=cubo.fechas[en_periodo]
+    flujo=cubo.flujo_total[en_periodo]
+
+    tipos=np.asarray(bonos.tipo_bono2.reindex(cubo.tickets))[indice]
+    factor=np.ones(flujo.size)
+    for tipo,serie,rezago,base in [('CER',serie_cer,REZAGO_CER,'indice_inicial'),
+                                   ('DL',serie_tca3500,REZAGO_TC,None)]:
+        mascara=tipos==tipo
+        if not mascara.any():
+            continue
+        dias=pd.DatetimeIndex(fechas[mascara]-np.timedelta64(rezago,'D'))
+        valores=serie.iloc[:,0].sort_index()
+        valores=np.asarray(valores.reindex(dias,method='ffill'),dtype=float)
+        if base is not None:
+            valores=valores/np.asarray(bonos[base].reindex(cubo.tickets),
+                                       dtype=float)[indice[mascara]]
+        factor[mascara]=valores
+
+    return pd.Series(np.bincount(indice,weights=flujo*factor,minlength=len(cubo)),
+                     index=cubo.tickets)
+
+
+def simular_estrategia(parametros_dev,cantidad=3,rebalanceo='M',fechas=None,
+                       ranking=None,plazo_meses=6,capital_inicial=100_000,n_jobs=1,
+                       directorio='.',nombre_archivo='Bonoscaracteristicas',
+                       nombre_archivo_curvas='Bonoscurvas',
+                       nombre_archivo_cer='Serie CER',nombre_archivo_tc='A3500',
+                       nombre_archivo_rem='REM'):
+    """
+    Simula la estrategia de mantener los 'cantidad' bonos de mayor rendimiento
+    total esperado, rebalanceando la cartera en partes iguales en la primera
+    fecha disponible de cada período. Entre rebalanceos la cartera se valúa
+    con los precios de cada fecha; lo cobrado en cupones y capital queda en
+    efectivo hasta el siguiente rebalanceo.
+
+    PARAMETROS
+    ----------
+    parametros_dev: Diccionario, obligatorio.
+    Descripción: Son los argumentos de 'tabla_dev' que definen la dep/dev
+    esperada (ver 'backtest_rt').
+
+    cantidad: Integer, opcional.
+    Descripción: Es la cantidad de bonos de la cartera. Por defecto es 3.
+
+    rebalanceo: String, opcional.
+    Descripción: Es la frecuencia de rebalanceo, con los códigos de período de
+    pandas: 'M' (mensual, por defecto), 'Q' (trimestral), 'W' (semanal), etc.
+
+    fechas: lista de Strings, opcional.
+    Descripción: Son las fechas de las pestañas a recorrer. Por defecto, todas
+    las disponibles (ver 'fechas_disponibles').
+
+    ranking: DataFrame o String, opcional.
+    Descripción: Es el resultado de 'backtest_rt' (o la ruta de su archivo
+    CSV). Si se indica, las tablas de cada rebalanceo se toman de aquí y no se
+    vuelven a calcular. Si no, se calculan con 'backtest_rt' sólo para las
+    fechas de rebalanceo.
+
+    plazo_meses: Integer, opcional.
+    Descripción: Es el plazo de la fecha horizonte de 'analisis_rt' en cada
+    rebalanceo. Por defecto es 6.
+
+    capital_inicial: Integer o Float, opcional.
+    Descripción: Es el monto con el que se arma la primera cartera. Por
+    defecto es 100.000.
+
+    n_jobs: Integer, opcional.
+    Descripción: Es la cantidad de fechas de rebalanceo que se calculan en
+    paralelo (ver 'backtest_rt').
+
+    directorio, nombre_archivo, nombre_archivo_curvas, nombre_archivo_cer,
+    nombre_archivo_tc, nombre_archivo_rem: Strings, opcional.
+    Descripción: Son la carpeta y los nombres de los libros de excel, igual que
+    en 'backtest_rt'.
+
+    RESULTADO
+    -------
+    periodos: DataFrame.
+    Descripción: Tiene una fila por período entre rebalanceos, con los tickets
+    de la cartera, el valor al inicio y al final, el rendimiento obtenido
+    ('RT_Real', en %), el mismo anualizado ('RT_Anual_Real') y el promedio de
+    'RT_Anual_Esp' de los bonos elegidos.
+
+    valuacion: DataFrame.
+    Descripción: Es el valor de la cartera y el efectivo en cada fecha.
+
+    """
+    import numpy as np
+    import pandas as pd
+    from datetime import datetime
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+    from flujos import construir_cubo
+    from backtest import (fechas_disponibles, backtest_rt, _leer_curvas,
+                          _precios_fecha, _datos_fijos)
+
+    if fechas is None:
+        fechas=fechas_disponibles(directorio,nombre_archivo_curvas)
+    dias=pd.DatetimeIndex([datetime.strptime(f,'%d-%m-%y') for f in fechas])
+    orden=np.argsort(dias,kind='mergesort')
+    fechas=[fechas[i] for i in orden]
+    dias=dias[orden]
+
+    # Primera fecha de cada período de rebalanceo.
+    periodo=dias.to_period(rebalanceo)
+    es_rebalanceo=~periodo.duplicated()
+    rebalanceos=[f for f,r in zip(fechas,es_rebalanceo) if r]
+
+    if ranking is None:
+        ranking=backtest_rt(parametros_dev,fechas=rebalanceos,plazo_meses=plazo_meses,
+                            n_jobs=n_jobs,directorio=directorio,
+                            nombre_archivo=nombre_archivo,
+                            nombre_archivo_curvas=nombre_archivo_curvas,
+                            nombre_archivo_cer=nombre_archivo_cer,
+                            nombre_archivo_tc=nombre_archivo_tc,
+                            nombre_archivo_rem=nombre_archivo_rem)
+    elif isinstance(ranking,str):
+        ranking=pd.read_csv(ranking)
+    ranking=ranking.assign(fecha=pd.to_datetime(ranking.fecha))
+    tablas={fecha:tabla.sort_values('RT_Anual_Esp',ascending=False,kind='mergesort')
+            for fecha,tabla in ranking.groupby('fecha')}
+
+    bonos,serie_cer,serie_tca3500,_=_datos_fijos(directorio,nombre_archivo,
+                                                 nombre_archivo_cer,nombre_archivo_tc,
+                                                 None)
+
+    # El cronograma de pagos de todos los bonos se arma una sola vez, desde la
+    # primera fecha.
+    cubo=construir_cubo(bonos,dias[0])
+    vencimientos=pd.to_datetime(bonos.f_vencimiento)
+
+    vn=pd.Series(0.,index=bonos.index)
+    efectivo=float(capital_inicial)
+    valuacion=[]
+    periodos=[]
+    actual=None
+    anterior=None
+
+    ruta_curvas=f'{directorio}/{nombre_archivo_curvas}.xlsx'
+    with ThreadPoolExecutor(max_workers=1) as lector:
+        # Las curvas de la fecha siguiente se leen mientras se valúa la actual.
+        siguientes=deque(lector.submit(_leer_curvas,ruta_curvas,f) for f in fechas[:2])
+
+        for i,(fecha1,dia) in enumerate(zip(fechas,dias)):
+            curvas=siguientes.popleft().result()
+            if i+2<len(fechas):
+                siguientes.append(lector.submit(_leer_curvas,ruta_curvas,fechas[i+2]))
+            precios=_precios_fecha(bonos,curvas).precio.astype(float)
+
+            # Cupones y capital cobrados desde la fecha anterior.
+            if anterior is not None:
+                cobrado=_cobros(cubo,bonos,serie_cer,serie_tca3500,anterior,dia)
+                efectivo+=float((vn.reindex(cobrado.index,fill_value=0)*cobrado).sum()/100)
+            vigentes=vencimientos>dia
+            vn[~vigentes]=0.
+            valor=efectivo+float((vn*precios.fillna(0)).sum()/100)
+            valuacion.append({'fecha':dia,'valor':valor,'efectivo':efectivo})
+            anterior=dia
+
+            if not es_rebalanceo[i] or dia not in tablas:
+                continue
+
+            if actual is not None:
+                actual.update(fecha_fin=dia,valor_final=valor)
+                periodos.append(actual)
+
+            # Rebalanceo en partes iguales entre los primeros tickets con precio.
+            tabla=tablas[dia]
+            tabla=tabla.loc[tabla.Ticket.isin(precios.index[precios.notna() & vigentes])]
+            elegidos=tabla.head(cantidad)
+            vn[:]=0.
+            if len(elegidos):
+                monto=valor/len(elegidos)
+                vn.loc[elegidos.Ticket]=monto/precios.loc[elegidos.Ticket].values*100
+                efectivo=0.
+            else:
+                efectivo=valor
+            actual={'fecha_inicio':dia,'tickets':', '.join(elegidos.Ticket),
+                    'valor_inicial':valor,
+                    'RT_Anual_Esp':float(elegidos.RT_Anual_Esp.mean())
+                    if len(elegidos) else np.nan}
+
+    if actual is not None:
+        actual.update(fecha_fin=anterior,valor_final=valor)
+        periodos.append(actual)
+
+    periodos=pd.DataFrame(periodos,columns=['fecha_inicio','fecha_fin','tickets',
+                                            'valor_inicial','valor_final','RT_Anual_Esp'])
+    plazo=(periodos.fecha_fin-periodos.fecha_inicio).dt.days
+    rt=periodos.valor_final/periodos.valor_inicial
+    periodos['RT_Real']=np.round((rt-1)*100,2)
+    periodos['RT_Anual_Real']=np.round((rt**(365/plazo.where(plazo>0))-1)*100,2)
+    periodos['RT_Anual_Esp']=np.round(periodos.RT_Anual_Esp,2)
+    valuacion=pd.DataFrame(valuacion).set_index('fecha')
+
+    return periodos,valuacion
@@ -0,0 +1,478 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                     CRONOGRAMA DE PAGOS DE BONOS Y LETRAS
+#
+#             Construye en una sola pasada, con aritmética de fechas de
+#          NumPy (datetime64), el cronograma completo de pagos de un bono
+#          bullet o de una letra, y lo divide en el tramo anterior y el
+#          tramo posterior a la fecha horizonte. Las funciones 'ffbonocap'
+#          y 'ffbonodesc' de 'funciones.py' devuelven cada uno de estos
+#          tramos. 'construir_cubo' genera los flujos de todo el universo
+#          de bonos de una vez, guardados por ticket en arrays contiguos.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+from perfil import medido
+
+
+def calendario_pagos(cupon1,cupon2,f_vencimiento,t_cupon,tipo,c_cupones,ahora,
+                     vn=100):
+    """
+    Genera las fechas de pago de un bono bullet o de una letra desde hoy hasta
+    el vencimiento, junto con los montos de cupón y de capital de cada fecha.
+    La primera fecha es siempre la actual, con pagos iguales a cero.
+
+    PARAMETROS
+    ----------
+    cupon1, cupon2: String.
+    Descripción: Son el mes y día de pago de los cupones de cada año, por
+    ejemplo: '05-09' y '11-09'. Las letras no los utilizan.
+
+    f_vencimiento: String o datetime.
+    Descripción: Es la fecha de vencimiento del bono, por ejemplo: '2026-11-09'.
+
+    t_cupon: Float.
+    Descripción: Es la tasa del cupón anual en porcentaje, por ejemplo, 8.
+
+    tipo: String.
+    Descripción: Es el tipo de bono, 'bullet' o 'letra'.
+
+    c_cupones: Integer.
+    Descripción: Indica si la letra paga renta junto con el capital (1) o si es
+    un cupón cero (0).
+
+    ahora: datetime.
+    Descripción: Es la fecha actual, desde donde comienza el cronograma.
+
+    vn: Float, opcional.
+    Descripción: Es el valor nominal, por defecto 100.
+
+    RESULTADO
+    -------
+    fechas, cupones, saldo: arrays de NumPy.
+    Descripción: Son las fechas de pago (datetime64[D]) ordenadas, y los montos
+    de cupón y de capital que se cobran en cada una de ellas.
+
+    """
+    from datetime import datetime
+    import numpy as np
+
+    hoy=np.datetime64(ahora,'D')
+    f_vencimiento=np.datetime64(f_vencimiento,'D')
+
+    if tipo=='bullet':
+        # Fechas de pago de los dos cupones de cada año, desde el año actual
+        # hasta el año de vencimiento.
+        años=np.arange(hoy.astype('datetime64[Y]').astype(int)+1970,
+                       f_vencimiento.astype('datetime64[Y]').astype(int)+1971)
+        fechas_cupon=[]
+        for cupon in [cupon1,cupon2]:
+            mes,dia=[int(x) for x in cupon.split('-')]
+            # Se valida que el día exista en el mes (igual que con strptime).
+            datetime(2000,mes,dia)
+            meses=((años-1970)*12+mes-1).astype('datetime64[M]')
+            fechas_cupon.append(meses.astype('datetime64[D]')+(dia-1))
+        fechas_cupon=np.sort(np.concatenate(fechas_cupon))
+        fechas_cupon=fechas_cupon[(fechas_cupon>=hoy) & (fechas_cupon<=f_vencimiento)]
+
+        fechas=np.concatenate([[hoy],fechas_cupon])
+        cupones=np.full(fechas.size,vn*t_cupon/200)
+        saldo=np.zeros(fechas.size)
+
+        # El capital se paga junto con el último cupón o, si el vencimiento es
+        # posterior, en una fecha adicional sin cupón.
+        if f_vencimiento>fechas[-1]:
+            fechas=np.append(fechas,f_vencimiento)
+            cupones=np.append(cupones,0.0)
+            saldo=np.append(saldo,float(vn))
+        elif f_vencimiento==fechas[-1]:
+            saldo[-1]=vn
+
+        # La fecha actual debe tener un pago igual a cero.
+        cupones[0]=0
+        saldo[0]=0
+
+    else:
+        fechas=np.array([hoy,f_vencimiento])
+        cupones=np.zeros(2)
+        saldo=np.zeros(2)
+
+        vence=fechas==f_vencimiento
+        saldo[vence]=vn
+        if c_cupones==1:
+            cupones[vence]=vn*t_cupon/100
+
+    return fechas,cupones,saldo
+
+
+@medido()
+def cronograma_bono(cupon1,cupon2,f_vencimiento,f_horizonte,t_cupon,tipo,
+                    c_cupones,vn=100,ahora=None):
+    """
+    Construye el flujo de fondos completo de un bono bullet o de una letra, le
+    agrega la fecha horizonte, y lo divide en el flujo anterior y el posterior
+    a dicha fecha (ambos incluyen la fecha horizonte). Los argumentos son los
+    mismos que los de 'ffbonocap' y 'ffbonodesc'.
+
+    PARAMETROS
+    ----------
+    f_horizonte: String.
+    Descripción: Es la fecha horizonte de inversión, por ejemplo: '2024-03-01'.
+
+    ahora: String o datetime, opcional.
+    Descripción: Es la fecha de cálculo (ver 'fecha_calculo' en 'calendario.py').
+    Por defecto se utiliza la fecha de hoy.
+
+    (El resto de los parámetros se describe en 'calendario_pagos'.)
+
+    RESULTADO
+    -------
+    flujo_bis, flujo_bis2: DataFrames.
+    Descripción: Son el flujo de fondos (cupones, saldo, y flujo_total) hasta
+    la fecha horizonte y el flujo de fondos desde la fecha horizonte.
+
+    """
+    from datetime import datetime
+    import numpy as np
+    import pandas as pd
+    from calendario import fecha_calculo
+
+    if tipo not in ['bullet','letra']:
+        flujo_bis='El parámetro tipo es -bullet- o -letra- no hay otra opcion'
+        return flujo_bis,flujo_bis
+
+    ahora=fecha_calculo(ahora)
+    ahora=datetime(ahora.year,ahora.month,ahora.day)
+
+    fechas,cupones,saldo=calendario_pagos(cupon1,cupon2,f_vencimiento,t_cupon,
+                                          tipo,c_cupones,ahora,vn)
+
+    # Incorporamos la fecha horizonte, con pagos iguales a cero, si no es una
+    # fecha de pago. En las letras se incorpora siempre que no sea la fecha de
+    # vencimiento.
+    f_horizonte=np.datetime64(datetime.strptime(f_horizonte,'%Y-%m-%d'),'D')
+    if (tipo=='bullet' and f_horizonte not in fechas) or (
+            tipo=='letra' and f_horizonte!=fechas[-1]):
+        posicion=np.searchsorted(fechas,f_horizonte,side='right')
+        fechas=np.insert(fechas,posicion,f_horizonte)
+        cupones=np.insert(cupones,posicion,0.0)
+        saldo=np.insert(saldo,posicion,0.0)
+
+    flujo=pd.DataFrame({'cupones':cupones,'saldo':saldo,'flujo_total':cupones+saldo},
+                       index=pd.DatetimeIndex(fechas.astype('datetime64[ns]'),name='fecha'))
+
+    # Se divide el flujo con búsqueda binaria sobre las fechas (ordenadas).
+    hasta=np.searchsorted(fechas,f_horizonte,side='right')
+    desde=np.searchsorted(fechas,f_horizonte,side='left')
+    flujo_bis=flujo.iloc[:hasta].copy()
+    flujo_bis2=flujo.iloc[desde:].copy()
+
+    return flujo_bis,flujo_bis2
+
+
+class CuboFlujos:
+    """
+    Guarda en forma compacta (por filas comprimidas, al estilo CSR) el flujo de
+    fondos de muchos bonos a la vez. Los flujos del ticket i ocupan las posi-
+    ciones offsets[i]:offsets[i+1] de los arrays 'fechas', 'cupones' y 'saldo',
+    ordenados por fecha. Los montos corresponden a 100 de valor nominal.
+
+    Se construye con 'construir_cubo'.
+
+    PARAMETROS
+    ----------
+    tickets: array de Strings.
+    Descripción: Son los tickets de los bonos, en el orden del cubo.
+
+    offsets: array de Integers.
+    Descripción: Es la posición donde comienza el flujo de cada ticket. Tiene
+    un elemento más que 'tickets'.
+
+    fechas: array de datetime64[D].
+    Descripción: Son las fechas de pago de todos los tickets, una tras otra.
+
+    cupones, saldo: arrays de Floats.
+    Descripción: Son los montos de cupón y de capital de cada fecha.
+
+    """
+
+    def __init__(self,tickets,offsets,fechas,cupones,saldo):
+        self.tickets=tickets
+        self.offsets=offsets
+        self.fechas=fechas
+        self.cupones=cupones
+        self.saldo=saldo
+        self._posicion={ticket:i for i,ticket in enumerate(tickets)}
+
+    def __len__(self):
+        return len(self.tickets)
+
+    @property
+    def flujo_total(self):
+        return self.cupones+self.saldo
+
+    @property
+    def indice_ticket(self):
+        """
+        Devuelve, para cada flujo del cubo, la posición de su ticket.
+
+        """
+        import numpy as np
+
+        return np.repeat(np.arange(len(self.tickets)),np.diff(self.offsets))
+
+    def tramo(self,ticket):
+        """
+        Devuelve las fechas, los cupones y el saldo de un ticket.
+
+        """
+        i=self._posicion[ticket]
+        desde,hasta=self.offsets[i],self.offsets[i+1]
+        return self.fechas[desde:hasta],self.cupones[desde:hasta],self.saldo[desde:hasta]
+
+    def flujo(self,ticket,vn=100):
+        """
+        Devuelve el flujo de fondos de un ticket como DataFrame, con el mismo
+        formato que 'ffbonocap' y 'ffbonodesc', para el valor nominal 'vn'.
+
+        """
+        import pandas as pd
+
+        fechas,cupones,saldo=self.tramo(ticket)
+        escala=vn/100
+        return pd.DataFrame({'cupones':cupones*escala,'saldo':saldo*escala,
+                             'flujo_total':(cupones+saldo)*escala},
+                            index=pd.DatetimeIndex(fechas.astype('datetime64[ns]'),
+                                                   name='fecha'))
+
+    def dividir(self,f_horizonte):
+        """
+        Agrega la fecha horizonte al flujo de cada ticket (si no es una fecha de
+        pago) y divide el cubo en el tramo anterior y el posterior a dicha fecha.
+        Ambos tramos incluyen la fecha horizonte, igual que 'cronograma_bono'.
+
+        PARAMETROS
+        ----------
+        f_horizonte: String.
+        Descripción: Es la fecha horizonte, por ejemplo: '2024-03-01'.
+
+        RESULTADO
+        -------
+        antes, despues: CuboFlujos.
+        Descripción: Son los cubos con los flujos hasta y desde la fecha horizonte.
+
+        """
+        import numpy as np
+
+        h=np.datetime64(f_horizonte,'D')
+        n=len(self.tickets)
+        indice=self.indice_ticket
+
+        # Tickets que no tienen un pago en la fecha horizonte.
+        presentes=np.bincount(indice[self.fechas==h],minlength=n)
+        faltantes=np.flatnonzero(presentes==0)
+
+        indice=np.concatenate([indice,faltantes])
+        fechas=np.concatenate([self.fechas,np.full(faltantes.size,h)])
+        cupones=np.concatenate([self.cupones,np.zeros(faltantes.size)])
+        saldo=np.concatenate([self.saldo,np.zeros(faltantes.size)])
+        orden=np.lexsort((fechas,indice))
+        indice,fechas,cupones,saldo=indice[orden],fechas[orden],cupones[orden],saldo[orden]
+
+        tramos=[]
+        for mascara in [fechas<=h,fechas>=h]:
+            cantidad=np.bincount(indice[mascara],minlength=n)
+            tramos.append(CuboFlujos(self.tickets,
+                                     np.concatenate([[0],np.cumsum(cantidad)]),
+                                     fechas[mascara],cupones[mascara],saldo[mascara]))
+
+        return tramos[0],tramos[1]
+
+
+@medido()
+def construir_cubo(bonos,ahora=None):
+    """
+    Construye de una sola vez el flujo de fondos (por 100 de valor nominal) de
+    todos los bonos bullet y letras del universo, con operaciones sobre arrays
+    en lugar de un DataFrame por ticket. Sigue las mismas reglas que
+    'calendario_pagos'.
+
+    PARAMETROS
+    ----------
+    bonos: DataFrame, obligatorio.
+    Descripción: Son las características de los bonos, con el ticket como
+    índice (por ejemplo, 'MarketSnapshot.bonos'). Los bonos que no son 'bullet'
+    ni 'letra' se descartan.
+
+    ahora: String o datetime, opcional.
+    Descripción: Es la fecha de cálculo (ver 'fecha_calculo' en 'calendario.py').
+    Por defecto se utiliza la fecha de hoy.
+
+    RESULTADO
+    -------
+    cubo: CuboFlujos.
+    Descripción: Es el cubo con los flujos de todos los tickets.
+
+    """
+    from datetime import datetime
+    import numpy as np
+    from calendario import fecha_calculo
+
+    ahora=fecha_calculo(ahora)
+    hoy=np.datetime64(datetime(ahora.year,ahora.month,ahora.day),'D')
+
+    bonos=bonos.loc[bonos.tipo_bono1.isin(['bullet','letra'])]
+    tickets=np.asarray(bonos.index)
+    n=len(tickets)
+    venc=np.array([np.datetime64(f,'D') for f in bonos.f_vencimiento])
+    t_cupon=np.asarray(bonos.tasa_cupon_anual,dtype=float)
+    c_cupones=np.asarray(bonos.tipo_bono3)
+    bullet=np.asarray(bonos.tipo_bono1=='bullet')
+
+    # Fila de la fecha actual, con pagos iguales a cero, para todos los tickets.
+    indices=[np.arange(n)]
+    fechas=[np.full(n,hoy)]
+    cupones=[np.zeros(n)]
+    saldos=[np.zeros(n)]
+
+    # Bonos bullet: dos cupones por año desde el año actual hasta el vencimiento.
+    b=np.flatnonzero(bullet)
+    año_hoy=hoy.astype('datetime64[Y]').astype(int)+1970
+    cant_años=np.maximum(venc[b].astype('datetime64[Y]').astype(int)+1970-año_hoy+1,0)
+    rep=np.repeat(b,cant_años)
+    años=año_hoy+np.arange(rep.size)-np.repeat(np.cumsum(cant_años)-cant_años,cant_años)
+
+    ultimo=np.full(n,hoy)
+    for columna in ['cupon1','cupon2']:
+        mes_dia=np.array([[int(x) for x in c.split('-')] for c in bonos[columna].iloc[b]],
+                         dtype=int).reshape(-1,2)
+        mes=np.repeat(mes_dia[:,0],cant_años)
+        dia=np.repeat(mes_dia[:,1],cant_años)
+        f_cupon=((años-1970)*12+mes-1).astype('datetime64[M]').astype('datetime64[D]')+(dia-1)
+        validos=(f_cupon>=hoy) & (f_cupon<=venc[rep])
+
+        indices.append(rep[validos])
+        fechas.append(f_cupon[validos])
+        cupones.append(100*t_cupon[rep[validos]]/200)
+        # El capital se paga con el cupón que coincide con el vencimiento.
+        saldos.append(np.where(f_cupon[validos]==venc[rep[validos]],100.0,0.0))
+
+        # Fecha del último cupón de cada ticket.
+        ultimo_int=ultimo.astype(np.int64)
+        np.maximum.at(ultimo_int,rep[validos],f_cupon[validos].astype(np.int64))
+        ultimo=ultimo_int.astype('datetime64[D]')
+
+    # Bonos bullet cuyo vencimiento es posterior al último cupón: el capital se
+    # paga en una fecha adicional.
+    capital=b[venc[b]>ultimo[b]]
+    indices.append(capital)
+    fechas.append(venc[capital])
+    cupones.append(np.zeros(capital.size))
+    saldos.append(np.full(capital.size,100.0))
+
+    # Letras: capital, y renta si corresponde, al vencimiento.
+    l=np.flatnonzero(~bullet)
+    indices.append(l)
+    fechas.append(venc[l])
+    cupones.append(np.where(c_cupones[l]==1,t_cupon[l],0.0))
+    saldos.append(np.full(l.size,100.0))
+
+    # Se ordenan los flujos por ticket y por fecha (la fecha actual primero).
+    prioridad=np.concatenate([np.zeros(n,dtype=int)]+[np.ones(x.size,dtype=int)
+                                                     for x in indices[1:]])
+    indices=np.concatenate(indices)
+    fechas=np.concatenate(fechas)
+    cupones=np.concatenate(cupones)
+    saldos=np.concatenate(saldos)
+    orden=np.lexsort((prioridad,fechas,indices))
+
+    offsets=np.concatenate([[0],np.cumsum(np.bincount(indices,minlength=n))])
+
+    return CuboFlujos(tickets,offsets,fechas[orden],cupones[orden],saldos[orden])
+
+
+def factores_capitalizacion(serie_t,f_horizonte,fechas):
+    """
+    Calcula el factor de capitalización de cada fecha de cobro hasta la fecha
+    horizonte, reinvirtiendo a las tasas mensuales de 'serie_t'. Los factores se
+    obtienen de un único array con el crecimiento logarítmico acumulado mes a
+    mes, donde cada fecha se ubica con 'searchsorted'; por eso las fechas pueden
+    ser las de muchos tickets juntos.
+
+    Sigue las mismas convenciones que 'capflujos': el flujo se capitaliza por la
+    fracción (30-día)/30 de su mes de cobro, por los meses completos siguientes,
+    y por la fracción día/30 del mes horizonte. Los meses posteriores al último
+    de la serie usan su última tasa.
+
+    PARAMETROS
+    ----------
+    serie_t: DataFrame.
+    Descripción: Es la serie de tasas mensuales esperadas, con el primer día de
+    cada mes como índice (ver 'tasabadlar').
+
+    f_horizonte: String.
+    Descripción: Es la fecha horizonte, por ejemplo: '2024-03-01'.
+
+    fechas: array de fechas.
+    Descripción: Son las fechas de cobro, ninguna posterior a la fecha horizonte.
+
+    RESULTADO
+    -------
+    factores: array de Floats.
+    Descripción: Es el factor de capitalización de cada fecha.
+
+    """
+    import numpy as np
+
+    fechas=np.asarray(fechas,dtype='datetime64[D]')
+    h=np.datetime64(f_horizonte,'D')
+    mes_h=h.astype('datetime64[M]').astype(int)
+    dia_h=(h-h.astype('datetime64[M]').astype('datetime64[D]')).astype(int)+1
+
+    meses_serie=np.asarray(serie_t.index,dtype='datetime64[M]').astype(int)
+    tasas_serie=np.asarray(serie_t.iloc[:,0],dtype=float)
+
+    meses=fechas.astype('datetime64[M]')
+    dias=(fechas-meses.astype('datetime64[D]')).astype(int)+1
+    meses=meses.astype(int)
+
+    # Tasa de cada mes, desde el primero necesario hasta el mes horizonte.
+    inicio=min(meses_serie[0],meses.min(initial=mes_h))
+    grilla=np.arange(inicio,max(meses_serie[-1],mes_h)+1)
+    posicion=np.clip(np.searchsorted(meses_serie,grilla,side='right')-1,0,
+                     meses_serie.size-1)
+    tasas=tasas_serie[posicion]
+    log_acum=np.cumsum(np.log1p(tasas))
+
+    j=meses-inicio
+    k=mes_h-inicio
+
+    # Crecimiento desde el fin del mes de cobro hasta el fin del mes horizonte,
+    # corregido por la fracción de ambos meses.
+    factores=np.exp(log_acum[k]-log_acum[j])
+    factores=factores*(1+tasas[j])**((30-dias)/30)
+    factores=factores*(1+tasas[k])**(dia_h/30-1)
+
+    return factores
+
+
+def capitalizar_cubo(serie_t,f_horizonte,cubo):
+    """
+    Capitaliza hasta la fecha horizonte los flujos de todos los tickets de un
+    cubo (por ejemplo, el tramo 'antes' de 'CuboFlujos.dividir'), con una sola
+    llamada a 'factores_capitalizacion'. Igual que en 'capflujos', la primera
+    fecha de cada ticket (la fecha actual) no se capitaliza.
+
+    RESULTADO
+    -------
+    f_t_futuro: array de Floats.
+    Descripción: Es el valor en la fecha horizonte de cada flujo del cubo.
+
+    """
+    import numpy as np
+
+    factores=factores_capitalizacion(serie_t,f_horizonte,cubo.fechas)
+    factores[cubo.offsets[:-1][np.diff(cubo.offsets)>0]]=0
+
+    return cubo.flujo_total*factores
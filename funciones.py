@@ -1,6 +1,6 @@
 # ----------------------------------------------------------------------------
 # ----------------------------------------------------------------------------
-#                           INDICE - HAY 12 FUNCIONES
+#                           INDICE - HAY 14 FUNCIONES
 #
 #                 Las funciones construidas aquí tienen por objeto
 #             completar un análisis de rentabilidad total (renta fija)
@@ -95,26 +95,53 @@
 #                          cobro de intereses por reinversión, y cobro por reventa
 #                          o por cobro de capital.   
 # 
+# FUNCION 13: Línea 1929.
+#             Nombre: p_reventa_lote
+#             Descripción: Genera de una sola vez el precio de reventa esperado
+#                          de muchos activos de renta fija, como la función 11.
+#
+# FUNCION 14: Línea 2089.
+#             Nombre: analisis_rt_horizons
+#             Descripción: Genera la tabla de rendimiento total esperado de la
+#                          función 12 para muchas fechas horizonte a la vez.
+#
 # ----------------------------------------------------------------------------
 # ----------------------------------------------------------------------------
 
+from perfil import medido
+from cache import memorizado
+
+# Días de la serie del A3500 con los que se calcula la dep/dev del mes anterior
+# cuando éste es enero o diciembre: desde el día 2 y, en diciembre, hasta el
+# día 30. En los demás meses se toma del primer al último día del mes.
+DIA_INICIO_A3500_ENE_DIC=2
+DIA_FIN_A3500_DIC=30
+
 #                                   FUNCION 1
     
-def tasabadlar(directorio, nombre_archivo):
+@medido()
+@memorizado
+def tasabadlar(directorio=None, nombre_archivo=None, mercado=None):
     """
     Esta funcion genera un dataframe con las tasas badlar mensuales esperadas.
     La base de datos que utiliza es el REM, por ello, los únicos argumentos son  
     la ubicacion del archivo y su nombre (del que se descarga del BCRA). 
+    Alternativamente, se puede pasar en 'mercado' un MarketSnapshot que ya
+    contenga la tabla del REM importada (ver 'mercado.py').
     
     """
     from datetime import datetime
     import pandas as pd
+    from cache import leer_excel
 
     # Descargamos el archivo de tasa badlar del REM, es un excel, y le cambiamos 
     # el nombre. Luego lo importamos:
-    badlar=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx',
-                         sheet_name='Resultados TOP 10',header=31,
-                         usecols='B:D',nrows=8)
+    if mercado is None:
+        badlar=leer_excel(f'{directorio}/{nombre_archivo}.xlsx',
+                             sheet_name='Resultados TOP 10',header=31,
+                             usecols='B:D',nrows=8)
+    else:
+        badlar=mercado.rem.copy()
 
     # Cambiamos las fechas, reemplazando su día 30 o 31 por el primero de cada 
     # mes.
@@ -127,8 +154,8 @@ def tasabadlar(directorio, nombre_archivo):
     badlar.Promedio=badlar.Promedio*30/365/100
     badlar['acumulado']=(badlar.Promedio+1).cumprod()
     badlar.set_index('Período',inplace=True)
-    tasa_deducida=((badlar.Promedio[-2]+1)**(365/30)/badlar.acumulado[-3])**(1/6)-1
-    tasa_estimada=badlar.Promedio[-2]
+    tasa_deducida=((badlar.Promedio.iloc[-2]+1)**(365/30)/badlar.acumulado.iloc[-3])**(1/6)-1
+    tasa_estimada=badlar.Promedio.iloc[-2]
 
     # Creamos la nueva tabla. Paso 1/2:
     tasas=badlar.Promedio
@@ -165,8 +192,10 @@ def tasabadlar(directorio, nombre_archivo):
 
 #                                   FUNCION 2
 
+@medido()
+@memorizado
 def ffbonocap(cupon1,cupon2,f_vencimiento,f_horizonte,t_cupon,tipo,
-                  c_cupones,vn=100):
+                  c_cupones,vn=100,as_of=None):
     """
     Función útil para obtener el flujo de fondos hasta la fecha horizonte de 
     un bono cupón cero, bonos bullet, o incluso un bono que paga sólo un cupón
@@ -214,6 +243,11 @@ def ffbonocap(cupon1,cupon2,f_vencimiento,f_horizonte,t_cupon,tipo,
     como el monto de dinero invertido dividido el precio de compra y multiplicado
     por el valor nominal. 
 
+    as_of: String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, que reemplaza a la fecha de hoy. Por
+    ejemplo, '2024-06-15'. Si no se indica, se usa el día de hoy (ver
+    'fecha_calculo' en 'calendario.py').
+
     RESULTADO
     -------
     flujo_bis : DataFrame
@@ -224,138 +258,13 @@ def ffbonocap(cupon1,cupon2,f_vencimiento,f_horizonte,t_cupon,tipo,
     la fecha horizonte.
 
     """
-    from datetime import datetime
-    import pandas as pd
-    import collections
+    from flujos import cronograma_bono
+
+    # El cronograma completo se construye una sola vez y se divide en la fecha
+    # horizonte. Aquí se devuelve el tramo anterior a dicha fecha.
+    flujo_bis,_=cronograma_bono(cupon1,cupon2,f_vencimiento,f_horizonte,t_cupon,
+                                tipo,c_cupones,vn,ahora=as_of)
 
-    f_vencimiento=datetime.strptime(f_vencimiento,'%Y-%m-%d')
-    f_horizonte=datetime.strptime(f_horizonte,'%Y-%m-%d')
-    # A partir del tipo de bono se define el flujo de fondos.
-    if tipo=='bullet':
-        ahora=datetime.now()
-        ahora=datetime(ahora.year,ahora.month,ahora.day)
-
-        # Transformamos la fecha de vencimiento y horizonte (año, mes, y dia) en
-        # tipo datetime. Y creamos la lista que contendrá las fechas de pago.
-        flujo=[ahora]
-
-        # El siguiente bucle instala las fechas de pago de cupones y capital.
-        for i in range(f_vencimiento.year-ahora.year+1):
-             años=i+ahora.year
-             f1=f'{años}-{cupon1}'
-             f1=datetime.strptime(f1,'%Y-%m-%d')
-             flujo.append(f1)
-             f2=f'{años}-{cupon2}'
-             f2=datetime.strptime(f2,'%Y-%m-%d')
-             flujo.append(f2)
-        
-        # Se crea el DataFrame y se toma la máscara correspondiente. También se crea
-        # una columna para que identifique estas fechas como fechas que pagan cupones.
-        flujo=pd.DataFrame(flujo)    
-        flujo.columns=['fecha'] 
-        flujo['tipo']='cupon'       
-        flujo=flujo.loc[(flujo.fecha>=ahora) & (flujo.fecha<=f_vencimiento)]
-        
-        # Ahora incorporamos la fecha de vencimiento sólo si es mayor a la fecha 
-        # de pago del último cupón, en caso contrario, el código no se modifica.
-        if f_vencimiento>flujo.iloc[-1,0]:
-            f_venc=[]
-            f_venc.append(f_vencimiento)
-            f_venc=pd.DataFrame(f_venc)
-            f_venc.columns=['fecha']
-            f_venc['tipo']='capital'
-            flujo=pd.concat([flujo,f_venc],axis=0)
-        elif f_vencimiento==flujo.iloc[-1,0]:
-            flujo.iloc[-1,1]='cupon+capital'      
-                
-        flujo.set_index('fecha',inplace=True)    
-
-        # Creamos copia de flujo como auxiliar para utilizar en las siguientes
-        # líneas. Este 'flujo2' cuenta con fecha de cupones y de capital.
-        flujo2=flujo
-     
-        # Colocamos la fecha horizonte y las columnas de cupones y saldo, pero 
-        # sin valores.
-        if collections.Counter(f_horizonte==flujo2.index)[True]==1:
-            flujo['cupones']=0
-            flujo['saldo']=0  
-        else:
-            f_hor=[]
-            f_hor.append(f_horizonte)
-            f_hor=pd.DataFrame(f_hor)
-            f_hor.columns=['fecha']
-            f_hor['tipo']='nada'
-            f_hor.set_index('fecha',inplace=True)
-            flujo=pd.concat([flujo,f_hor],axis=0)
-            flujo=flujo.sort_values('fecha',ascending=True)
-            flujo['cupones']=0
-            flujo['saldo']=0  
-
-        # Ahora creamos el flujo de pago de cupones. 
-        for i in range(len(flujo.index)):
-            if (flujo.iloc[i,0]=='cupon') or (flujo.iloc[i,0]=='cupon+capital'):
-                flujo.iloc[i,1]=vn*t_cupon/200
-
-        # Ahora creamos el flujo de pago de saldo bullet.         
-        for i in range(len(flujo.index)):
-            if (flujo.iloc[i,0]=='capital') or (flujo.iloc[i,0]=='cupon+capital'):
-                flujo.iloc[i,2]=vn
-
-        # La fecha actual debe tener un pago igual a cero.
-        flujo.iloc[0]=0
-                  
-        # Se finaliza creando el flujo de fondos total y eliminando la columna 'tipo'.
-        flujo['flujo_total']=flujo.cupones+flujo.saldo
-        flujo.drop('tipo',axis=1,inplace=True)
-     
-        # Ahora generamos la máscara que contiene fechas menores e iguales a la 
-        # fecha horizonte.
-        flujo_bis=flujo.loc[flujo.index<=f_horizonte] 
-        
-    elif tipo=='letra':
-        # Transformamos la fecha actual, de vencimiento, y de horizonte (año, mes,
-        # y dia) en tipo datetime. También creamos la lista que las contendrá.
-        ahora=datetime.now()
-        ahora=datetime(ahora.year,ahora.month,ahora.day)
-        flujo=[ahora,f_vencimiento] 
-        
-        # Se arma el DataFrame con estas fechas, junto con las columnas 'cupones' 
-        # y 'saldo' para mantener la estructura requerida.   
-        flujo=pd.DataFrame(flujo)
-        flujo.columns=['fecha']
-        flujo['cupones']=0
-        flujo['saldo']=0
-        flujo.set_index('fecha',inplace=True)
-      
-        # Se incorpora el valor del saldo y la columna de 'flujo_total'.
-        if c_cupones==0:
-            flujo.loc[f_vencimiento,'saldo']=vn
-            flujo['flujo_total']=flujo.cupones+flujo.saldo
-        elif c_cupones==1:
-            flujo.loc[f_vencimiento,'cupones']=vn*t_cupon/100
-            flujo.loc[f_vencimiento,'saldo']=vn
-            flujo['flujo_total']=flujo.cupones+flujo.saldo
-         
-        # Incorporamos la fecha horizonte.
-        if f_horizonte!=f_vencimiento:
-            f_hor=[]
-            f_hor.append(f_horizonte)
-            f_hor=pd.DataFrame(f_hor)
-            f_hor.columns=['fecha']
-            f_hor['cupones']=0
-            f_hor['saldo']=0
-            f_hor['flujo_total']=0
-            f_hor.set_index('fecha',inplace=True)
-            flujo=pd.concat([flujo,f_hor],axis=0)
-            flujo.sort_index(ascending=True,inplace=True)
-           
-        # Ahora generamos la máscara que contiene fechas menores e iguales a la 
-        # fecha horizonte.
-        flujo_bis=flujo.loc[flujo.index<=f_horizonte]
-        
-    else:
-        flujo_bis='El parámetro tipo es -bullet- o -letra- no hay otra opcion'
-        
     return flujo_bis
 
 # ----------------------------------------------------------------------------
@@ -363,8 +272,10 @@ def ffbonocap(cupon1,cupon2,f_vencimiento,f_horizonte,t_cupon,tipo,
 
 #                                   FUNCION 3
 
+@medido()
+@memorizado
 def ffbonodesc(cupon1,cupon2,f_vencimiento,f_horizonte,t_cupon,tipo,
-                   c_cupones,vn=100):
+                   c_cupones,vn=100,as_of=None):
     """
     Función útil para obtener el flujo de fondos posterior a la fecha de horizonte
     de un bono cupón cero, bonos bullet, o incluso un bono que paga sólo un cupón
@@ -412,6 +323,11 @@ def ffbonodesc(cupon1,cupon2,f_vencimiento,f_horizonte,t_cupon,tipo,
     como el monto de dinero invertido dividido el precio de compra y multiplicado
     por el valor nominal. 
 
+    as_of: String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, que reemplaza a la fecha de hoy. Por
+    ejemplo, '2024-06-15'. Si no se indica, se usa el día de hoy (ver
+    'fecha_calculo' en 'calendario.py').
+
     RESULTADO
     -------
     flujo_bis2 : DataFrame
@@ -423,145 +339,21 @@ def ffbonodesc(cupon1,cupon2,f_vencimiento,f_horizonte,t_cupon,tipo,
     turo de reventa del bono en cuestión.
 
     """
-    from datetime import datetime
-    import pandas as pd
-    import collections
+    from flujos import cronograma_bono
 
-    f_vencimiento=datetime.strptime(f_vencimiento,'%Y-%m-%d')
-    f_horizonte=datetime.strptime(f_horizonte,'%Y-%m-%d')
-    # A partir del tipo de bono se define el flujo de fondos.
-    if tipo=='bullet':
-        ahora=datetime.now()
-        ahora=datetime(ahora.year,ahora.month,ahora.day)
-
-        # Transformamos la fecha de vencimiento y horizonte (año, mes, y dia) en
-        # tipo datetime. Y creamos la lista que contendrá las fechas de pago.
-        flujo=[ahora]
-
-        # El siguiente bucle instala las fechas de pago de cupones y capital.
-        for i in range(f_vencimiento.year-ahora.year+1):
-             años=i+ahora.year
-             f1=f'{años}-{cupon1}'
-             f1=datetime.strptime(f1,'%Y-%m-%d')
-             flujo.append(f1)
-             f2=f'{años}-{cupon2}'
-             f2=datetime.strptime(f2,'%Y-%m-%d')
-             flujo.append(f2)
-        
-        # Se crea el DataFrame y se toma la máscara correspondiente. También se crea
-        # una columna para que identifique estas fechas como fechas que pagan cupones.
-        flujo=pd.DataFrame(flujo)    
-        flujo.columns=['fecha'] 
-        flujo['tipo']='cupon'       
-        flujo=flujo.loc[(flujo.fecha>=ahora) & (flujo.fecha<=f_vencimiento)]
-        
-        # Ahora incorporamos la fecha de vencimiento sólo si es mayor a la fecha 
-        # de pago del último cupón, en caso contrario, el código no se modifica.
-        if f_vencimiento>flujo.iloc[-1,0]:
-            f_venc=[]
-            f_venc.append(f_vencimiento)
-            f_venc=pd.DataFrame(f_venc)
-            f_venc.columns=['fecha']
-            f_venc['tipo']='capital'
-            flujo=pd.concat([flujo,f_venc],axis=0)
-        elif f_vencimiento==flujo.iloc[-1,0]:
-            flujo.iloc[-1,1]='cupon+capital'      
-                
-        flujo.set_index('fecha',inplace=True)    
-
-        # Creamos copia de flujo como auxiliar para utilizar en las siguientes
-        # líneas. Este 'flujo2' cuenta con fecha de cupones y de capital.
-        flujo2=flujo
-     
-        # Colocamos la fecha horizonte y las columnas de cupones y saldo, pero 
-        # sin valores.
-        if collections.Counter(f_horizonte==flujo2.index)[True]==1:
-            flujo['cupones']=0
-            flujo['saldo']=0  
-        else:
-            f_hor=[]
-            f_hor.append(f_horizonte)
-            f_hor=pd.DataFrame(f_hor)
-            f_hor.columns=['fecha']
-            f_hor['tipo']='nada'
-            f_hor.set_index('fecha',inplace=True)
-            flujo=pd.concat([flujo,f_hor],axis=0)
-            flujo=flujo.sort_values('fecha',ascending=True)
-            flujo['cupones']=0
-            flujo['saldo']=0  
-
-        # Ahora creamos el flujo de pago de cupones. 
-        for i in range(len(flujo.index)):
-            if (flujo.iloc[i,0]=='cupon') or (flujo.iloc[i,0]=='cupon+capital'):
-                flujo.iloc[i,1]=vn*t_cupon/200
-
-        # Ahora creamos el flujo de pago de saldo bullet.         
-        for i in range(len(flujo.index)):
-            if (flujo.iloc[i,0]=='capital') or (flujo.iloc[i,0]=='cupon+capital'):
-                flujo.iloc[i,2]=vn
-
-        # La fecha actual debe tener un pago igual a cero.
-        flujo.iloc[0]=0
-                  
-        # Se finaliza creando el flujo de fondos total y eliminando la columna 'tipo'.
-        flujo['flujo_total']=flujo.cupones+flujo.saldo
-        flujo.drop('tipo',axis=1,inplace=True)
-     
-        # Ahora generamos la máscara que contiene fechas menores e iguales a la 
-        # fecha horizonte.
-        flujo_bis=flujo.loc[flujo.index>=f_horizonte] 
-        
-    elif tipo=='letra':
-        # Transformamos la fecha actual, de vencimiento, y de horizonte (año, mes,
-        # y dia) en tipo datetime. También creamos la lista que las contendrá.
-        ahora=datetime.now()
-        ahora=datetime(ahora.year,ahora.month,ahora.day)
-        flujo=[ahora,f_vencimiento] 
-        
-        # Se arma el DataFrame con estas fechas, junto con las columnas 'cupones' 
-        # y 'saldo' para mantener la estructura requerida.   
-        flujo=pd.DataFrame(flujo)
-        flujo.columns=['fecha']
-        flujo['cupones']=0
-        flujo['saldo']=0
-        flujo.set_index('fecha',inplace=True)
-      
-        # Se incorpora el valor del saldo y la columna de 'flujo_total'.
-        if c_cupones==0:
-            flujo.loc[f_vencimiento,'saldo']=vn
-            flujo['flujo_total']=flujo.cupones+flujo.saldo
-        elif c_cupones==1:
-            flujo.loc[f_vencimiento,'cupones']=vn*t_cupon/100
-            flujo.loc[f_vencimiento,'saldo']=vn
-            flujo['flujo_total']=flujo.cupones+flujo.saldo
-         
-        # Incorporamos la fecha horizonte.
-        if f_horizonte!=f_vencimiento:
-            f_hor=[]
-            f_hor.append(f_horizonte)
-            f_hor=pd.DataFrame(f_hor)
-            f_hor.columns=['fecha']
-            f_hor['cupones']=0
-            f_hor['saldo']=0
-            f_hor['flujo_total']=0
-            f_hor.set_index('fecha',inplace=True)
-            flujo=pd.concat([flujo,f_hor],axis=0)
-            flujo.sort_index(ascending=True,inplace=True)
-           
-        # Ahora generamos la máscara que contiene fechas menores e iguales a la 
-        # fecha horizonte.
-        flujo_bis=flujo.loc[flujo.index>=f_horizonte]
-        
-    else:
-        flujo_bis='El parámetro tipo es -bullet- o -letra- no hay otra opcion'  
-        
-    return flujo_bis
+    # El cronograma completo se construye una sola vez y se divide en la fecha
+    # horizonte. Aquí se devuelve el tramo posterior a dicha fecha.
+    _,flujo_bis2=cronograma_bono(cupon1,cupon2,f_vencimiento,f_horizonte,t_cupon,
+                                 tipo,c_cupones,vn,ahora=as_of)
+
+    return flujo_bis2
 
 # ----------------------------------------------------------------------------
 # ----------------------------------------------------------------------------
 
 #                                   FUNCION 4
 
+@medido()
 def capflujos(serie_t,f_horizonte,flujo_bb):
     """
     Esta función capitaliza los flujos del bono bullet hasta la fecha horizonte
@@ -586,110 +378,22 @@ def capflujos(serie_t,f_horizonte,flujo_bb):
     RESULTADO
     -------
     flujof_bb: DataFrame.
-    Descripción: Es el mismo flujo de fondos del bono bullet con una columna
-    extra, cuyo contenido son los flujos cobrados y capitalizados hasta la 
-    fecha horizonte.
+    Descripción: Es una copia del flujo de fondos del bono bullet con una
+    columna extra, cuyo contenido son los flujos cobrados y capitalizados hasta
+    la fecha horizonte. El DataFrame 'flujo_bb' no se modifica.
 
     """
-    import pandas as pd
-    from datetime import datetime
-    import collections
-
-    # Para cada cupón armamos una columna donde ubicamos las tasas badlar men-
-    # suales que corresponden a su fecha y a todas las fechas siguientes. Para 
-    # esto utilizamos la funcion de tasabladar.
-    p=[]
-    p=pd.DataFrame(p)
-    for i in range(1,len(flujo_bb.index)):
-        f1=f'{flujo_bb.index[i].year}-{flujo_bb.index[i].month}-01'
-        p[i]=serie_t.loc[serie_t.index>=datetime.strptime(f1,'%Y-%m-%d')]
-    p.fillna(0,inplace=True)
-
-    # Para continuar la serie de tasas badlar hasta la fecha horizonte, se crea 
-    # otro DataFrame que contiene las fechas que están entre la última tasa 
-    # badlar y la fecha horizonte.   
-    p2=[]
-    f_horizonte=datetime.strptime(f_horizonte,'%Y-%m-%d')
-    for i in range(f_horizonte.year-p.index[-1].year+1):
-        año=p.index[-1].year+i
-        for j in range(1,13):
-            mes=j
-            f1=f'{año}-{mes}-01'
-            f1=datetime.strptime(f1,'%Y-%m-%d')
-            p2.append(f1)
-    p2=pd.DataFrame(p2,columns=['fecha'])
-    p2['tasas']=0
-    p2.set_index('fecha',inplace=True)
-    p2=p2.loc[(p2.index>p.index[-1]) & (p2.index<=f_horizonte)]
-
-    # Concatenamos los dos DataFrame que creamos ('p' y 'p2') para obtener la 
-    # serie de tasa badlar mensual esperada para cada flujo del bono bullet.
-    h=pd.concat([p,p2])
-    h.drop('tasas',axis=1,inplace=True)
-    h.fillna(serie_t.iloc[-1,0],inplace=True)
-
-    # Obtenemos la matriz de factores de capitalización mensual. 
-    h=h+1
-    h=h.loc[h.index<=f_horizonte]
-
-    # Debemos ajustar la matriz de f de cap, 'h', convirtiendo algunos de ellos 
-    # en 1, concretamnete, aquellos que están antes del cobro de flujos. 
-    for j in range(1,len(flujo_bb.index)):
-        q=collections.Counter(h.index<datetime.strptime(
-            f'{flujo_bb.index[j].year}-{flujo_bb.index[j].month}-01','%Y-%m-%d'))[True]
-        if flujo_bb.index[j]>serie_t.index[-1]: 
-            for i in range(q):
-                h.iloc[i,j-1]=1
-
-    # Consiguiendo el factor de capitalización de cada flujo para todo el período 
-    # de inversión, es decir, desde la fecha de cobro hasta la fecha horizonte. 
-    f_cap=[]
-    f_cap=pd.DataFrame(f_cap)
-    for i in range(1,len(h.columns)+1):
-        f_cap[i]=h[i].cumprod()
-
-    f_cap2=[0]
-    for i in range(len(h.columns)):
-        f_cap2.append(f_cap.iloc[-1,i])
-
-    # NOTA: 'f_cap2' debe corregirse para cada fecha de cobro y para la fecha 
-    #        horizonte. Por ello se genera una lista cuyos elementos, a excep-
-    #        ción del primero, son los factores de capitalizción mensual que 
-    #        corresponden a cada fecha de cobro de cupón y capital.  
-    f_cap3=[0]
-    for i in range(1,len(flujo_bb.index)):
-        v=h.loc[(h.index.year==flujo_bb.index[i].year) & 
-                (h.index.month==flujo_bb.index[i].month)]
-        f_cap3.append(v.iloc[0,0])
-
-    # Corregimos los factores de capitalización del período de inversión.
-    # Primero descontamos:
-    f_cap4=[0]
-    for i in range(1,len(flujo_bb.index)):
-        f_cap4.append(f_cap2[i]/f_cap3[i])
-
-    # Segundo, capitalizamos. Supondremos que los meses son de 30 días y el año 
-    # de 365 días:
-    f_cap5=[0]
-    for i in range(1,len(flujo_bb.index)):
-        f_cap5.append(f_cap4[i]*f_cap3[i]**((30-flujo_bb.index[i].day)/30))
-        
-    # Generamos una variable float que contiene al factor de capitalización 
-    # mensual de la fecha horizonte.
-    f_cap_h=f_cap3[-1]
+    from flujos import factores_capitalizacion
 
-    # Ajustamos los factores de capitalización del período de inversión, 'f_cap5',
-    # descontando y capitalizando por 'f_capS_h'.
-    f_cap6=[0]
-    for i in range(1,len(flujo_bb.index)):
-        f_cap6.append((f_cap5[i]/f_cap_h)*f_cap_h**((f_horizonte.day)/30))
+    # Los factores de capitalización se obtienen del crecimiento acumulado de
+    # la serie de tasas (ver 'flujos.py'). La primera fecha es la actual, y su
+    # flujo no se capitaliza.
+    flujof_bb=flujo_bb.drop(columns='f_t_futuro',errors='ignore')
+    f_cap=factores_capitalizacion(serie_t,f_horizonte,flujof_bb.index.values)
+    f_cap[0]=0
 
     # Se aplican los factores de capitalización sobre los flujos.
-    flujo_bb['f_t_futuro']=0
-    for i in range(len(f_cap6)):
-        flujo_bb.iloc[i,-1]=flujo_bb.iloc[i,-2]*f_cap6[i]
-    
-    flujof_bb=flujo_bb
+    flujof_bb['f_t_futuro']=flujof_bb.iloc[:,-1].values*f_cap
     
     return flujof_bb
 
@@ -735,9 +439,9 @@ def grafica_bonos(fecha,directorio,nombre_archivo):
     """
     
     import pandas as pd
+    from cache import leer_excel
     import matplotlib.pyplot as plt
-    from statsmodels.formula.api import ols
-    import numpy as np
+    from curvas import ajustar_curva
     
     fecha_cer=f'{fecha} CER'
     fecha_pesos=f'{fecha} Pesos'
@@ -745,38 +449,38 @@ def grafica_bonos(fecha,directorio,nombre_archivo):
     fecha_usd=f'{fecha} USD'
     
     # Importamos las series de TIR y DM de renta fija CER y en pesos.
-    curva_cer=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_cer)
-    curva_pesos=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_pesos)
-    curva_dl=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_dl)
-    curva_usd=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_usd)
+    curva_cer=leer_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_cer)
+    curva_pesos=leer_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_pesos)
+    curva_dl=leer_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_dl)
+    curva_usd=leer_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_usd)
 
     # Realizamos la regresión OLS con logaritmo neperiano sobre el regresor.
-    reg_cer=ols('TIR_anual ~ np.log(DMdias)', data=curva_cer).fit()
-    reg_pesos=ols('TIR_anual ~ np.log(DMdias)', data=curva_pesos).fit()
-    reg_dl=ols('TIR_anual ~ np.log(DMdias)', data=curva_dl).fit()
-    reg_usd=ols('TIR_anual ~ np.log(DMdias)', data=curva_usd).fit()
+    reg_cer=ajustar_curva(curva_cer,'CER',fecha)
+    reg_pesos=ajustar_curva(curva_pesos,'Pesos',fecha)
+    reg_dl=ajustar_curva(curva_dl,'DL',fecha)
+    reg_usd=ajustar_curva(curva_usd,'USD',fecha)
 
     # Obtenemos los valores medios/predichos, quienes serán usados en las 
     # gráficas.
-    pred_cer=reg_cer.predict()
+    pred_cer=reg_cer(curva_cer.DMdias)
     pred_cer=pd.DataFrame(pred_cer)
     pred_cer.columns=['TIR_anual']
     pred_cer['DMdias']=curva_cer.DMdias
     pred_cer.sort_values('DMdias',inplace=True)
 
-    pred_pesos=reg_pesos.predict()
+    pred_pesos=reg_pesos(curva_pesos.DMdias)
     pred_pesos=pd.DataFrame(pred_pesos)
     pred_pesos.columns=['TIR_anual']
     pred_pesos['DMdias']=curva_pesos.DMdias
     pred_pesos.sort_values('DMdias',inplace=True)
         
-    pred_dl=reg_dl.predict()
+    pred_dl=reg_dl(curva_dl.DMdias)
     pred_dl=pd.DataFrame(pred_dl)
     pred_dl.columns=['TIR_anual']
     pred_dl['DMdias']=curva_dl.DMdias
     pred_dl.sort_values('DMdias',inplace=True)
         
-    pred_usd=reg_usd.predict()
+    pred_usd=reg_usd(curva_usd.DMdias)
     pred_usd=pd.DataFrame(pred_usd)
     pred_usd.columns=['TIR_anual']
     pred_usd['DMdias']=curva_usd.DMdias
@@ -837,15 +541,17 @@ def grafica_bonos(fecha,directorio,nombre_archivo):
 
 #                                   FUNCION 6
 
-def tabla_infla(fecha1,directorio,nombre_archivo,cant_meses=6):
+@medido()
+@memorizado
+def tabla_infla(fecha1,directorio=None,nombre_archivo=None,cant_meses=6,mercado=None,
+                mensual=False,as_of=None):
     """
     Crea un DataFrame que permite conocer la inflación mensual esperada. Dicho 
     resultado se obtiene a partir de los precios de los bonos que cotizan en 
     bolsa. La inflación esperada para el mes donde se realiza la compra equiva-
     le a la inflación esperada para los días restantes de dicho mes. La infla- 
-    ción mensual esperada que se genera tiene un máximo de 60 meses hacia
-    delante si el mes inicial es enero (1), y 48 meses hacia delante si el mes
-    inicial es diciembre (12). Se utilzian meses de 30 días y año de 360 dias. 
+    ción mensual esperada se extiende 'cant_meses' meses hacia delante, sin
+    máximo. Se utilzian meses de 30 días y año de 360 dias.
 
     PARAMETROS
     ----------  
@@ -867,34 +573,60 @@ def tabla_infla(fecha1,directorio,nombre_archivo,cant_meses=6):
     la compra de los bonos y letras, que se extiende la serie. Por defecto es 
     igual a 6.
 
+    mercado: MarketSnapshot, opcional.
+    Descripción: Es la foto del mercado con las curvas y la serie CER ya impor-
+    tadas (ver 'mercado.py'). Si se indica, no se leen los archivos de excel.
+
+    mensual: Boolean, opcional.
+    Descripción: Si es True, además del DataFrame se devuelve la misma tabla
+    como 'TablaMensual' (ver 'tablas.py'), con acceso directo a cada mes. Por
+    defecto es False.
+
+    as_of: String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, que reemplaza a la fecha de hoy. Por
+    ejemplo, '2024-06-15'. Si no se indica, se usa el día de hoy (ver
+    'fecha_calculo' en 'calendario.py').
+
     RESULTADO
     -------
     tabla_infla: DataFrame.
     Descripción: Es la tabla de inflación mensual esperada e inflación acumula-
     da.
 
+    tabla_mensual: TablaMensual.
+    Descripción: Es la misma tabla con acceso directo a cada mes. Sólo se
+    devuelve si 'mensual' es True.
+
     """
     import pandas as pd
-    from statsmodels.formula.api import ols
+    from cache import leer_excel
+    from curvas import ajustar_curva
     import numpy as np
-    from datetime import datetime
+    from calendario import fecha_calculo, fines_de_mes, meses
+
+    # Fecha de cálculo.
+    hoy=fecha_calculo(as_of)
 
     fecha_cer=f'{fecha1} CER'
     fecha_pesos=f'{fecha1} Pesos'
     
     # Importamos las series de TIR y DM de renta fija CER y en pesos.
-    curva_cer=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_cer)
-    curva_pesos=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_pesos)
+    if mercado is None:
+        curva_cer=leer_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_cer)
+        curva_pesos=leer_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_pesos)
+    else:
+        curva_cer=mercado.curva('CER')
+        curva_pesos=mercado.curva('Pesos')
     
     # Realizamos la regresión OLS con logaritmo neperiano sobre el regresor (DM)
-    reg_cer=ols('TIR_anual ~ np.log(DMdias)', data=curva_cer).fit()
-    reg_pesos=ols('TIR_anual ~ np.log(DMdias)', data=curva_pesos).fit()
+    reg_cer=ajustar_curva(curva_cer,'CER',fecha1)
+    reg_pesos=ajustar_curva(curva_pesos,'Pesos',fecha1)
     
     # Obtenemos el valor de los coeficientes de la regresión lineal log simple.
-    inter_cer=reg_cer.params[0]
-    coef_cer=reg_cer.params[1]
-    inter_pesos=reg_pesos.params[0]
-    coef_pesos=reg_pesos.params[1]
+    inter_cer=reg_cer.intercept
+    coef_cer=reg_cer.slope
+    inter_pesos=reg_pesos.intercept
+    coef_pesos=reg_pesos.slope
     
     # Construimos el DataFrame que vincula DMdias con días efectivos para un 
     # período de tiempo determinado desde el momento de la compra (máximo "cant_meses" 
@@ -908,12 +640,12 @@ def tabla_infla(fecha1,directorio,nombre_archivo,cant_meses=6):
     tabla_dias.drop(0,inplace=True)
     
     tabla_dias['dias_desde_comp']=0
-    if (datetime.now().month==2) & (datetime.now().day>=28): 
+    if (hoy.month==2) & (hoy.day>=28): 
         tabla_dias.loc[1,'dias_desde_comp']=0
-    elif datetime.now().day>=30:
+    elif hoy.day>=30:
         tabla_dias.loc[1,'dias_desde_comp']=0
     else:    
-        tabla_dias.loc[1,'dias_desde_comp']=30-datetime.now().day
+        tabla_dias.loc[1,'dias_desde_comp']=30-hoy.day
         
     for i in range(2,cant_meses+1):
         tabla_dias.loc[i,'dias_desde_comp']=i*30-(30-tabla_dias.loc[
@@ -923,8 +655,8 @@ def tabla_infla(fecha1,directorio,nombre_archivo,cant_meses=6):
     
     # Al DataFrame 'tabla_dias' incorporamos una columna TIR_anual para bonos 
     # en pesos CER y otra para bonos en pesos.  
-    tabla_dias['TIR_anual_cer']=0
-    tabla_dias['TIR_anual_pesos']=0
+    tabla_dias['TIR_anual_cer']=0.
+    tabla_dias['TIR_anual_pesos']=0.
     for i in range(len(tabla_dias.index)):
         tabla_dias.iloc[i,-2]=inter_cer+coef_cer*np.log(tabla_dias.iloc[i,-3])
     for i in range(len(tabla_dias.index)):
@@ -934,24 +666,9 @@ def tabla_infla(fecha1,directorio,nombre_archivo,cant_meses=6):
     # compra. La 1era fila de la 1era columna es la inflación esperada hasta el 
     # final del mes donde se realiza la compra, el resto es la infla esperada 
     # cada 30 dias. 
-    tabla_infla=[]
-    for i in range(datetime.now().month,cant_meses+datetime.now().month):
-        if i<=12:
-            tabla_infla.append(i)
-        elif i<=24:
-            tabla_infla.append(i-12)
-        elif i<=36:
-            tabla_infla.append(i-24)
-        elif i<=48:
-            tabla_infla.append(i-36)    
-        else:    
-            tabla_infla.append(i-48)
-        if i==60:
-            break
-      
-    tabla_infla=pd.DataFrame(tabla_infla)
+    tabla_infla=pd.DataFrame((np.arange(cant_meses)+hoy.month-1)%12+1)
     tabla_infla.columns=['mes']
-    tabla_infla['infla_mens']=0
+    tabla_infla['infla_mens']=0.
     
     tabla_infla.iloc[0,1]=((1+tabla_dias.iloc[0,3])/(1+tabla_dias.iloc[0,2]))**(
         tabla_dias.iloc[0,0]/360)-1
@@ -961,64 +678,14 @@ def tabla_infla(fecha1,directorio,nombre_archivo,cant_meses=6):
     tabla_infla['infla_acum']=(1+tabla_infla.infla_mens).cumprod()-1
     
     # Ahora introducimos la fecha (año-mes-dia) como índice de la inflación es-
-    # perada. Para esto creamos un dataframe donde crearemos las fechas, del 
-    # cual tomaremos su máscara con fechas iguales y posteriores a la actual, 
-    # para luego concatenar este datafrema con 'tabla_infla', eliminando aque-
-    # llas filas con datos inexistentes. 
-    año=[]
-    for i in range(5):
-        i=i+1
-        for j in range(1,13):
-            año.append(datetime.now().year-1+i)
-    
-    año=pd.DataFrame(año)
-    año.columns=['año']
-    año['mes']=0
-    
-    for i in año.index:
-        if i+1<=12:
-            año.loc[i,'mes']=i+1
-        elif i+1<=24:
-            año.loc[i,'mes']=i+1-12    
-        elif i+1<=36:
-            año.loc[i,'mes']=i+1-24
-        elif i+1<=48:
-            año.loc[i,'mes']=i+1-36
-        elif i+1<=60:
-            año.loc[i,'mes']=i+1-48
-        else:
-            año.loc[i,'mes']=i+1-60
-        if i==año.index[-1]:
-            break
-    
-    año['fecha']=0
-    for i in año.index:
-        año1=año.loc[i,'año']
-        mes1=año.loc[i,'mes']
-        if mes1==2: 
-            fecha=f'{año1}-{mes1}-28'
-            fecha=datetime.strptime(fecha,'%Y-%m-%d')
-            año.loc[i,'fecha']=fecha
-        elif (mes1==4) or (mes1==6) or (mes1==9) or (mes1==11):
-            fecha=f'{año1}-{mes1}-30'
-            fecha=datetime.strptime(fecha,'%Y-%m-%d')
-            año.loc[i,'fecha']=fecha
-        else:
-            fecha=f'{año1}-{mes1}-31'
-            fecha=datetime.strptime(fecha,'%Y-%m-%d')
-            año.loc[i,'fecha']=fecha
-    
-    año=año.loc[año.fecha>=datetime.now()]
-    
-    año['indice']=0
-    for i in range(len(año.index)):
-        año.iloc[i,-1]=i   
-        if i==len(año.index):
-            break
-    año.set_index('indice',inplace=True)
-    
+    # perada. Para esto tomamos los fines de mes del calendario iguales y poste-
+    # riores a la fecha actual, y los concatenamos con 'tabla_infla', eliminando
+    # aquellas filas con datos inexistentes.
+    año=fines_de_mes(hoy,np.datetime64(hoy,'M')+cant_meses)
+    año=pd.DataFrame({'fecha':año[año>=hoy]})
+
     tabla_infla=pd.concat([tabla_infla,año],axis=1).dropna()
-    tabla_infla.drop(['mes','año'],axis=1,inplace=True)
+    tabla_infla.drop(['mes'],axis=1,inplace=True)
     tabla_infla.set_index('fecha',inplace=True)
     
     # INPUT: Fecha de diciembre e inflación de diciembre del año anterior al actual. 
@@ -1026,48 +693,19 @@ def tabla_infla(fecha1,directorio,nombre_archivo,cant_meses=6):
     # No obstnate, si el mes actual no es enero, entonces la aclaración anterior no
     # corresponde, y en su lugar se debe colocar la inflación del mes anterior al 
     # actual.
-    serie_cer=pd.read_excel('Serie CER.xlsx').set_index('Fecha')
-    
-    if datetime.now().month==1:
-        mes_ant=12
-        año_ant=datetime.now().year-1
-        
-        f_dic22_1=f'{año_ant}-{mes_ant}-01'
-        f_dic22_1=datetime.strptime(f_dic22_1,'%Y-%m-%d')
-        f_dic22_2=f'{año_ant}-{mes_ant}-31'
-        f_dic22_2=datetime.strptime(f_dic22_2,'%Y-%m-%d')
-        
-        t_rem=serie_cer.loc[serie_cer.index==f_dic22_2].iloc[0,0
-                            ]/serie_cer.loc[serie_cer.index==f_dic22_1].iloc[0,0]-1
-        l=[f_dic22_2,t_rem,0]
+    if mercado is None:
+        serie_cer=leer_excel('Serie CER.xlsx').set_index('Fecha')
     else:
-        mes_ant=datetime.now().month-1
-        año_act=datetime.now().year
-        
-        f_mesant1=f'{año_act}-{mes_ant}-01'
-        f_mesant1=datetime.strptime(f_mesant1,'%Y-%m-%d')   
-        if mes_ant==2:   
-            f_mesant2=f'{año_act}-{mes_ant}-28'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_cer.loc[serie_cer.index==f_mesant2].iloc[0,0
-                            ]/serie_cer.loc[serie_cer.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]
-        elif (mes_ant==4) or (mes_ant==6) or (mes_ant==9) or (mes_ant==11):       
-            f_mesant2=f'{año_act}-{mes_ant}-30'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_cer.loc[serie_cer.index==f_mesant2].iloc[0,0
-                            ]/serie_cer.loc[serie_cer.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]
-        else: 
-            f_mesant2=f'{año_act}-{mes_ant}-31'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_cer.loc[serie_cer.index==f_mesant2].iloc[0,0
-                           ]/serie_cer.loc[serie_cer.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]
+        serie_cer=mercado.serie_cer
     
+    # El mes anterior al actual, con su primer y su último día.
+    mes_ant=np.datetime64(hoy,'M')-1
+    f_mesant1,f_mesant2=[pd.Timestamp(f[0]).to_pydatetime() for f in meses(mes_ant,mes_ant)]
+
+    t_rem=serie_cer.loc[serie_cer.index==f_mesant2].iloc[0,0
+                        ]/serie_cer.loc[serie_cer.index==f_mesant1].iloc[0,0]-1
+    l=[f_mesant2,t_rem,0]
+
     # Se crea el DataFrame que contiene la fecha de diciembre o del mes anterior, y
     # se le suma su inflación. 
     l=pd.DataFrame(l).T
@@ -1078,6 +716,9 @@ def tabla_infla(fecha1,directorio,nombre_archivo,cant_meses=6):
     tabla_infla=pd.concat([tabla_infla,l],axis=0)
     tabla_infla.sort_index(inplace=True)
     
+    if mensual:
+        from tablas import TablaMensual
+        return tabla_infla,TablaMensual.desde_tabla(tabla_infla)
     return tabla_infla
 
 # ----------------------------------------------------------------------------
@@ -1085,9 +726,12 @@ def tabla_infla(fecha1,directorio,nombre_archivo,cant_meses=6):
 
 #                                   FUNCION 7
 
+@medido()
+@memorizado
 def tabla_dev(f_limite,fecha1,tipo,tcn_hoy,tcn_rofex,ticket_usd,ticket_cer,
-              ticket_dl,ticket_pesos,directorio,nombre_archivo,nombre_archivo_tc,
-              meses_adelante=6):
+              ticket_dl,ticket_pesos,directorio=None,nombre_archivo=None,
+              nombre_archivo_tc=None,meses_adelante=6,mercado=None,mensual=False,
+              as_of=None):
     """
     ¿Qué hace? Crea un DataFrame con la tasa de devaluación/depreciación mensual
     esperada y también la acumulada correspondiente. Existen tres fuentes de
@@ -1154,16 +798,39 @@ def tabla_dev(f_limite,fecha1,tipo,tcn_hoy,tcn_rofex,ticket_usd,ticket_cer,
     Descripción: Determina la extensión o cantidad de meses que tendrá la serie 
     de tasa de dev/dep. 
         
+    mercado : MarketSnapshot, opcional.
+    Descripción: Es la foto del mercado con las curvas y la serie del A3500 ya
+    importadas (ver 'mercado.py'). Si se indica, no se leen los archivos de excel.
+
+    mensual: Boolean, opcional.
+    Descripción: Si es True, además del DataFrame se devuelve la misma tabla
+    como 'TablaMensual' (ver 'tablas.py'), con acceso directo a cada mes. Por
+    defecto es False.
+
+    as_of: String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, que reemplaza a la fecha de hoy. Por
+    ejemplo, '2024-06-15'. Si no se indica, se usa el día de hoy (ver
+    'fecha_calculo' en 'calendario.py').
+
     RESULTADO
     -------
     tabla_dev : DataFrame.
     Descripción: Es la tabla con la devaluación/depreciación mensual y acumula-
     da esperada. 
 
+    tabla_mensual: TablaMensual.
+    Descripción: Es la misma tabla con acceso directo a cada mes. Sólo se
+    devuelve si 'mensual' es True.
+
     """
            
     import pandas as pd
+    from cache import leer_excel
     from datetime import datetime, timedelta
+    from calendario import fecha_calculo, fines_de_mes
+
+    # Fecha de cálculo.
+    hoy=fecha_calculo(as_of)
 
     fecha_cer=f'{fecha1} CER'
     fecha_pesos=f'{fecha1} Pesos'
@@ -1171,101 +838,63 @@ def tabla_dev(f_limite,fecha1,tipo,tcn_hoy,tcn_rofex,ticket_usd,ticket_cer,
     fecha_dl=f'{fecha1} DL'
     
     # Se define el DataFrame que contendrá la tasa de devaluación/depreciación:
-    año=[]
-    for i in range(5):
-        i=i+1
-        for j in range(1,13):
-            año.append(datetime.now().year-1+i)
-
-    año=pd.DataFrame(año)
-    año.columns=['año']
-    año['mes']=0
-
-    for i in año.index:
-        if i+1<=12:
-            año.loc[i,'mes']=i+1
-        elif i+1<=24:
-            año.loc[i,'mes']=i+1-12    
-        elif i+1<=36:
-            año.loc[i,'mes']=i+1-24
-        elif i+1<=48:
-            año.loc[i,'mes']=i+1-36
-        elif i+1<=60:
-            año.loc[i,'mes']=i+1-48
-        else:
-            año.loc[i,'mes']=i+1-60
-        if i==año.index[-1]:
-            break
-
-    año['fecha']=0
-    for i in año.index:
-        año1=año.loc[i,'año']
-        mes1=año.loc[i,'mes']
-        if mes1==2: 
-            fecha=f'{año1}-{mes1}-28'
-            fecha=datetime.strptime(fecha,'%Y-%m-%d')
-            año.loc[i,'fecha']=fecha
-        elif (mes1==4) or (mes1==6) or (mes1==9) or (mes1==11):
-            fecha=f'{año1}-{mes1}-30'
-            fecha=datetime.strptime(fecha,'%Y-%m-%d')
-            año.loc[i,'fecha']=fecha
-        else:
-            fecha=f'{año1}-{mes1}-31'
-            fecha=datetime.strptime(fecha,'%Y-%m-%d')
-            año.loc[i,'fecha']=fecha
-
     f_limite=datetime.strptime(f_limite,'%Y-%m-%d')
-    base=(f_limite-datetime.now()).days
-    tabla_dev=año
-    tabla_dev['dev_men']=0
-    tabla_dev['dev_acum']=0
-    tabla_dev.set_index('fecha',inplace=True)
-    tabla_dev.drop(['mes','año'],axis=1,inplace=True)
-    tabla_dev=tabla_dev.loc[(tabla_dev.index>=datetime.now())].copy()
+    base=(f_limite-hoy).days
+    tabla_dev=pd.DataFrame({'dev_men':0,'dev_acum':0},index=fines_de_mes(
+        hoy,hoy+timedelta(30*meses_adelante)))
+    tabla_dev=tabla_dev.loc[(tabla_dev.index>=hoy)].copy()
 
     # Se define la tasa de devaluación/depreciación:
     if tipo=='rofex':
         tabla_dev['dev_men']=(tcn_rofex/tcn_hoy)**(30/base)-1
         tabla_dev.iloc[0,0]=(1+tabla_dev.iloc[0,0])**(
-            (tabla_dev.index[0].day-datetime.now().day)/tabla_dev.index[0].day)-1
+            (tabla_dev.index[0].day-hoy.day)/tabla_dev.index[0].day)-1
 
         tabla_dev.dev_acum=(1+tabla_dev.dev_men).cumprod()-1
-        tabla_dev=tabla_dev.loc[tabla_dev.index<=datetime.now()+timedelta(30*meses_adelante)]
+        tabla_dev=tabla_dev.loc[tabla_dev.index<=hoy+timedelta(30*meses_adelante)]
 
     elif tipo=='usd-cer':
-        infla_acum=tabla_infla(fecha1,cant_meses=12).iloc[-1,-1]
-        tabla_infla1=tabla_infla(fecha1,cant_meses=12)
-        potencia=tabla_infla1.index[0].day/(tabla_infla1.index[0].day-datetime.now(
-            ).day)
+        tabla_infla1=tabla_infla(fecha1,directorio,nombre_archivo,cant_meses=12,
+                                 mercado=mercado,as_of=hoy)
+        infla_acum=tabla_infla1.iloc[-1,-1]
+        potencia=tabla_infla1.index[0].day/(tabla_infla1.index[0].day-hoy.day)
         infla_acum=(1+infla_acum)/(1+tabla_infla1.iloc[0,0])*(
             1+tabla_infla1.iloc[0,0])**potencia-1
 
-        b_usd=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_usd).set_index(
-            'ticket')
-        b_cer=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_cer).set_index(
-            'ticket')
+        if mercado is None:
+            b_usd=leer_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_usd).set_index(
+                'ticket')
+            b_cer=leer_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_cer).set_index(
+                'ticket')
+        else:
+            b_usd=mercado.curva('USD').set_index('ticket')
+            b_cer=mercado.curva('CER').set_index('ticket')
             
         tabla_dev['dev_men']=((1+b_cer.loc[ticket_cer].TIR_anual+infla_acum)/(
             1+b_usd.loc[ticket_usd].TIR_anual))**(1/12)-1
         tabla_dev.iloc[0,0]=(1+tabla_dev.iloc[0,0])**(
-            (tabla_dev.index[0].day-datetime.now().day)/tabla_dev.index[0].day)-1
+            (tabla_dev.index[0].day-hoy.day)/tabla_dev.index[0].day)-1
 
         tabla_dev.dev_acum=(1+tabla_dev.dev_men).cumprod()-1
-        tabla_dev=tabla_dev.loc[tabla_dev.index<=datetime.now()+timedelta(30*meses_adelante)]
+        tabla_dev=tabla_dev.loc[tabla_dev.index<=hoy+timedelta(30*meses_adelante)]
             
     elif tipo=='dl-pesos':
-        b_pesos=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_pesos).set_index(
-            'ticket')
-        b_dl=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_dl).set_index(
-            'ticket')
+        if mercado is None:
+            b_pesos=leer_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_pesos).set_index(
+                'ticket')
+            b_dl=leer_excel(f'{directorio}/{nombre_archivo}.xlsx',sheet_name=fecha_dl).set_index(
+                'ticket')
+        else:
+            b_pesos=mercado.curva('Pesos').set_index('ticket')
+            b_dl=mercado.curva('DL').set_index('ticket')
             
         tabla_dev['dev_men']=((1+b_pesos.loc[ticket_pesos].TIR_anual)/(
             1+b_dl.loc[ticket_dl].TIR_anual))**(1/12)-1
         tabla_dev.iloc[0,0]=(1+tabla_dev.iloc[0,0])**(
-            (tabla_dev.index[0].day-datetime.now().day)/tabla_dev.index[0].day)-1
+            (tabla_dev.index[0].day-hoy.day)/tabla_dev.index[0].day)-1
             
         tabla_dev.dev_acum=(1+tabla_dev.dev_men).cumprod()-1
-        tabla_dev=tabla_dev.loc[tabla_dev.index<=datetime.now()+timedelta(30*meses_adelante)]
+        tabla_dev=tabla_dev.loc[tabla_dev.index<=hoy+timedelta(30*meses_adelante)]
 
     else:
         tabla_dev='Hay un error en el tipeo de la variable -tipo-'  
@@ -1275,65 +904,17 @@ def tabla_dev(f_limite,fecha1,tipo,tcn_hoy,tcn_rofex,ticket_usd,ticket_cer,
     # No obstante, si el mes actual no es enero, entonces la aclaración anterior
     # no corresponde, y en su lugar se debe colocar la tasa de dev/dep del mes 
     # anterior al actual.    
-    serie_tca3500=pd.read_excel(f'{directorio}/{nombre_archivo_tc}.xlsx').set_index('Fecha')
-    
-    if datetime.now().month==1:
-        mes_ant=12
-        año_ant=datetime.now().year-1
-        
-        f_dic22_1=f'{año_ant}-{mes_ant}-02'
-        f_dic22_1=datetime.strptime(f_dic22_1,'%Y-%m-%d')
-        f_dic22_2=f'{año_ant}-{mes_ant}-30'
-        f_dic22_2=datetime.strptime(f_dic22_2,'%Y-%m-%d')
-        
-        t_rem=serie_tca3500.loc[serie_tca3500.index==f_dic22_2].iloc[0,0
-                ]/serie_tca3500.loc[serie_tca3500.index==f_dic22_1].iloc[0,0]-1
-        l=[f_dic22_2,t_rem,0]
-           
+    if mercado is None:
+        serie_tca3500=leer_excel(f'{directorio}/{nombre_archivo_tc}.xlsx').set_index('Fecha')
     else:
-        mes_ant=datetime.now().month-1
-        año_act=datetime.now().year
-         
-        if mes_ant==1:
-            f_mesant1=f'{año_act}-{mes_ant}-02'
-            f_mesant1=datetime.strptime(f_mesant1,'%Y-%m-%d')   
-            
-            f_mesant2=f'{año_act}-{mes_ant}-31'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_tca3500.loc[serie_tca3500.index==f_mesant2].iloc[0,0
-                ]/serie_tca3500.loc[serie_tca3500.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]       
-        elif mes_ant==2:   
-            f_mesant1=f'{año_act}-{mes_ant}-01'
-            f_mesant1=datetime.strptime(f_mesant1,'%Y-%m-%d')   
-            
-            f_mesant2=f'{año_act}-{mes_ant}-28'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_tca3500.loc[serie_tca3500.index==f_mesant2].iloc[0,0
-                ]/serie_tca3500.loc[serie_tca3500.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]       
-        elif (mes_ant==4) or (mes_ant==6) or (mes_ant==9) or (mes_ant==11): 
-            f_mesant1=f'{año_act}-{mes_ant}-01'
-            f_mesant1=datetime.strptime(f_mesant1,'%Y-%m-%d')  
-            
-            f_mesant2=f'{año_act}-{mes_ant}-30'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_tca3500.loc[serie_tca3500.index==f_mesant2].iloc[0,0
-                ]/serie_tca3500.loc[serie_tca3500.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]     
-        else: 
-            f_mesant1=f'{año_act}-{mes_ant}-01'
-            f_mesant1=datetime.strptime(f_mesant1,'%Y-%m-%d')  
-            
-            f_mesant2=f'{año_act}-{mes_ant}-31'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_tca3500.loc[serie_tca3500.index==f_mesant2].iloc[0,0
-                ]/serie_tca3500.loc[serie_tca3500.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]
+        serie_tca3500=mercado.serie_tca3500
+    
+    # El mes anterior al actual, con su primer y su último día.
+    f_mesant1,f_mesant2=_mes_anterior_a3500(hoy)
+
+    t_rem=serie_tca3500.loc[serie_tca3500.index==f_mesant2].iloc[0,0
+            ]/serie_tca3500.loc[serie_tca3500.index==f_mesant1].iloc[0,0]-1
+    l=[f_mesant2,t_rem,0]
     
     # Se crea el DataFrame que contiene la fecha de diciembre y su inflación.
     l=pd.DataFrame(l).T
@@ -1344,14 +925,42 @@ def tabla_dev(f_limite,fecha1,tipo,tcn_hoy,tcn_rofex,ticket_usd,ticket_cer,
     tabla_dev=pd.concat([tabla_dev,l],axis=0)
     tabla_dev.sort_index(inplace=True)
     
+    if mensual:
+        from tablas import TablaMensual
+        return tabla_dev,TablaMensual.desde_tabla(tabla_dev)
     return tabla_dev
 
+
+def _mes_anterior_a3500(hoy):
+    """
+    Devuelve el primer y el último día del mes anterior a 'hoy' con los que
+    'tabla_dev' y 'tabla_dev_esc' calculan la dep/dev de ese mes con la serie
+    del A3500 (ver 'DIA_INICIO_A3500_ENE_DIC' y 'DIA_FIN_A3500_DIC').
+
+    """
+    import numpy as np
+    import pandas as pd
+    from calendario import meses
+
+    mes_ant=np.datetime64(hoy,'M')-1
+    f_mesant1,f_mesant2=[pd.Timestamp(f[0]).to_pydatetime() for f in meses(mes_ant,mes_ant)]
+    if f_mesant1.month in (1,12):
+        f_mesant1=f_mesant1.replace(day=DIA_INICIO_A3500_ENE_DIC)
+    if f_mesant2.month==12:
+        f_mesant2=f_mesant2.replace(day=DIA_FIN_A3500_DIC)
+
+    return f_mesant1,f_mesant2
+
 # ----------------------------------------------------------------------------
 # ----------------------------------------------------------------------------
 
 #                                   FUNCION 8
 
-def tabla_infla_esc(tem_base,t_var_tem,fecha1,f_horizonte,directorio,nombre_archivo_cer):
+@medido()
+@memorizado
+def tabla_infla_esc(tem_base,t_var_tem,fecha1,f_horizonte,directorio=None,
+                    nombre_archivo_cer=None,mercado=None,mensual=False,
+                    as_of=None,nombre_archivo=None,tabla_base=None):
     """
     Genera un DataFrame con un escenario imaginado sobre el devenir de la infla-
     ción mensual y su acumulado. Sólo se debe establecer una base para la infla-
@@ -1383,11 +992,34 @@ def tabla_infla_esc(tem_base,t_var_tem,fecha1,f_horizonte,directorio,nombre_arch
     
     directorio: String.
     Descripción: Es la carpeta o ubicacion donde se encuentran guardados los 
-    archivos excels la serie CER.
+    archivos excels con datos de bonos u ONs y con la serie CER.
     
     nombre_archivo_cer: String.
     Descripción: Es el nombre del archivo excel con la serie CER.
 
+    nombre_archivo: String.
+    Descripción: Es el nombre del archivo excel con datos de bonos u ONs, de
+    donde 'tabla_infla' toma las curvas CER y en pesos.
+
+    tabla_base: DataFrame, opcional.
+    Descripción: Es la tabla de 'tabla_infla' con la misma fecha de cálculo, de
+    donde se toma la inflación esperada del mes en curso. Si no se indica, se
+    calcula con 'tabla_infla'.
+
+    mercado: MarketSnapshot, opcional.
+    Descripción: Es la foto del mercado con las curvas y la serie CER ya impor-
+    tadas (ver 'mercado.py'). Si se indica, no se leen los archivos de excel.
+
+    mensual: Boolean, opcional.
+    Descripción: Si es True, además del DataFrame se devuelve la misma tabla
+    como 'TablaMensual' (ver 'tablas.py'), con acceso directo a cada mes. Por
+    defecto es False.
+
+    as_of: String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, que reemplaza a la fecha de hoy. Por
+    ejemplo, '2024-06-15'. Si no se indica, se usa el día de hoy (ver
+    'fecha_calculo' en 'calendario.py').
+
     RESULTADO
     -------
     tabla_infla_esc : DataFrame.
@@ -1395,139 +1027,61 @@ def tabla_infla_esc(tem_base,t_var_tem,fecha1,f_horizonte,directorio,nombre_arch
     la inflación esperada mensual. La segunda columna contiene la inflación espe-
     rada acumulada mes a mes.
 
+    tabla_mensual: TablaMensual.
+    Descripción: Es la misma tabla con acceso directo a cada mes. Sólo se
+    devuelve si 'mensual' es True.
+
     """
 
     import pandas as pd
+    from cache import leer_excel
     from datetime import datetime
+    import numpy as np
+    from calendario import fecha_calculo, fin_de_mes, fines_de_mes, meses
+
+    # Fecha de cálculo.
+    hoy=fecha_calculo(as_of)
 
     # Creamos las fechas que posteriormente se convertirán en el índice de la 
     # tabla de inflación.
-    año=[]
-    for i in range(5):
-        i=i+1
-        for j in range(1,13):
-            año.append(datetime.now().year-1+i)
-        
-    año=pd.DataFrame(año)
-    año.columns=['año']
-    año['mes']=0
-
-    for i in año.index:
-        if i+1<=12:
-            año.loc[i,'mes']=i+1
-        elif i+1<=24:
-            año.loc[i,'mes']=i+1-12    
-        elif i+1<=36:
-            año.loc[i,'mes']=i+1-24
-        elif i+1<=48:
-            año.loc[i,'mes']=i+1-36
-        elif i+1<=60:
-            año.loc[i,'mes']=i+1-48
-        else:
-            año.loc[i,'mes']=i+1-60
-        if i==año.index[-1]:
-            break
-
-    año['fecha']=0
-    for i in año.index:
-        año1=año.loc[i,'año']
-        mes1=año.loc[i,'mes']
-        if mes1==2: 
-           fecha=f'{año1}-{mes1}-28'
-           fecha=datetime.strptime(fecha,'%Y-%m-%d')
-           año.loc[i,'fecha']=fecha
-        elif (mes1==4) or (mes1==6) or (mes1==9) or (mes1==11):
-           fecha=f'{año1}-{mes1}-30'
-           fecha=datetime.strptime(fecha,'%Y-%m-%d')
-           año.loc[i,'fecha']=fecha
-        else:
-           fecha=f'{año1}-{mes1}-31'
-           fecha=datetime.strptime(fecha,'%Y-%m-%d')
-           año.loc[i,'fecha']=fecha
+    f_horizonte=fin_de_mes(datetime.strptime(f_horizonte,'%Y-%m-%d'))
+    año=fines_de_mes(hoy,f_horizonte)
+    año=año[año>=hoy]
 
-    año=año.loc[año.fecha>=datetime.now()]
-
-    # Creamos la tabla inflación para los diferentes escenarios. 
-    tabla_infla_esc=año
-    tabla_infla_esc['infla_mens']=0
-    tabla_infla_esc['infla_acum']=0
-    tabla_infla_esc.drop(['año','mes'],axis=1,inplace=True)
-    tabla_infla_esc.set_index('fecha',inplace=True)
+    # Creamos la tabla inflación para los diferentes escenarios.
+    tabla_infla_esc=pd.DataFrame({'infla_mens':0.,'infla_acum':0.},index=año)
 
     # Ahora introducimos la inflación base y su tasa de variación (en puntos 
     # porcentuales), así podremos colocar la inflación mensual esperada.
     
-    tabla_infla_esc.iloc[0,0]=tabla_infla(fecha1).iloc[1,0]
+    if tabla_base is None:
+        tabla_base=tabla_infla(fecha1,directorio,nombre_archivo,mercado=mercado,as_of=hoy)
+    tabla_infla_esc.iloc[0,0]=tabla_base.iloc[1,0]
     tabla_infla_esc.iloc[1,0]=tem_base
 
     for i in range(2,len(tabla_infla_esc.index)):
         tabla_infla_esc.iloc[i,0]=tabla_infla_esc.iloc[i-1,0]+t_var_tem
         
     tabla_infla_esc['infla_acum']=(1+tabla_infla_esc['infla_mens']).cumprod()-1    
-        
-    # Recortamos la 'tabla_infla_esc' descartando las fechas posteriores a la 
-    # fecha horizonte.
-    f_horizonte=datetime.strptime(f_horizonte,'%Y-%m-%d')
-
-    if f_horizonte.month==2:
-        f_horizonte=f'{f_horizonte.year}-{f_horizonte.month}-28'
-    elif (f_horizonte.month==4) or (f_horizonte.month==6) or (f_horizonte.month==9) or (
-            f_horizonte.month==11):
-        f_horizonte=f'{f_horizonte.year}-{f_horizonte.month}-30'
-    else:
-        f_horizonte=f'{f_horizonte.year}-{f_horizonte.month}-31'
-
-    f_horizonte=datetime.strptime(f_horizonte, '%Y-%m-%d')
-
-    tabla_infla_esc=tabla_infla_esc.loc[tabla_infla_esc.index<=f_horizonte]
 
     # INPUT: Fecha de diciembre e inflación de diciembre del año anterior al actual. 
     # ESTO DEBE ACTUALIZARSE TODOS LOS MESES.
     # No obstnate, si el mes actual no es enero, entonces la aclaración anterior no
     # corresponde, y en su lugar se debe colocar la inflación del mes anterior al 
     # actual.
-    serie_cer=pd.read_excel(f'{directorio}/{nombre_archivo_cer}.xlsx').set_index('Fecha')
-    
-    if datetime.now().month==1:
-        mes_ant=12
-        año_ant=datetime.now().year-1
-        
-        f_dic22_1=f'{año_ant}-{mes_ant}-01'
-        f_dic22_1=datetime.strptime(f_dic22_1,'%Y-%m-%d')
-        f_dic22_2=f'{año_ant}-{mes_ant}-31'
-        f_dic22_2=datetime.strptime(f_dic22_2,'%Y-%m-%d')
-        
-        t_rem=serie_cer.loc[serie_cer.index==f_dic22_2].iloc[0,0
-                            ]/serie_cer.loc[serie_cer.index==f_dic22_1].iloc[0,0]-1
-        l=[f_dic22_2,t_rem,0]
+    if mercado is None:
+        serie_cer=leer_excel(f'{directorio}/{nombre_archivo_cer}.xlsx').set_index('Fecha')
     else:
-        mes_ant=datetime.now().month-1
-        año_act=datetime.now().year
-        
-        f_mesant1=f'{año_act}-{mes_ant}-01'
-        f_mesant1=datetime.strptime(f_mesant1,'%Y-%m-%d')   
-        if mes_ant==2:   
-            f_mesant2=f'{año_act}-{mes_ant}-28'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_cer.loc[serie_cer.index==f_mesant2].iloc[0,0
-                            ]/serie_cer.loc[serie_cer.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]
-        elif (mes_ant==4) or (mes_ant==6) or (mes_ant==9) or (mes_ant==11):       
-            f_mesant2=f'{año_act}-{mes_ant}-30'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_cer.loc[serie_cer.index==f_mesant2].iloc[0,0
-                            ]/serie_cer.loc[serie_cer.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]
-        else: 
-            f_mesant2=f'{año_act}-{mes_ant}-31'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_cer.loc[serie_cer.index==f_mesant2].iloc[0,0
-                            ]/serie_cer.loc[serie_cer.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]
+        serie_cer=mercado.serie_cer
     
+    # El mes anterior al actual, con su primer y su último día.
+    mes_ant=np.datetime64(hoy,'M')-1
+    f_mesant1,f_mesant2=[pd.Timestamp(f[0]).to_pydatetime() for f in meses(mes_ant,mes_ant)]
+
+    t_rem=serie_cer.loc[serie_cer.index==f_mesant2].iloc[0,0
+                        ]/serie_cer.loc[serie_cer.index==f_mesant1].iloc[0,0]-1
+    l=[f_mesant2,t_rem,0]
+
     # Se crea el DataFrame que contiene la fecha de diciembre o del mes anterior, y
     # se le suma su inflación. 
     l=pd.DataFrame(l).T
@@ -1538,6 +1092,9 @@ def tabla_infla_esc(tem_base,t_var_tem,fecha1,f_horizonte,directorio,nombre_arch
     tabla_infla_esc=pd.concat([tabla_infla_esc,l],axis=0)
     tabla_infla_esc.sort_index(inplace=True)
     
+    if mensual:
+        from tablas import TablaMensual
+        return tabla_infla_esc,TablaMensual.desde_tabla(tabla_infla_esc)
     return tabla_infla_esc
 
 # ----------------------------------------------------------------------------
@@ -1545,9 +1102,13 @@ def tabla_infla_esc(tem_base,t_var_tem,fecha1,f_horizonte,directorio,nombre_arch
 
 #                                   FUNCION 9
 
+@medido()
+@memorizado
 def tabla_dev_esc(t_tc_base,var_t_tc,f_horizonte,f_limite,fecha1,tipo,tcn_hoy,
                   tcn_rofex,ticket_usd,ticket_cer,ticket_dl,ticket_pesos,
-                  directorio,nombre_archivo_tc,meses_adelante=6):
+                  directorio=None,nombre_archivo_tc=None,meses_adelante=6,
+                  mercado=None,mensual=False,as_of=None,nombre_archivo=None,
+                  tabla_base=None):
     """
     Genera un DataFrame con un escenario imaginado sobre el devenir de la de-
     valuación/depreciación. Sólo se debe establecer una base para y una tasa de 
@@ -1623,6 +1184,29 @@ def tabla_dev_esc(t_tc_base,var_t_tc,f_horizonte,f_limite,fecha1,tipo,tcn_hoy,
     nombre_archivo_tc: String.
     Descripción: Es el nombre del archivo excel con la serie del A3500.
 
+    nombre_archivo: String.
+    Descripción: Es el nombre del archivo excel con datos de bonos u ONs, de
+    donde 'tabla_dev' toma las curvas.
+
+    tabla_base: DataFrame, opcional.
+    Descripción: Es la tabla de 'tabla_dev' con los mismos argumentos, de donde
+    se toma la dep/dev esperada del mes en curso. Si no se indica, se calcula
+    con 'tabla_dev'.
+
+    mercado: MarketSnapshot, opcional.
+    Descripción: Es la foto del mercado con las curvas y la serie del A3500 ya
+    importadas (ver 'mercado.py'). Si se indica, no se leen los archivos de excel.
+
+    mensual: Boolean, opcional.
+    Descripción: Si es True, además del DataFrame se devuelve la misma tabla
+    como 'TablaMensual' (ver 'tablas.py'), con acceso directo a cada mes. Por
+    defecto es False.
+
+    as_of: String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, que reemplaza a la fecha de hoy. Por
+    ejemplo, '2024-06-15'. Si no se indica, se usa el día de hoy (ver
+    'fecha_calculo' en 'calendario.py').
+
     RESULTADO
     -------
     tabla_dev_esc : DataFrame.
@@ -1630,157 +1214,61 @@ def tabla_dev_esc(t_tc_base,var_t_tc,f_horizonte,f_limite,fecha1,tipo,tcn_hoy,
     la dep/dev esperada mensual. La segunda columna contiene la dep/dev espe-
     rada acumulada mes a mes.
 
+    tabla_mensual: TablaMensual.
+    Descripción: Es la misma tabla con acceso directo a cada mes. Sólo se
+    devuelve si 'mensual' es True.
+
     """
     
     import pandas as pd
+    from cache import leer_excel
     from datetime import datetime
+    from calendario import fecha_calculo, fin_de_mes, fines_de_mes
+
+    # Fecha de cálculo.
+    hoy=fecha_calculo(as_of)
 
     # Creamos las fechas que posteriormente se convertirán en el índice de la tabla
     # de inflación.
-    año=[]
-    for i in range(5):
-        i=i+1
-        for j in range(1,13):
-            año.append(datetime.now().year-1+i)
-
-    año=pd.DataFrame(año)
-    año.columns=['año']
-    año['mes']=0
-
-    for i in año.index:
-        if i+1<=12:
-            año.loc[i,'mes']=i+1
-        elif i+1<=24:
-            año.loc[i,'mes']=i+1-12    
-        elif i+1<=36:
-            año.loc[i,'mes']=i+1-24
-        elif i+1<=48:
-            año.loc[i,'mes']=i+1-36
-        elif i+1<=60:
-            año.loc[i,'mes']=i+1-48
-        else:
-            año.loc[i,'mes']=i+1-60
-        if i==año.index[-1]:
-            break
-
-    año['fecha']=0
-    for i in año.index:
-        año1=año.loc[i,'año']
-        mes1=año.loc[i,'mes']
-        if mes1==2: 
-           fecha=f'{año1}-{mes1}-28'
-           fecha=datetime.strptime(fecha,'%Y-%m-%d')
-           año.loc[i,'fecha']=fecha
-        elif (mes1==4) or (mes1==6) or (mes1==9) or (mes1==11):
-           fecha=f'{año1}-{mes1}-30'
-           fecha=datetime.strptime(fecha,'%Y-%m-%d')
-           año.loc[i,'fecha']=fecha
-        else:
-           fecha=f'{año1}-{mes1}-31'
-           fecha=datetime.strptime(fecha,'%Y-%m-%d')
-           año.loc[i,'fecha']=fecha
+    f_horizonte=fin_de_mes(datetime.strptime(f_horizonte,'%Y-%m-%d'))
+    año=fines_de_mes(hoy,f_horizonte)
+    año=año[año>=hoy]
 
-    año=año.loc[año.fecha>=datetime.now()]
-
-    # Creamos la tabla inflación para los diferentes escenarios. 
-    tabla_dev_esc=año
-    tabla_dev_esc['dev_men']=0
-    tabla_dev_esc['dev_acum']=0
-    tabla_dev_esc.drop(['año','mes'],axis=1,inplace=True)
-    tabla_dev_esc.set_index('fecha',inplace=True)
+    # Creamos la tabla inflación para los diferentes escenarios.
+    tabla_dev_esc=pd.DataFrame({'dev_men':0.,'dev_acum':0.},index=año)
 
     # Ahora introducimos la inflación base y su tasa de variación (en puntos porcen-
     # tuales), así podremos colocar la inflación mensual esperada. 
-    tabla_dev_esc.iloc[0,0]=tabla_dev(f_limite,fecha1,tipo,tcn_hoy,tcn_rofex,
-                                      ticket_usd,ticket_cer,ticket_dl,ticket_pesos,
-                                      meses_adelante).iloc[1,0]
+    if tabla_base is None:
+        tabla_base=tabla_dev(f_limite,fecha1,tipo,tcn_hoy,tcn_rofex,ticket_usd,ticket_cer,
+                             ticket_dl,ticket_pesos,directorio=directorio,
+                             nombre_archivo=nombre_archivo,
+                             nombre_archivo_tc=nombre_archivo_tc,
+                             meses_adelante=meses_adelante,mercado=mercado,as_of=hoy)
+    tabla_dev_esc.iloc[0,0]=tabla_base.iloc[1,0]
     tabla_dev_esc.iloc[1,0]=t_tc_base
 
     for i in range(2,len(tabla_dev_esc.index)):
         tabla_dev_esc.iloc[i,0]=tabla_dev_esc.iloc[i-1,0]+var_t_tc
         
     tabla_dev_esc['dev_acum']=(1+tabla_dev_esc['dev_men']).cumprod()-1    
-          
-    # Recortamos la 'tabla_infla_esc' descartando las fechas posteriores a la fecha
-    # horizonte.
-    f_horizonte=datetime.strptime(f_horizonte,'%Y-%m-%d')
-
-    if f_horizonte.month==2:
-        f_horizonte=f'{f_horizonte.year}-{f_horizonte.month}-28'
-    elif (f_horizonte.month==4) or (f_horizonte.month==6) or (f_horizonte.month==9) or (
-            f_horizonte.month==11):
-        f_horizonte=f'{f_horizonte.year}-{f_horizonte.month}-30'
-    else:
-        f_horizonte=f'{f_horizonte.year}-{f_horizonte.month}-31'
-
-    f_horizonte=datetime.strptime(f_horizonte, '%Y-%m-%d')
-
-    tabla_dev_esc=tabla_dev_esc.loc[tabla_dev_esc.index<=f_horizonte]
 
     # INPUT: Fecha de diciembre y tasa de dev/dep de diciembre del año anterior 
     # al actual. ESTO DEBE ACTUALIZARSE TODOS LOS MESES.
     # No obstante, si el mes actual no es enero, entonces la aclaración anterior
     # no corresponde, y en su lugar se debe colocar la tasa de dev/dep del mes 
     # anterior al actual.    
-    serie_tca3500=pd.read_excel(f'{directorio}/{nombre_archivo_tc}.xlsx').set_index('Fecha')
-    
-    if datetime.now().month==1:
-        mes_ant=12
-        año_ant=datetime.now().year-1
-        
-        f_dic22_1=f'{año_ant}-{mes_ant}-02'
-        f_dic22_1=datetime.strptime(f_dic22_1,'%Y-%m-%d')
-        f_dic22_2=f'{año_ant}-{mes_ant}-30'
-        f_dic22_2=datetime.strptime(f_dic22_2,'%Y-%m-%d')
-        
-        t_rem=serie_tca3500.loc[serie_tca3500.index==f_dic22_2].iloc[0,0
-                ]/serie_tca3500.loc[serie_tca3500.index==f_dic22_1].iloc[0,0]-1
-        l=[f_dic22_2,t_rem,0]
-           
+    if mercado is None:
+        serie_tca3500=leer_excel(f'{directorio}/{nombre_archivo_tc}.xlsx').set_index('Fecha')
     else:
-        mes_ant=datetime.now().month-1
-        año_act=datetime.now().year
-         
-        if mes_ant==1:
-            f_mesant1=f'{año_act}-{mes_ant}-02'
-            f_mesant1=datetime.strptime(f_mesant1,'%Y-%m-%d')   
-            
-            f_mesant2=f'{año_act}-{mes_ant}-31'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_tca3500.loc[serie_tca3500.index==f_mesant2].iloc[0,0
-                ]/serie_tca3500.loc[serie_tca3500.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]       
-        elif mes_ant==2:   
-            f_mesant1=f'{año_act}-{mes_ant}-01'
-            f_mesant1=datetime.strptime(f_mesant1,'%Y-%m-%d')   
-            
-            f_mesant2=f'{año_act}-{mes_ant}-28'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_tca3500.loc[serie_tca3500.index==f_mesant2].iloc[0,0
-                ]/serie_tca3500.loc[serie_tca3500.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]       
-        elif (mes_ant==4) or (mes_ant==6) or (mes_ant==9) or (mes_ant==11): 
-            f_mesant1=f'{año_act}-{mes_ant}-01'
-            f_mesant1=datetime.strptime(f_mesant1,'%Y-%m-%d')  
-            
-            f_mesant2=f'{año_act}-{mes_ant}-30'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_tca3500.loc[serie_tca3500.index==f_mesant2].iloc[0,0
-                ]/serie_tca3500.loc[serie_tca3500.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]     
-        else: 
-            f_mesant1=f'{año_act}-{mes_ant}-01'
-            f_mesant1=datetime.strptime(f_mesant1,'%Y-%m-%d')  
-            
-            f_mesant2=f'{año_act}-{mes_ant}-31'
-            f_mesant2=datetime.strptime(f_mesant2,'%Y-%m-%d')
-            
-            t_rem=serie_tca3500.loc[serie_tca3500.index==f_mesant2].iloc[0,0
-                ]/serie_tca3500.loc[serie_tca3500.index==f_mesant1].iloc[0,0]-1
-            l=[f_mesant2,t_rem,0]
+        serie_tca3500=mercado.serie_tca3500
+    
+    # El mes anterior al actual, con su primer y su último día.
+    f_mesant1,f_mesant2=_mes_anterior_a3500(hoy)
+
+    t_rem=serie_tca3500.loc[serie_tca3500.index==f_mesant2].iloc[0,0
+            ]/serie_tca3500.loc[serie_tca3500.index==f_mesant1].iloc[0,0]-1
+    l=[f_mesant2,t_rem,0]
     
     # Se crea el DataFrame que contiene la fecha de diciembre y su inflación.
     l=pd.DataFrame(l).T
@@ -1791,6 +1279,9 @@ def tabla_dev_esc(t_tc_base,var_t_tc,f_horizonte,f_limite,fecha1,tipo,tcn_hoy,
     tabla_dev_esc=pd.concat([tabla_dev_esc,l],axis=0)
     tabla_dev_esc.sort_index(inplace=True)
 
+    if mensual:
+        from tablas import TablaMensual
+        return tabla_dev_esc,TablaMensual.desde_tabla(tabla_dev_esc)
     return tabla_dev_esc    
 
 # ----------------------------------------------------------------------------
@@ -1798,8 +1289,10 @@ def tabla_dev_esc(t_tc_base,var_t_tc,f_horizonte,f_limite,fecha1,tipo,tcn_hoy,
 
 #                                   FUNCION 10
 
+@medido(ticket='ticket')
 def flujobono_act(tabla_inflaa,tabla_deva,ticket,f_horizonte,i_cer_hoy,tcn_hoy,
-                  directorio, nombre_archivo, vn=100):
+                  directorio=None, nombre_archivo=None, vn=100, mercado=None,
+                  flujo_base=None,as_of=None):
     """
     Esta función modifica el flujo de fondos del bono, actualizando su saldo de 
     acuerdo al índice correspondiente (CER o TCA3500). Si el bono no debe actua-
@@ -1846,6 +1339,20 @@ def flujobono_act(tabla_inflaa,tabla_deva,ticket,f_horizonte,i_cer_hoy,tcn_hoy,
     inversión para obtener la cantidad de valores nominales comprados dado el precio 
     de compra y el valor nominal mínimo (monto invertido*valor nominal / precio).
 
+    mercado : MarketSnapshot, opcional.
+    Descripción: Es la foto del mercado con las características de los bonos ya
+    importadas (ver 'mercado.py'). Si se indica, no se lee el archivo de excel.
+
+    flujo_base : DataFrame, opcional.
+    Descripción: Es el flujo de fondos base hasta la fecha horizonte, ya calcu-
+    lado para el mismo 'vn' (por ejemplo, con 'cronograma_bono' de 'flujos.py').
+    Si no se indica, se obtiene con la función dos (2).
+
+    as_of : String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, que reemplaza a la fecha de hoy. Por
+    ejemplo, '2024-06-15'. Si no se indica, se usa el día de hoy (ver
+    'fecha_calculo' en 'calendario.py').
+
     RESULTADO
     -------
     flujo_bb : DataFrame.
@@ -1854,17 +1361,24 @@ def flujobono_act(tabla_inflaa,tabla_deva,ticket,f_horizonte,i_cer_hoy,tcn_hoy,
 
     """
     
-    import pandas as pd
-    from datetime import datetime
+    from cache import leer_excel
+    from indices import proyectar_indice, REZAGO_CER, REZAGO_TC
 
     # Obtenemos los inputs. Primero fijamos el ticket y la fecha horizonte, impor-
     # tamos el excel sobre características de los bonos, y luego obtenemos el flujo
     # de fondos dividios el índice CER de la fecha de emisión.
-    bonos=pd.read_excel(f'{directorio}/{nombre_archivo}.xlsx').set_index('Ticket')
-    flujo_bb=ffbonocap(bonos.cupon1.loc[ticket],bonos.cupon2.loc[ticket],
-                           bonos.f_vencimiento.loc[ticket],f_horizonte,
-                           bonos.tasa_cupon_anual.loc[ticket],
-                           bonos.tipo_bono1.loc[ticket],bonos.tipo_bono3[ticket],vn)
+    if mercado is None:
+        bonos=leer_excel(f'{directorio}/{nombre_archivo}.xlsx').set_index('Ticket')
+    else:
+        bonos=mercado.bonos
+    if flujo_base is None:
+        flujo_bb=ffbonocap(bonos.cupon1.loc[ticket],bonos.cupon2.loc[ticket],
+                               bonos.f_vencimiento.loc[ticket],f_horizonte,
+                               bonos.tasa_cupon_anual.loc[ticket],
+                               bonos.tipo_bono1.loc[ticket],bonos.tipo_bono3[ticket],vn,
+                               as_of)
+    else:
+        flujo_bb=flujo_base.copy()
 
     # Obtenemos el flujo de fondos del bono bullet ajustado por la inflación 
     # esperada o depreciación esperada.
@@ -1873,128 +1387,17 @@ def flujobono_act(tabla_inflaa,tabla_deva,ticket,f_horizonte,i_cer_hoy,tcn_hoy,
         # emisión.
         flujo_bb=flujo_bb/bonos.indice_inicial.loc[ticket]
 
-        # Se acualiza el índice CER de hoy y se lo ajusta para tener en cuenta la 
-        # fecha de cobro y que sea de 10 días antes de dicha fecha. 
-        for i in range(1,len(flujo_bb.index)):
-            #Primera etapa: ajuste con el índice en bruto.
-            tasa_infla_acum=tabla_inflaa.loc[
-                (tabla_inflaa.index.year==flujo_bb.index[i].year)&
-                (tabla_inflaa.index.month==flujo_bb.index[i].month)].iloc[0,-1]
-            i_cer_act=i_cer_hoy*(1+tasa_infla_acum)
-                
-            # Segunda etapa: ajuste del índice.    
-            if flujo_bb.index[i].day-10>=0:
-                tasa_infla=tabla_inflaa.loc[
-                       (tabla_inflaa.index.year==flujo_bb.index[i].year)&
-                       (tabla_inflaa.index.month==flujo_bb.index[i].month)].iloc[0,0]
-                potencia=(flujo_bb.index[i].day-10)/tabla_inflaa.loc[
-                     (tabla_inflaa.index.year==flujo_bb.index[i].year)&
-                     (tabla_inflaa.index.month==flujo_bb.index[i].month)].index.day[0]
-                
-                i_cer_act=(i_cer_act/(1+tasa_infla))*(1+tasa_infla)**potencia
-                              
-                flujo_bb.iloc[i]=flujo_bb.iloc[i]*i_cer_act
-                    
-            elif (flujo_bb.index[i].day-10<0) & (flujo_bb.index[i].month==1):   
-                tasa_infla1=tabla_inflaa.loc[
-                       (tabla_inflaa.index.year==flujo_bb.index[i].year)&
-                       (tabla_inflaa.index.month==flujo_bb.index[i].month)].iloc[0,0]
-                tasa_infla2=tabla_inflaa.loc[
-                       (tabla_inflaa.index.year==flujo_bb.index[i].year-1)&
-                       (tabla_inflaa.index.month==12)].iloc[0,0]
-                
-                # Como nos vamos al mes de diciembre del "año anterior", la 
-                # cantidad máxima de días es siempre 31.            
-                dias=31+(flujo_bb.index[i].day-10)            
-                base=31
-                
-                potencia=dias/base
-                
-                i_cer_act=(i_cer_act/((1+tasa_infla2)*(1+tasa_infla1)))*(
-                                                            1+tasa_infla2)**potencia
-                                 
-                flujo_bb.iloc[i]=flujo_bb.iloc[i]*i_cer_act               
-
-            else: 
-                tasa_infla1=tabla_inflaa.loc[
-                       (tabla_inflaa.index.year==flujo_bb.index[i].year)&
-                       (tabla_inflaa.index.month==flujo_bb.index[i].month)].iloc[0,0]
-                tasa_infla2=tabla_inflaa.loc[
-                       (tabla_inflaa.index.year==flujo_bb.index[i].year)&
-                       (tabla_inflaa.index.month==flujo_bb.index[i].month-1)].iloc[0,0]
-
-                fecha1=tabla_inflaa.loc[
-                       (tabla_inflaa.index.year==flujo_bb.index[i].year)&
-                       (tabla_inflaa.index.month==flujo_bb.index[i].month)].index[0]
-                mascara=tabla_inflaa.loc[tabla_inflaa.index<=fecha1]
-                dias=mascara.index[-2].day            
-                
-                potencia=(dias+(flujo_bb.index[i].day-10))/tabla_inflaa.loc[
-                     (tabla_inflaa.index.year==flujo_bb.index[i].year)&
-                     (tabla_inflaa.index.month==flujo_bb.index[i].month-1)].index.day[0]
-                i_cer_act=(i_cer_act/((1+tasa_infla2)*(1+tasa_infla1)))*(1+tasa_infla2)**potencia
-                                 
-                flujo_bb.iloc[i]=flujo_bb.iloc[i]*i_cer_act      
+        # Se actualiza cada flujo con el índice CER proyectado de 10 días antes
+        # de la fecha de cobro. La proyección diaria del índice se construye
+        # una sola vez por tabla (ver 'indices.py').
+        cer=proyectar_indice(tabla_inflaa,i_cer_hoy,REZAGO_CER)
+        flujo_bb.iloc[1:]=flujo_bb.iloc[1:].mul(cer.indice(flujo_bb.index[1:]),axis=0)
 
     elif bonos.tipo_bono2.loc[ticket]=='DL':
-        # Este proceso de actualización se realiza en dos etapas, siempre respe-
-        # tando que el tca3500 debe ser el de 3 días antes de la fecha de cobro.    
-        # Etapa uno: Aplicación del tcA3500 en bruto.   
-        for i in range(1,len(flujo_bb.index)):
-            tasa_act_acum=1+tabla_deva.loc[(tabla_deva.index.month==flujo_bb.index[i].month)&
-                            (tabla_deva.index.year==flujo_bb.index[i].year)].iloc[0,1]
-            flujo_bb.iloc[i,:]=flujo_bb.iloc[i,:]*tcn_hoy*tasa_act_acum
-            
-        # Etapa dos: ajuste del tcA3500.
-            if flujo_bb.index[i].day-3>=0:   
-                tasa_act_men=1+tabla_deva.loc[
-                            (tabla_deva.index.month==flujo_bb.index[i].month)&
-                            (tabla_deva.index.year==flujo_bb.index[i].year)].iloc[0,0]
-                potencia=(flujo_bb.index[i].day-3)/tabla_deva.loc[
-                        (tabla_deva.index.year==flujo_bb.index[i].year)&
-                        (tabla_deva.index.month==flujo_bb.index[i].month)].index.day[0]
-            
-                flujo_bb.iloc[i,:]=(flujo_bb.iloc[i,:]/tasa_act_men
-                                                            )*tasa_act_men**potencia
-         
-            elif (flujo_bb.index[i].day-3<0) & (flujo_bb.index[i].month==1):
-                tasa_act_men1=1+tabla_deva.loc[
-                            (tabla_deva.index.month==flujo_bb.index[i].month)&
-                            (tabla_deva.index.year==flujo_bb.index[i].year)].iloc[0,0]
-                tasa_act_men2=1+tabla_deva.loc[
-                            (tabla_deva.index.month==12)&
-                            (tabla_deva.index.year==flujo_bb.index[i].year-1)].iloc[0,0]
-              
-                # Como nos vamos al mes de diciembre del "año anterior", la 
-                # cantidad máxima de días es siempre 31.
-                dias=31+(flujo_bb.index[i].day-3)
-                base=31
-               
-                potencia=dias/base
-
-                flujo_bb.iloc[i,:]=(flujo_bb.iloc[i,:]/(tasa_act_men1*tasa_act_men2)
-                                                            )*tasa_act_men2**potencia
-                
-            else:
-                tasa_act_men1=1+tabla_deva.loc[
-                            (tabla_deva.index.month==flujo_bb.index[i].month)&
-                            (tabla_deva.index.year==flujo_bb.index[i].year)].iloc[0,0]
-                tasa_act_men2=1+tabla_deva.loc[
-                            (tabla_deva.index.month==flujo_bb.index[i].month-1)&
-                            (tabla_deva.index.year==flujo_bb.index[i].year)].iloc[0,0]
-
-                mascara_dias=tabla_deva.loc[
-                    (tabla_deva.index.year==flujo_bb.index[i].year)&
-                    (tabla_deva.index.month==flujo_bb.index[i].month-1)].index.day[0]
-                dias=mascara_dias+(flujo_bb.index[i].day-3)
-                base=tabla_deva.loc[
-                    (tabla_deva.index.year==flujo_bb.index[i].year)&
-                    (tabla_deva.index.month==flujo_bb.index[i].month-1)].index.day[0]
-                
-                potencia=dias/base
-
-                flujo_bb.iloc[i,:]=(flujo_bb.iloc[i,:]/(tasa_act_men1*tasa_act_men2)
-                                                            )*tasa_act_men2**potencia
+        # Se actualiza cada flujo con el tcA3500 proyectado de 3 días antes de
+        # la fecha de cobro.
+        tca3500=proyectar_indice(tabla_deva,tcn_hoy,REZAGO_TC)
+        flujo_bb.iloc[1:]=flujo_bb.iloc[1:].mul(tca3500.indice(flujo_bb.index[1:]),axis=0)
     
     return flujo_bb
 
@@ -2003,8 +1406,9 @@ def flujobono_act(tabla_inflaa,tabla_deva,ticket,f_horizonte,i_cer_hoy,tcn_hoy,
 
 #                                   FUNCION 11
 
+@medido(ticket='ticket')
 def p_reventa(tabla_fb,tabla_inflaa,tabla_devaa,fecha1,f_horizonte,tipo,
-              i_cer_hoy,tc_hoy,ticket):
+              i_cer_hoy,tc_hoy,ticket,mercado=None,as_of=None):
     """
     Esta función permite obtener el precio de venta esperado del bono de interés.
     Dicho precio se obtiene utilizando la curva de rendimiento.
@@ -2042,6 +1446,16 @@ def p_reventa(tabla_fb,tabla_inflaa,tabla_devaa,fecha1,f_horizonte,tipo,
     Descripción: Es el nombre del bono o letra sobre la que se quiere obtener 
     el precio de reventa.
 
+    mercado : MarketSnapshot, opcional.
+    Descripción: Es la foto del mercado con las características de los bonos y
+    las curvas de la fecha 'fecha1' ya importadas (ver 'mercado.py'). Si no se
+    indica, se leen los archivos 'Bonoscaracteristicas' y 'Bonoscurvas'.
+
+    as_of : String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, que reemplaza a la fecha de hoy. Por
+    ejemplo, '2024-06-15'. Si no se indica, se usa el día de hoy (ver
+    'fecha_calculo' en 'calendario.py').
+
     RESULTADO
     -------
     precio_vta : Float.
@@ -2049,65 +1463,72 @@ def p_reventa(tabla_fb,tabla_inflaa,tabla_devaa,fecha1,f_horizonte,tipo,
 
     """
     
-    import pandas as pd 
-    from datetime import datetime
-    from statsmodels.formula.api import ols
+    from cache import leer_excel
+    from calendario import fecha_calculo
+    from curvas import ajustar_curva
+    from indices import proyectar_indice, REZAGO_CER, REZAGO_TC
     import numpy as np
 
-    # Fecha actual.
-    hoy=datetime.now()
+    # Fecha de cálculo.
+    hoy=fecha_calculo(as_of)
 
     # Comienzan los cálculos previos
     fecha_cer=f'{fecha1} CER'
     fecha_pesos=f'{fecha1} Pesos'
     fecha_dl=f'{fecha1} DL'
 
-    # Se lee el excel que contiene las condiciones sustanciales de los bonos.
-    bonoss=pd.read_excel('Bonoscaracteristicas.xlsx').set_index('Ticket')
+    # Se lee el excel que contiene las condiciones sustanciales de los bonos, y
+    # se importan las series de TIR y DM de renta fija CER, en pesos, y DL.
+    if mercado is None:
+        bonoss=leer_excel('Bonoscaracteristicas.xlsx').set_index('Ticket')
 
-    # Importamos las series de TIR y DM de renta fija CER y en pesos.
-    curva_cer=pd.read_excel('Bonoscurvas.xlsx',sheet_name=fecha_cer)
-    curva_pesos=pd.read_excel('Bonoscurvas.xlsx',sheet_name=fecha_pesos)
-    curva_dl=pd.read_excel('Bonoscurvas.xlsx',sheet_name=fecha_dl)
+        curva_cer=leer_excel('Bonoscurvas.xlsx',sheet_name=fecha_cer)
+        curva_pesos=leer_excel('Bonoscurvas.xlsx',sheet_name=fecha_pesos)
+        curva_dl=leer_excel('Bonoscurvas.xlsx',sheet_name=fecha_dl)
+    else:
+        bonoss=mercado.bonos
 
-    # Realizamos la regresión OLS con logaritmo neperiano sobre el regresor (DM)
-    reg_cer=ols('TIR_anual ~ np.log(DMdias)', data=curva_cer).fit()
-    reg_pesos=ols('TIR_anual ~ np.log(DMdias)', data=curva_pesos).fit()
-    reg_dl=ols('TIR_anual ~ np.log(DMdias)', data=curva_dl).fit()
+        curva_cer=mercado.curva('CER')
+        curva_pesos=mercado.curva('Pesos')
+        curva_dl=mercado.curva('DL')
+
+    # Realizamos la regresión OLS con logaritmo neperiano sobre el regresor (DM).
+    # Las curvas ya ajustadas para esta fecha no se vuelven a ajustar.
+    reg_cer=ajustar_curva(curva_cer,'CER',fecha1)
+    reg_pesos=ajustar_curva(curva_pesos,'Pesos',fecha1)
+    reg_dl=ajustar_curva(curva_dl,'DL',fecha1)
 
     # Obtenemos el valor de los coeficientes de la regresión lineal log simple.
-    inter_cer=reg_cer.params[0]
-    coef_cer=reg_cer.params[1]
+    inter_cer=reg_cer.intercept
+    coef_cer=reg_cer.slope
 
-    inter_pesos=reg_pesos.params[0]
-    coef_pesos=reg_pesos.params[1]
+    inter_pesos=reg_pesos.intercept
+    coef_pesos=reg_pesos.slope
 
-    inter_dl=reg_dl.params[0]
-    coef_dl=reg_dl.params[1]
+    inter_dl=reg_dl.intercept
+    coef_dl=reg_dl.slope
 
     # A partir de aquí se aplica los cálculos para obtener el precio de reventa 
     # según corresponda.
     if (tipo=='CER') or (tipo=='DUAL-CER'):
         # Actualizamos y aplicamos el índice CER sobre el flujo de fondos, junto con 
         # el índice CER de la fecha de emisión.
-        f_horizonte=datetime.strptime(f_horizonte,'%Y-%m-%d')
         i_cer_emi=bonoss.indice_inicial.loc[ticket]
 
-        f_act_cer=tabla_inflaa.loc[(tabla_inflaa.index.year==f_horizonte.year) & (
-                                    tabla_inflaa.index.month==f_horizonte.month)
-                                                                        ].iloc[0,-1]
+        # Índice CER proyectado al cierre del mes horizonte.
+        i_cer_h=proyectar_indice(tabla_inflaa,i_cer_hoy,REZAGO_CER
+                                 ).indice_fin_de_mes(f_horizonte)
         if tipo=='DUAL-CER':
-            tabla_fb_act=(tabla_fb*i_cer_hoy*(1+f_act_cer)*bonoss.tc_inicial.loc[ticket]
-                                                                      )/i_cer_emi
+            tabla_fb_act=(tabla_fb*i_cer_h*bonoss.tc_inicial.loc[ticket])/i_cer_emi
         else:
-            tabla_fb_act=(tabla_fb*i_cer_hoy*(1+f_act_cer))/i_cer_emi
+            tabla_fb_act=(tabla_fb*i_cer_h)/i_cer_emi
 
         # Construimos la tabla de tasas forward. Creamos las columnas: 
         tabla_tf=tabla_fb_act
         tabla_tf=tabla_tf.rename(columns={'cupones':'dm_dias','saldo':'tir_anual',
                                           'flujo_total':'t_efectiva'})
-        tabla_tf['t_forward']=0
-        tabla_tf['t_cupon_cero']=0
+        tabla_tf['t_forward']=0.
+        tabla_tf['t_cupon_cero']=0.
         tabla_tf.iloc[0:,0:]=0
 
         # Construimos la tabla de tasas forward. Damos valores a las celdas:
@@ -2139,8 +1560,8 @@ def p_reventa(tabla_fb,tabla_inflaa,tabla_devaa,fecha1,f_horizonte,tipo,
         tabla_tf=tabla_fb
         tabla_tf=tabla_tf.rename(columns={'cupones':'dm_dias','saldo':'tir_anual',
                                           'flujo_total':'t_efectiva'})
-        tabla_tf['t_forward']=0
-        tabla_tf['t_cupon_cero']=0
+        tabla_tf['t_forward']=0.
+        tabla_tf['t_cupon_cero']=0.
         tabla_tf.iloc[0:,0:]=0
 
         # Construimos la tabla de tasas forward. Damos valores a las celdas:
@@ -2170,19 +1591,16 @@ def p_reventa(tabla_fb,tabla_inflaa,tabla_devaa,fecha1,f_horizonte,tipo,
     elif tipo=='DL':
         # Aplicamos el TCN3500 actual y su tasa de dep/dev correspondiente a la fecha
         # de emisión.
-        f_horizonte=datetime.strptime(f_horizonte,'%Y-%m-%d')
-
-        f_act_tc=tabla_devaa.loc[(tabla_devaa.index.year==f_horizonte.year) & (
-                                    tabla_devaa.index.month==f_horizonte.month)
-                                                                        ].iloc[0,-1]
-        tabla_fb_act=tabla_fb*tc_hoy*(1+f_act_tc)
+        tc_h=proyectar_indice(tabla_devaa,tc_hoy,REZAGO_TC
+                              ).indice_fin_de_mes(f_horizonte)
+        tabla_fb_act=tabla_fb*tc_h
 
         # Construimos la tabla de tasas forward. Creamos las columnas: 
         tabla_tf=tabla_fb_act
         tabla_tf=tabla_tf.rename(columns={'cupones':'dm_dias','saldo':'tir_anual',
                                           'flujo_total':'t_efectiva'})
-        tabla_tf['t_forward']=0
-        tabla_tf['t_cupon_cero']=0
+        tabla_tf['t_forward']=0.
+        tabla_tf['t_cupon_cero']=0.
         tabla_tf.iloc[0:,0:]=0        
       
         # Construimos la tabla de tasas forward. Damos valores a las celdas:
@@ -2216,8 +1634,11 @@ def p_reventa(tabla_fb,tabla_inflaa,tabla_devaa,fecha1,f_horizonte,tipo,
 
 #                                   FUNCION 12
 
+@medido()
+@memorizado(ignorar=('n_jobs','executor'))
 def analisis_rt(infla_tabla,deva_tabla,int_tabla,f_horizonte,i_cer_hoy,tcn_hoy,
-                fecha1,monto_invertido=50_000):
+                fecha1,monto_invertido=50_000,mercado=None,n_jobs=1,
+                executor='procesos',as_of=None):
     """
     ¿Qué hace esta función? Construye la tabla de análisis de rendimiento total
     esperado de cada uno de los bonos bullet que cotizan en el mercado (letras y
@@ -2266,6 +1687,29 @@ def analisis_rt(infla_tabla,deva_tabla,int_tabla,f_horizonte,i_cer_hoy,tcn_hoy,
     Descripción: Es la cantidad de dinero utilizada para comprar el bono/letra. 
     Por defecto es de 50_000.
 
+    mercado : MarketSnapshot, opcional.
+    Descripción: Es la foto del mercado (ver 'mercado.py') que se comparte con
+    todas las funciones que se llaman desde aquí, de modo que cada excel se lee
+    una sola vez. Si no se indica, se carga a partir de los archivos
+    'Bonoscaracteristicas' y 'Bonoscurvas' de la carpeta actual y la fecha
+    'fecha1'.
+
+    n_jobs : Integer, opcional.
+    Descripción: Es la cantidad de tickets que se calculan en paralelo. Por
+    defecto es 1 (un ticket tras otro). Si es -1 o None, se usan todos los
+    procesadores.
+
+    executor : String o Executor, opcional.
+    Descripción: Es el tipo de pool que se usa cuando 'n_jobs' es distinto de
+    1: 'procesos' (por defecto) o 'hilos'. También se puede pasar un Executor
+    de 'concurrent.futures' ya creado, que no se cierra al terminar. Los datos
+    comunes a todos los tickets se envían una sola vez a cada proceso.
+
+    as_of : String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, que reemplaza a la fecha de hoy. Por
+    ejemplo, '2024-06-15'. Si no se indica, se usa el día de hoy (ver
+    'fecha_calculo' en 'calendario.py').
+
     RESULTADO
     -------
     tabla_definitiva : DataFrame.
@@ -2279,92 +1723,59 @@ def analisis_rt(infla_tabla,deva_tabla,int_tabla,f_horizonte,i_cer_hoy,tcn_hoy,
 
     """
     
+    import os
     import pandas as pd
-    from datetime import datetime, timedelta
+    from functools import partial
+    from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+    from mercado import MarketSnapshot
+    from calendario import fecha_calculo
 
-    # A partir de aquí comienza la funcion.
-    bonoss=pd.read_excel('Bonoscaracteristicas.xlsx').set_index('Ticket')
-    ahora=datetime.now()
+    # A partir de aquí comienza la funcion. Los excels se leen una sola vez.
+    if mercado is None:
+        mercado=MarketSnapshot.cargar(fecha1,nombre_archivo_cer=None)
+    bonoss=mercado.bonos
+    ahora=fecha_calculo(as_of)
 
     # Se crea la tabla que contendrá la información que estamos queriendo calcular.
     tabla_final=[0]
     tabla_final=pd.DataFrame(tabla_final)
     tabla_final.columns=['Ticket']
-    tabla_final['RT_Anual_Esp']=0
-    tabla_final['Cupones']=0
-    tabla_final['Int_Reinv']=0
-    tabla_final['Capital_o_Reventa']=0
+    tabla_final['RT_Anual_Esp']=0.
+    tabla_final['Cupones']=0.
+    tabla_final['Int_Reinv']=0.
+    tabla_final['Capital_o_Reventa']=0.
     tabla_final['DUAL']=0
 
-    for i in bonoss.index:
-        ticket=i
-        
-        # Calculamos los valores de interés.
-        if (bonoss.tipo_bono1.loc[ticket]=='bullet') or (bonoss.tipo_bono1.loc[ticket]=='letra'):
-                vn=monto_invertido/bonoss.precio.loc[ticket]*100
-
-                # Actualizamos el flujo base si corresponde por ser CER o DL.
-                flujo_act=flujobono_act(tabla_inflaa=infla_tabla,tabla_deva=deva_tabla,
-                                        ticket=ticket,f_horizonte=f_horizonte,
-                                        i_cer_hoy=i_cer_hoy,tcn_hoy=tcn_hoy,vn=vn)           
-                
-                # # Capitalizamos el flujo de fondos. 
-                flujo_cap=capflujos(serie_t=int_tabla,f_horizonte=f_horizonte,flujo_bb=flujo_act)
-                
-                # Calculamos lo cobrado en concepto de cupones, capital e intereses 
-                # por reinversión.
-                total_cupones=flujo_cap.cupones.sum()
-                capital=flujo_cap.saldo.sum()
-                int_reinv=flujo_cap.f_t_futuro.sum()-(total_cupones+capital)
-                
-                # Calculamos el precio de reventa.
-                flujo2=ffbonodesc(cupon1=bonoss.cupon1.loc[ticket],
-                                  cupon2=bonoss.cupon2.loc[ticket],
-                                  f_vencimiento=bonoss.f_vencimiento.loc[ticket],
-                                  f_horizonte=f_horizonte,
-                                  t_cupon=bonoss.tasa_cupon_anual.loc[ticket],
-                                  tipo=bonoss.tipo_bono1.loc[ticket],
-                                  c_cupones=bonoss.tipo_bono3.loc[ticket],
-                                  vn=vn)
-
-                p_reventaa=p_reventa(tabla_fb=flujo2, tabla_inflaa=infla_tabla, 
-                                  tabla_devaa=deva_tabla,fecha1=fecha1,
-                                  f_horizonte=f_horizonte,
-                                  tipo=bonoss.tipo_bono2.loc[ticket], 
-                                  i_cer_hoy=i_cer_hoy,  
-                                  tc_hoy=tcn_hoy,
-                                  ticket=ticket)
-
-                f_horizonte=datetime.strptime(f_horizonte,'%Y-%m-%d')
-                f_vencimiento=datetime.strptime(bonoss.f_vencimiento.loc[ticket],'%Y-%m-%d')
-
-                if f_horizonte>=f_vencimiento:
-                    cap_o_reventa=capital
-                else:
-                    cap_o_reventa=p_reventaa
-
-                # Se calcula la rentabilidad total.
-                rent_total=(total_cupones+int_reinv+cap_o_reventa)/monto_invertido-1
-                
-                # Anualizamos la rentabilidad total.
-                rent_total=(1+rent_total)**(365/((f_horizonte-ahora).days))-1
-
-                # Se arma el DataFrame donde se coloca esta información.
-                total_ganado=total_cupones+int_reinv+cap_o_reventa
-
-                tabla_casi_final=[rent_total,total_cupones/total_ganado,int_reinv/total_ganado,
-                          cap_o_reventa/total_ganado]
-                
-                tabla_casi_final=pd.DataFrame(tabla_casi_final)
-                tabla_casi_final=round(tabla_casi_final.T*100,2)
-                tabla_casi_final['Ticket']=ticket
-                tabla_casi_final.set_index('Ticket',inplace=True)
-                tabla_casi_final.reset_index(inplace=True)
-                tabla_casi_final=tabla_casi_final.rename(columns={0:'RT_Anual_Esp',1:'Cupones',
-                                                          2:'Int_Reinv',3:'Capital_o_Reventa'})
-                
-                f_horizonte=datetime.strftime(f_horizonte,'%Y-%m-%d')
-                tabla_final=pd.concat([tabla_casi_final,tabla_final],axis=0)
+    # Calculamos los valores de interés de cada bono bullet y letra. Los datos
+    # comunes a todos los tickets se agrupan en 'contexto'.
+    tickets=[ticket for ticket in bonoss.index
+             if bonoss.tipo_bono1.loc[ticket] in ['bullet','letra']]
+    contexto=dict(infla_tabla=infla_tabla,deva_tabla=deva_tabla,int_tabla=int_tabla,
+                  f_horizonte=f_horizonte,i_cer_hoy=i_cer_hoy,tcn_hoy=tcn_hoy,
+                  fecha1=fecha1,monto_invertido=monto_invertido,mercado=mercado,
+                  ahora=ahora)
+        
+    if n_jobs is None or n_jobs<0:
+        n_jobs=os.cpu_count()
+
+    if isinstance(executor,Executor):
+        filas=list(executor.map(partial(_rt_ticket,**contexto),tickets))
+    elif n_jobs==1 or len(tickets)<=1:
+        filas=[_rt_ticket(ticket,**contexto) for ticket in tickets]
+    elif executor=='hilos':
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            filas=list(pool.map(partial(_rt_ticket,**contexto),tickets))
+    elif executor=='procesos':
+        # Cada proceso recibe el contexto una sola vez, al iniciarse.
+        with ProcessPoolExecutor(max_workers=n_jobs,initializer=_iniciar_rt,
+                                 initargs=(contexto,)) as pool:
+            filas=list(pool.map(_rt_ticket_pool,tickets,
+                                chunksize=max(1,len(tickets)//(4*n_jobs))))
+    else:
+        raise ValueError("El executor debe ser 'procesos', 'hilos', o un Executor.")
+
+    # Se arma la tabla en el mismo orden que al agregar cada ticket al principio.
+    tabla_final=pd.concat(filas[::-1]+[tabla_final],axis=0)
 
     # Ordenamos la tabla
     tabla_final.set_index('Ticket',inplace=True)
@@ -2372,8 +1783,7 @@ def analisis_rt(infla_tabla,deva_tabla,int_tabla,f_horizonte,i_cer_hoy,tcn_hoy,
 
     # Ahora trabajamos para elimianr los bonos duales con el menor rendimiento.
     # Primero: Se crea una columna que identifica si el bono es o no es DUAL.
-    for i in tabla_final.index:
-        tabla_final.loc[i,'DUAL']=bonoss.DUAL.loc[i]
+    tabla_final['DUAL']=bonoss.DUAL.reindex(tabla_final.index)
 
     # Segundo: Se divide la tabla final entre bonos duales y bonos no duales usando 
     # máscaras.
@@ -2420,10 +1830,409 @@ def analisis_rt(infla_tabla,deva_tabla,int_tabla,f_horizonte,i_cer_hoy,tcn_hoy,
                                             'RT_Anual_Esp',ascending=False)
 
     return tabla_definitiva
+
+
+# Datos comunes de 'analisis_rt' en cada proceso del pool.
+_contexto_rt=None
+
+
+def _iniciar_rt(contexto):
+    global _contexto_rt
+    _contexto_rt=contexto
+
+
+def _rt_ticket_pool(ticket):
+    return _rt_ticket(ticket,**_contexto_rt)
+
+
+@medido('ticket',ticket='ticket')
+def _rt_ticket(ticket,infla_tabla,deva_tabla,int_tabla,f_horizonte,i_cer_hoy,
+               tcn_hoy,fecha1,monto_invertido,mercado,ahora):
+    """
+    Calcula la fila de la tabla de 'analisis_rt' que corresponde a un ticket.
+
+    """
+    import pandas as pd
+    from datetime import datetime
+    from flujos import cronograma_bono
+
+    bonoss=mercado.bonos
+    vn=monto_invertido/bonoss.precio.loc[ticket]*100
+
+    # Construimos el cronograma del bono una sola vez, dividido en el
+    # flujo anterior y el posterior a la fecha horizonte.
+    flujo_base,flujo2=cronograma_bono(**mercado.condiciones(ticket),
+                                      f_horizonte=f_horizonte,vn=vn,ahora=ahora)
+
+    # Actualizamos el flujo base si corresponde por ser CER o DL.
+    flujo_act=flujobono_act(tabla_inflaa=infla_tabla,tabla_deva=deva_tabla,
+                            ticket=ticket,f_horizonte=f_horizonte,
+                            i_cer_hoy=i_cer_hoy,tcn_hoy=tcn_hoy,vn=vn,
+                            mercado=mercado,flujo_base=flujo_base)
+
+    # Capitalizamos el flujo de fondos.
+    flujo_cap=capflujos(serie_t=int_tabla,f_horizonte=f_horizonte,flujo_bb=flujo_act)
+
+    # Calculamos lo cobrado en concepto de cupones, capital e intereses
+    # por reinversión.
+    total_cupones=flujo_cap.cupones.sum()
+    capital=flujo_cap.saldo.sum()
+    int_reinv=flujo_cap.f_t_futuro.sum()-(total_cupones+capital)
+
+    # Calculamos el precio de reventa.
+    p_reventaa=p_reventa(tabla_fb=flujo2, tabla_inflaa=infla_tabla,
+                      tabla_devaa=deva_tabla,fecha1=fecha1,
+                      f_horizonte=f_horizonte,
+                      tipo=bonoss.tipo_bono2.loc[ticket],
+                      i_cer_hoy=i_cer_hoy,
+                      tc_hoy=tcn_hoy,
+                      ticket=ticket,
+                      mercado=mercado,
+                      as_of=ahora)
+
+    f_horizonte=datetime.strptime(f_horizonte,'%Y-%m-%d')
+    f_vencimiento=datetime.strptime(bonoss.f_vencimiento.loc[ticket],'%Y-%m-%d')
+
+    if f_horizonte>=f_vencimiento:
+        cap_o_reventa=capital
+    else:
+        cap_o_reventa=p_reventaa
+
+    # Se calcula la rentabilidad total.
+    rent_total=(total_cupones+int_reinv+cap_o_reventa)/monto_invertido-1
+
+    # Anualizamos la rentabilidad total.
+    rent_total=(1+rent_total)**(365/((f_horizonte-ahora).days))-1
+
+    # Se arma el DataFrame donde se coloca esta información.
+    total_ganado=total_cupones+int_reinv+cap_o_reventa
+
+    tabla_casi_final=[rent_total,total_cupones/total_ganado,int_reinv/total_ganado,
+              cap_o_reventa/total_ganado]
+
+    tabla_casi_final=pd.DataFrame(tabla_casi_final)
+    tabla_casi_final=round(tabla_casi_final.T*100,2)
+    tabla_casi_final['Ticket']=ticket
+    tabla_casi_final.set_index('Ticket',inplace=True)
+    tabla_casi_final.reset_index(inplace=True)
+    tabla_casi_final=tabla_casi_final.rename(columns={0:'RT_Anual_Esp',1:'Cupones',
+                                              2:'Int_Reinv',3:'Capital_o_Reventa'})
+
+    return tabla_casi_final
     
 # ----------------------------------------------------------------------------
 # ----------------------------------------------------------------------------
 
+#                                   FUNCION 13
+
+@medido()
+def p_reventa_lote(flujos_fb,tabla_inflaa,tabla_devaa,fecha1,f_horizonte,
+                   i_cer_hoy,tc_hoy,mercado=None,as_of=None):
+    """
+    Obtiene de una sola vez el precio de venta esperado de muchos bonos, con el
+    mismo cálculo que la función 'p_reventa'. En lugar de llenar la tabla de
+    tasas forward de cada bono fila por fila, la curva, las tasas efectivas y
+    los factores de descuento de todos los flujos se calculan como arrays.
+
+    PARAMETROS
+    ----------
+    flujos_fb : diccionario de DataFrames o CuboFlujos, obligatorio.
+    Descripción: Son los flujos de fondos esperados de los bonos, los que se
+    encuentran más allá de la fecha horizonte. Puede ser un diccionario con el
+    ticket como clave y el flujo como valor (con el formato de 'ffbonodesc'), o
+    el cubo 'despues' de 'CuboFlujos.dividir' (ver 'flujos.py').
+
+    tabla_inflaa : DataFrame, obligatorio.
+    Descripción: Es la serie de inflación mensual y acumulada esperada.
+
+    tabla_devaa : DataFrame, obligatorio.
+    Descripción: Es la serie de dev/dep mensual y acumulada esperada.
+
+    fecha1 : String, obligatorio.
+    Descripción: Es la fecha que corresponde a la pestaña del excel donde está
+    la información sobre la TIR y la DM de cada bono. Por ejemplo: '17-01-23'.
+
+    f_horizonte : String, obligatorio.
+    Descripción: Es la fecha que actúa como horizonte de inversión. Por ejemplo,
+    '2024-06-15'.
+
+    i_cer_hoy : Float, obligatorio.
+    Descripción: Es el índice CER actual.
+
+    tc_hoy : Float, obligatorio.
+    Descripción: Es el tipo de cambio mayorista (A3500) de hoy.
+
+    mercado : MarketSnapshot, opcional.
+    Descripción: Es la foto del mercado con las características de los bonos y
+    las curvas de la fecha 'fecha1' ya importadas (ver 'mercado.py'). Si no se
+    indica, se leen los archivos 'Bonoscaracteristicas' y 'Bonoscurvas'.
+
+    as_of : String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, que reemplaza a la fecha de hoy. Por
+    ejemplo, '2024-06-15'. Si no se indica, se usa el día de hoy (ver
+    'fecha_calculo' en 'calendario.py').
+
+    RESULTADO
+    -------
+    precios_vta : Series.
+    Descripción: Es el precio de venta esperado de cada bono/letra, con el ticket
+    como índice.
+
+    """
+    import pandas as pd
+    import numpy as np
+    from cache import leer_excel
+    from calendario import fecha_calculo
+    from curvas import ajustar_curva
+    from flujos import CuboFlujos
+    from indices import proyectar_indice, REZAGO_CER, REZAGO_TC
+
+    # Fecha de cálculo.
+    hoy=fecha_calculo(as_of)
+
+    # Se unen los flujos de todos los tickets en arrays contiguos. Los flujos
+    # del ticket i ocupan las posiciones offsets[i]:offsets[i+1].
+    if isinstance(flujos_fb,CuboFlujos):
+        tickets=list(flujos_fb.tickets)
+        fechas=flujos_fb.fechas.astype('datetime64[ns]')
+        totales=flujos_fb.flujo_total
+        offsets=flujos_fb.offsets
+    else:
+        tickets=list(flujos_fb.keys())
+        fechas=np.concatenate([np.asarray(flujos_fb[t].index,dtype='datetime64[ns]')
+                               for t in tickets]+[np.array([],dtype='datetime64[ns]')])
+        totales=np.concatenate([np.asarray(flujos_fb[t].iloc[:,2],dtype=float)
+                                for t in tickets]+[np.array([])])
+        offsets=np.concatenate([[0],np.cumsum([len(flujos_fb[t]) for t in tickets])])
+    offsets=np.asarray(offsets,dtype=int)
+
+    cantidad=np.diff(offsets)
+    indice=np.repeat(np.arange(len(tickets)),cantidad)
+    primero=offsets[:-1][cantidad>0]
+
+    # Se leen las características de los bonos y las curvas.
+    if mercado is None:
+        bonoss=leer_excel('Bonoscaracteristicas.xlsx').set_index('Ticket')
+        curvas=leer_excel('Bonoscurvas.xlsx',sheet_name=[f'{fecha1} CER',f'{fecha1} Pesos',
+                                                        f'{fecha1} DL'])
+        curva_cer,curva_pesos,curva_dl=curvas.values()
+    else:
+        bonoss=mercado.bonos
+        curva_cer=mercado.curva('CER')
+        curva_pesos=mercado.curva('Pesos')
+        curva_dl=mercado.curva('DL')
+
+    tipos=bonoss.tipo_bono2.reindex(tickets).values
+
+    # Coeficientes de la curva y factor de actualización de cada ticket.
+    inter=np.zeros(len(tickets))
+    coef=np.zeros(len(tickets))
+    actualizacion=np.ones(len(tickets))
+
+    cer=np.isin(tipos,['CER','DUAL-CER'])
+    if cer.any():
+        reg_cer=ajustar_curva(curva_cer,'CER',fecha1)
+        inter[cer]=reg_cer.intercept
+        coef[cer]=reg_cer.slope
+        i_cer_h=proyectar_indice(tabla_inflaa,i_cer_hoy,REZAGO_CER
+                                 ).indice_fin_de_mes(f_horizonte)
+        actualizacion[cer]=i_cer_h/np.asarray(bonoss.indice_inicial.reindex(tickets)[cer],
+                                              dtype=float)
+        dual=tipos=='DUAL-CER'
+        actualizacion[dual]=actualizacion[dual]*np.asarray(
+            bonoss.tc_inicial.reindex(tickets)[dual],dtype=float)
+
+    pesos=tipos=='pesos'
+    if pesos.any():
+        reg_pesos=ajustar_curva(curva_pesos,'Pesos',fecha1)
+        inter[pesos]=reg_pesos.intercept
+        coef[pesos]=reg_pesos.slope
+
+    dl=tipos=='DL'
+    if dl.any():
+        reg_dl=ajustar_curva(curva_dl,'DL',fecha1)
+        inter[dl]=reg_dl.intercept
+        coef[dl]=reg_dl.slope
+        actualizacion[dl]=proyectar_indice(tabla_devaa,tc_hoy,REZAGO_TC
+                                           ).indice_fin_de_mes(f_horizonte)
+
+    validos=cer | pesos | dl
+    if not validos.all():
+        raise ValueError(f'Tipo de bono no válido para los tickets '
+                         f'{list(np.array(tickets,dtype=object)[~validos])}.')
+
+    # DM (en años), TIR de la curva, y tasa efectiva de cada flujo.
+    dm=np.floor((fechas-np.datetime64(hoy,'ns'))/np.timedelta64(1,'D'))/365
+    tir=inter[indice]+coef[indice]*np.log(dm)
+    t_efectiva=(1+tir)**dm-1
+
+    # La tasa cupón cero desde la fecha horizonte es el producto de las tasas
+    # forward, es decir, el cociente entre la tasa efectiva de cada flujo y la
+    # de la fecha horizonte (primera fila de cada ticket).
+    base=np.ones(len(tickets))
+    base[cantidad>0]=1+t_efectiva[primero]
+    t_cupon_cero=(1+t_efectiva)/base[indice]-1
+
+    # Se descuentan los flujos posteriores a la fecha horizonte.
+    f_desc=totales*actualizacion[indice]/(1+t_cupon_cero)
+    f_desc[primero]=0
+    precios_vta=np.bincount(indice,weights=f_desc,minlength=len(tickets))
+
+    return pd.Series(precios_vta,index=pd.Index(tickets,name='Ticket'),name='precio_vta')
+
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+#                                   FUNCION 14
+
+@medido()
+def analisis_rt_horizons(infla_tabla,deva_tabla,int_tabla,horizons,i_cer_hoy,
+                         tcn_hoy,fecha1,monto_invertido=50_000,mercado=None,
+                         as_of=None):
+    """
+    Calcula el rendimiento total esperado de cada bono bullet y letra para
+    muchas fechas horizonte a la vez, con los mismos criterios que la función
+    'analisis_rt'. El cronograma completo de cada ticket se construye una sola
+    vez (ver 'construir_cubo' en 'flujos.py'), y su actualización por CER o
+    por tcA3500 también; para cada horizonte sólo se divide el cubo, se capi-
+    talizan los flujos cobrados y se obtiene el precio de reventa de todos los
+    tickets juntos (función 13).
+
+    A diferencia de 'analisis_rt', se devuelven los dos tickets de cada bono
+    DUAL (CER y DL), ya que el de mayor rendimiento puede cambiar según el
+    horizonte.
+
+    PARAMETROS
+    ----------
+    infla_tabla, deva_tabla, int_tabla : DataFrame, obligatorio.
+    Descripción: Son las tablas de inflación, de dep/dev, y de tasas, igual que
+    en 'analisis_rt'.
+
+    horizons : lista de Strings, obligatorio.
+    Descripción: Son las fechas horizonte, por ejemplo, ['2024-03-01',
+    '2024-06-15'].
+
+    i_cer_hoy : Float, obligatorio.
+    Descripción: Es el valor actual del índice CER, publicado por el BCRA.
+
+    tcn_hoy : Float, obligatorio.
+    Descripción: Es el valor actual del tipo de cambio mayorista A3500.
+
+    fecha1 : String, obligatorio.
+    Descripción: Es la fecha de la pestaña del Excel llamado 'Bonoscurvas', por
+    ejemplo: '17-01-23'.
+
+    monto_invertido : Integer o Float, opcional
+    Descripción: Es la cantidad de dinero utilizada para comprar el bono/letra.
+    Por defecto es de 50_000.
+
+    mercado : MarketSnapshot, opcional.
+    Descripción: Es la foto del mercado (ver 'mercado.py'). Si no se indica, se
+    carga a partir de los archivos de la carpeta actual y la fecha 'fecha1'.
+
+    as_of : String o datetime, opcional.
+    Descripción: Es la fecha de cálculo, que reemplaza a la fecha de hoy. Por
+    ejemplo, '2024-06-15'. Si no se indica, se usa el día de hoy (ver
+    'fecha_calculo' en 'calendario.py').
+
+    RESULTADO
+    -------
+    tabla_horizontes : DataFrame.
+    Descripción: Es la tabla con un ticket por fila y columnas en dos niveles:
+    el concepto ('RT_Anual_Esp', 'Cupones', 'Int_Reinv' y 'Capital_o_Reventa',
+    en porcentaje igual que en 'analisis_rt') y la fecha horizonte. Por ejemplo,
+    tabla_horizontes['RT_Anual_Esp'] es la matriz ticket x horizonte del
+    rendimiento total anual esperado.
+
+    """
+    import numpy as np
+    import pandas as pd
+    from datetime import datetime
+    from mercado import MarketSnapshot
+    from calendario import fecha_calculo
+    from flujos import CuboFlujos, construir_cubo, capitalizar_cubo
+    from indices import proyectar_indice, REZAGO_CER, REZAGO_TC
+
+    # Los excels se leen una sola vez.
+    if mercado is None:
+        mercado=MarketSnapshot.cargar(fecha1,nombre_archivo_cer=None)
+    bonoss=mercado.bonos
+    ahora=fecha_calculo(as_of)
+
+    # Cronograma completo de todos los tickets, escalado al valor nominal que
+    # se compra con el monto invertido.
+    cubo=construir_cubo(bonoss,ahora)
+    tickets=list(cubo.tickets)
+    n=len(tickets)
+    indice=cubo.indice_ticket
+    vn=monto_invertido/np.asarray(bonoss.precio.reindex(tickets),dtype=float)*100
+    escala=vn[indice]/100
+    tipos=bonoss.tipo_bono2.reindex(tickets).values
+    vencimientos=np.array([np.datetime64(f,'D') for f in bonoss.f_vencimiento.reindex(tickets)])
+
+    # Actualización de cada flujo por el CER o el tcA3500 de su fecha de cobro,
+    # igual que en 'flujobono_act'. Sólo hace falta hasta el último horizonte.
+    actualizacion=np.ones(cubo.fechas.size)
+    hasta_h=cubo.fechas<=max(np.datetime64(h,'D') for h in horizons)
+    hasta_h[cubo.offsets[:-1][np.diff(cubo.offsets)>0]]=False
+
+    cer=(tipos=='CER')[indice] & hasta_h
+    if cer.any():
+        indice_inicial=np.asarray(bonoss.indice_inicial.reindex(tickets),dtype=float)
+        actualizacion[cer]=proyectar_indice(infla_tabla,i_cer_hoy,REZAGO_CER).indice(
+            cubo.fechas[cer])/indice_inicial[indice[cer]]
+
+    dl=(tipos=='DL')[indice] & hasta_h
+    if dl.any():
+        actualizacion[dl]=proyectar_indice(deva_tabla,tcn_hoy,REZAGO_TC).indice(
+            cubo.fechas[dl])
+
+    cubo_vn=CuboFlujos(cubo.tickets,cubo.offsets,cubo.fechas,cubo.cupones*escala,
+                       cubo.saldo*escala)
+    cubo_act=CuboFlujos(cubo.tickets,cubo.offsets,cubo.fechas,
+                        cubo.cupones*escala*actualizacion,cubo.saldo*escala*actualizacion)
+
+    columnas={}
+    for f_horizonte in horizons:
+        # Flujo cobrado y capitalizado hasta la fecha horizonte.
+        antes,_=cubo_act.dividir(f_horizonte)
+        f_t_futuro=capitalizar_cubo(int_tabla,f_horizonte,antes)
+        indice_antes=antes.indice_ticket
+
+        total_cupones=np.bincount(indice_antes,weights=antes.cupones,minlength=n)
+        capital=np.bincount(indice_antes,weights=antes.saldo,minlength=n)
+        int_reinv=np.bincount(indice_antes,weights=f_t_futuro,minlength=n)-(
+            total_cupones+capital)
+
+        # Precio de reventa de todos los tickets.
+        _,despues=cubo_vn.dividir(f_horizonte)
+        p_reventaa=p_reventa_lote(despues,infla_tabla,deva_tabla,fecha1,f_horizonte,
+                                  i_cer_hoy,tcn_hoy,mercado=mercado,as_of=ahora).values
+
+        cap_o_reventa=np.where(np.datetime64(f_horizonte,'D')>=vencimientos,capital,
+                               p_reventaa)
+
+        # Se calcula y se anualiza la rentabilidad total.
+        total_ganado=total_cupones+int_reinv+cap_o_reventa
+        rent_total=total_ganado/monto_invertido-1
+        dias=(datetime.strptime(f_horizonte,'%Y-%m-%d')-ahora).days
+        rent_total=(1+rent_total)**(365/dias)-1
+
+        columnas[('RT_Anual_Esp',f_horizonte)]=np.round(rent_total*100,2)
+        columnas[('Cupones',f_horizonte)]=np.round(total_cupones/total_ganado*100,2)
+        columnas[('Int_Reinv',f_horizonte)]=np.round(int_reinv/total_ganado*100,2)
+        columnas[('Capital_o_Reventa',f_horizonte)]=np.round(
+            cap_o_reventa/total_ganado*100,2)
+
+    tabla_horizontes=pd.DataFrame(columnas,index=pd.Index(tickets,name='Ticket'))
+    tabla_horizontes=tabla_horizontes[pd.MultiIndex.from_product(
+        [['RT_Anual_Esp','Cupones','Int_Reinv','Capital_o_Reventa'],list(horizons)])]
+
+    return tabla_horizontes
+
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
 
 # BUSCAR INFORMACION SOBRE LA FUNCION ENUMERATE, PASAR LA DESCRIPCION EN EL 
 # DOCUMENTO DE PROGRAMACION + SUMAR LA EXPLICACION SOBRE COMO COLOCAR LAS ETIQUE
@@ -0,0 +1,443 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                    GRAFO DE CALCULO PEREZOSO DEL RENDIMIENTO
+#
+#             Describe el cálculo de 'analisis_rt' como un grafo: cada
+#          función ('tasabadlar', 'tabla_infla', 'tabla_dev', 'tabla_*_esc',
+#          'flujobono_act', 'capflujos', 'p_reventa' y 'analisis_rt') es un
+#          nodo que declara sus entradas (archivos de excel, parámetros y
+#          fecha de cálculo) con los nombres de sus argumentos. Los nodos se
+#          calculan sólo cuando se piden, y su resultado se recuerda. Cuando
+#          cambia una entrada (un parámetro, o el contenido de un archivo,
+#          por ejemplo, un nuevo REM) se borran sólo los resultados de los
+#          nodos que dependen de ella, y se vuelven a calcular al pedirlos:
+#
+#              grafo=grafo_rt('16-10-26','2027-06-15',600.,1400.,
+#                             nombre_archivo_rem='REM')
+#              grafo.valor('analisis_rt')
+#              grafo.entrada('tcn_rofex',1700)  # no recalcula 'tasabadlar'
+#              grafo.valor('analisis_rt')
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+
+def _igual(a,b):
+    """
+    Devuelve True si los dos valores de una entrada son iguales. Los valores
+    que no se pueden comparar (por ejemplo, DataFrames) se consideran
+    distintos, salvo que sean el mismo objeto.
+
+    """
+    if a is b:
+        return True
+    try:
+        return bool(type(a)==type(b) and a==b)
+    except (TypeError,ValueError):
+        return False
+
+
+class Grafo:
+    """
+    Grafo de cálculo perezoso. Tiene tres clases de nodos:
+
+    - entradas: valores que se fijan con 'entrada' (parámetros, fechas, etc.).
+    - archivos: rutas que se fijan con 'archivo'. Su huella es el hash del
+      contenido del archivo (ver 'cache.hash_archivo'), que se vuelve a revisar
+      cada vez que se pide un valor.
+    - nodos: funciones que se agregan con 'nodo'. Los nombres de los
+      argumentos de la función son los nombres de los nodos de los que depende,
+      que deben existir antes.
+
+    Los nodos 'por_clave' se calculan por separado para cada clave (por
+    ejemplo, para cada ticket): la función recibe la clave como primer
+    argumento, y los nodos por clave de los que depende se calculan con la
+    misma clave.
+
+    El atributo 'calculos' cuenta las veces que se calculó cada nodo.
+
+    """
+
+    def __init__(self):
+        self._entradas={}
+        self._archivos={}
+        self._nodos={}
+        self._valores={}
+        self.calculos={}
+
+    def __contains__(self,nombre):
+        return nombre in self._entradas or nombre in self._archivos or \
+            nombre in self._nodos
+
+    def entrada(self,nombre,valor):
+        """
+        Fija el valor de la entrada 'nombre'. Si cambió, se borran los
+        resultados de los nodos que dependen de ella.
+
+        """
+        if nombre in self._nodos:
+            raise ValueError(f"'{nombre}' es un nodo calculado, no una entrada.")
+        if nombre in self._entradas and _igual(self._entradas[nombre],valor):
+            return
+        self._entradas[nombre]=valor
+        self.invalidar(nombre)
+
+    def archivo(self,nombre,ruta):
+        """
+        Fija la ruta del archivo de entrada 'nombre' (o None si no hay archivo).
+        Si cambió la ruta o su contenido, se borran los resultados de los nodos
+        que dependen de él.
+
+        """
+        huella=self._huella(ruta)
+        if self._archivos.get(nombre)==(ruta,huella):
+            return
+        self._archivos[nombre]=(ruta,huella)
+        self.invalidar(nombre)
+
+    def nodo(self,nombre,funcion,por_clave=False):
+        """
+        Agrega el nodo 'nombre', que se calcula con 'funcion'. Si ya existía, se
+        reemplaza y se borran sus resultados y los de los nodos que dependen de
+        él.
+
+        """
+        codigo=funcion.__code__
+        argumentos=list(codigo.co_varnames[:codigo.co_argcount])
+        dependencias=argumentos[1:] if por_clave else argumentos
+        faltantes=[d for d in dependencias if d not in self]
+        if faltantes:
+            raise ValueError(f"El nodo '{nombre}' depende de {faltantes}, que no existen.")
+        self._nodos[nombre]=(funcion,dependencias,por_clave)
+        self.invalidar(nombre)
+
+    def dependientes(self,nombre):
+        """
+        Devuelve el conjunto de nodos que dependen, directa o indirectamente,
+        de 'nombre'.
+
+        """
+        dependientes=set()
+        pendientes=[nombre]
+        while pendientes:
+            actual=pendientes.pop()
+            for otro,(_,dependencias,_) in self._nodos.items():
+                if actual in dependencias and otro not in dependientes:
+                    dependientes.add(otro)
+                    pendientes.append(otro)
+
+        return dependientes
+
+    def invalidar(self,nombre):
+        """
+        Borra el resultado de 'nombre' y los de todos los nodos que dependen de
+        él.
+
+        """
+        for otro in self.dependientes(nombre)|{nombre}:
+            self._valores.pop(otro,None)
+
+    def valor(self,nombre,clave=None):
+        """
+        Devuelve el valor de 'nombre'. Si es un nodo, lo calcula (junto con los
+        nodos de los que depende) sólo si no tiene un resultado vigente. Para
+        los nodos por clave hay que indicar la clave.
+
+        """
+        for archivo,(ruta,huella) in list(self._archivos.items()):
+            if self._huella(ruta)!=huella:
+                self.archivo(archivo,ruta)
+
+        return self._valor(nombre,clave)
+
+    def _huella(self,ruta):
+        import os
+        from cache import hash_archivo
+
+        if ruta is None or not os.path.exists(ruta):
+            return None
+        return hash_archivo(ruta)
+
+    def _valor(self,nombre,clave):
+        if nombre in self._entradas:
+            return self._entradas[nombre]
+        if nombre in self._archivos:
+            return self._archivos[nombre][0]
+        if nombre not in self._nodos:
+            raise KeyError(nombre)
+
+        funcion,dependencias,por_clave=self._nodos[nombre]
+        if por_clave and clave is None:
+            raise ValueError(f"El nodo '{nombre}' se calcula por clave: falta la clave.")
+        valores=self._valores.setdefault(nombre,{})
+        clave=clave if por_clave else None
+        if clave not in valores:
+            argumentos=[self._valor(d,clave) for d in dependencias]
+            if por_clave:
+                argumentos.insert(0,clave)
+            valores[clave]=funcion(*argumentos)
+            self.calculos[nombre]=self.calculos.get(nombre,0)+1
+
+        return valores[clave]
+
+
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                      NODOS DEL CALCULO DE 'analisis_rt'
+#
+#             Cada nodo arma un MarketSnapshot sólo con los datos que usa,
+#          para que el cambio de un archivo no invalide los nodos que no lo
+#                                   necesitan.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+def _mercado(fecha1=None,bonos=None,curvas=None,serie_cer=None,serie_tca3500=None,
+             rem=None):
+    from mercado import MarketSnapshot
+
+    return MarketSnapshot(bonos,curvas or {},fecha=fecha1,serie_cer=serie_cer,
+                          serie_tca3500=serie_tca3500,rem=rem)
+
+
+def _leer_indice(archivo_serie):
+    from cache import leer_excel
+
+    if archivo_serie is None:
+        return None
+    return leer_excel(archivo_serie).set_index('Fecha')
+
+
+def _bonos(archivo_bonos):
+    from cache import leer_excel
+
+    return leer_excel(archivo_bonos).set_index('Ticket')
+
+
+def _curvas(archivo_curvas,fecha1):
+    from backtest import _leer_curvas
+
+    return _leer_curvas(archivo_curvas,fecha1)
+
+
+def _rem(archivo_rem):
+    from cache import leer_excel
+
+    if archivo_rem is None:
+        return None
+    return leer_excel(archivo_rem,sheet_name='Resultados TOP 10',header=31,
+                      usecols='B:D',nrows=8)
+
+
+def _limite(f_limite,f_horizonte):
+    return f_horizonte if f_limite is None else f_limite
+
+
+def _meses(meses_tabla,ahora,limite,f_horizonte):
+    import pandas as pd
+
+    if meses_tabla is not None:
+        return meses_tabla
+    fin=max(pd.Timestamp(limite),pd.Timestamp(f_horizonte))
+    # Las tablas cubren hasta unos meses después del horizonte.
+    return (fin.year-ahora.year)*12+fin.month-ahora.month+4
+
+
+def _ahora(as_of):
+    from calendario import fecha_calculo
+
+    return fecha_calculo(as_of)
+
+
+def _tasabadlar(rem):
+    from funciones import tasabadlar
+
+    return tasabadlar(mercado=_mercado(rem=rem))
+
+
+def _tabla_infla(fecha1,meses,curvas,serie_cer,ahora):
+    from funciones import tabla_infla
+
+    return tabla_infla(fecha1,cant_meses=meses,as_of=ahora,
+                       mercado=_mercado(fecha1,curvas=curvas,serie_cer=serie_cer))
+
+
+def _tabla_dev(limite,fecha1,tipo,tcn_hoy,tcn_rofex,ticket_usd,ticket_cer,ticket_dl,
+               ticket_pesos,meses,curvas,serie_cer,serie_tca3500,ahora):
+    from funciones import tabla_dev
+
+    return tabla_dev(limite,fecha1,tipo,tcn_hoy,tcn_rofex,ticket_usd,ticket_cer,
+                     ticket_dl,ticket_pesos,meses_adelante=meses,as_of=ahora,
+                     mercado=_mercado(fecha1,curvas=curvas,serie_cer=serie_cer,
+                                      serie_tca3500=serie_tca3500))
+
+
+def _tabla_infla_esc(tem_base,t_var_tem,fecha1,f_horizonte,curvas,serie_cer,ahora,
+                     tabla_infla):
+    from funciones import tabla_infla_esc
+
+    return tabla_infla_esc(tem_base,t_var_tem,fecha1,f_horizonte,as_of=ahora,
+                           mercado=_mercado(fecha1,curvas=curvas,serie_cer=serie_cer),
+                           tabla_base=tabla_infla)
+
+
+def _tabla_dev_esc(t_tc_base,var_t_tc,f_horizonte,limite,fecha1,tipo,tcn_hoy,
+                   tcn_rofex,ticket_usd,ticket_cer,ticket_dl,ticket_pesos,meses,curvas,
+                   serie_cer,serie_tca3500,ahora,tabla_dev):
+    from funciones import tabla_dev_esc
+
+    return tabla_dev_esc(t_tc_base,var_t_tc,f_horizonte,limite,fecha1,tipo,tcn_hoy,
+                         tcn_rofex,ticket_usd,ticket_cer,ticket_dl,ticket_pesos,
+                         meses_adelante=meses,as_of=ahora,
+                         mercado=_mercado(fecha1,curvas=curvas,serie_cer=serie_cer,
+                                          serie_tca3500=serie_tca3500),
+                         tabla_base=tabla_dev)
+
+
+def _cronograma(ticket,bonos,f_horizonte,monto_invertido,ahora):
+    from flujos import cronograma_bono
+
+    vn=monto_invertido/bonos.precio.loc[ticket]*100
+    condiciones=_mercado(bonos=bonos).condiciones(ticket)
+    return cronograma_bono(**condiciones,f_horizonte=f_horizonte,vn=vn,ahora=ahora)
+
+
+def _flujobono_act(ticket,cronograma,tabla_infla,tabla_dev,f_horizonte,i_cer_hoy,
+                   tcn_hoy,bonos,monto_invertido):
+    from funciones import flujobono_act
+
+    vn=monto_invertido/bonos.precio.loc[ticket]*100
+    return flujobono_act(tabla_infla,tabla_dev,ticket,f_horizonte,i_cer_hoy,tcn_hoy,
+                         vn=vn,mercado=_mercado(bonos=bonos),flujo_base=cronograma[0])
+
+
+def _capflujos(ticket,tasabadlar,f_horizonte,flujobono_act):
+    from funciones import capflujos
+
+    return capflujos(tasabadlar,f_horizonte,flujobono_act)
+
+
+def _p_reventa(ticket,cronograma,tabla_infla,tabla_dev,fecha1,f_horizonte,i_cer_hoy,
+               tcn_hoy,bonos,curvas,ahora):
+    from funciones import p_reventa
+
+    return p_reventa(cronograma[1],tabla_infla,tabla_dev,fecha1,f_horizonte,
+                     bonos.tipo_bono2.loc[ticket],i_cer_hoy,tcn_hoy,ticket,
+                     mercado=_mercado(fecha1,bonos=bonos,curvas=curvas),as_of=ahora)
+
+
+def _analisis_rt(tabla_infla,tabla_dev,tasabadlar,f_horizonte,i_cer_hoy,tcn_hoy,fecha1,
+                 monto_invertido,bonos,curvas,n_jobs,ahora):
+    from funciones import analisis_rt
+
+    return analisis_rt(tabla_infla,tabla_dev,tasabadlar,f_horizonte,i_cer_hoy,tcn_hoy,
+                       fecha1,monto_invertido=monto_invertido,n_jobs=n_jobs,as_of=ahora,
+                       mercado=_mercado(fecha1,bonos=bonos,curvas=curvas))
+
+
+def _analisis_rt_esc(tabla_infla_esc,tabla_dev_esc,tasabadlar,f_horizonte,i_cer_hoy,
+                     tcn_hoy,fecha1,monto_invertido,bonos,curvas,n_jobs,ahora):
+    return _analisis_rt(tabla_infla_esc,tabla_dev_esc,tasabadlar,f_horizonte,i_cer_hoy,
+                        tcn_hoy,fecha1,monto_invertido,bonos,curvas,n_jobs,ahora)
+
+
+def grafo_rt(fecha1,f_horizonte,i_cer_hoy,tcn_hoy,tipo='rofex',tcn_rofex=None,
+             ticket_usd=None,ticket_cer=None,ticket_dl=None,ticket_pesos=None,
+             f_limite=None,meses_tabla=None,monto_invertido=50_000,tem_base=None,
+             t_var_tem=None,t_tc_base=None,var_t_tc=None,n_jobs=1,as_of=None,
+             directorio='.',nombre_archivo='Bonoscaracteristicas',
+             nombre_archivo_curvas='Bonoscurvas',nombre_archivo_cer='Serie CER',
+             nombre_archivo_tc='A3500',nombre_archivo_rem='REM'):
+    """
+    Arma el grafo del cálculo de 'analisis_rt', con los archivos de excel y los
+    parámetros como entradas. Nada se lee ni se calcula hasta que se pide el
+    valor de un nodo.
+
+    PARAMETROS
+    ----------
+    fecha1, f_horizonte, i_cer_hoy, tcn_hoy, monto_invertido, n_jobs:
+    Descripción: Son los argumentos de 'analisis_rt'.
+
+    as_of: String o datetime, opcional.
+    Descripción: Es la fecha de cálculo (ver 'fecha_calculo' en
+    'calendario.py'). Si no se indica, se fija el día en que se arma el grafo,
+    y no cambia mientras el grafo exista: para calcular otro día, se cambia la
+    entrada 'as_of'.
+
+    tipo, tcn_rofex, ticket_usd, ticket_cer, ticket_dl, ticket_pesos, f_limite:
+    Descripción: Son los argumentos de 'tabla_dev'. Si 'f_limite' es None, se
+    usa 'f_horizonte'.
+
+    meses_tabla: Integer, opcional.
+    Descripción: Es la cantidad de meses de las tablas de inflación y dep/dev.
+    Por defecto, los meses hasta la fecha horizonte (o la fecha límite) más 4.
+
+    tem_base, t_var_tem, t_tc_base, var_t_tc: Floats, opcional.
+    Descripción: Son los argumentos de 'tabla_infla_esc' y 'tabla_dev_esc',
+    que sólo se necesitan para los nodos de escenarios.
+
+    directorio, nombre_archivo, nombre_archivo_curvas, nombre_archivo_cer,
+    nombre_archivo_tc, nombre_archivo_rem: Strings, opcional.
+    Descripción: Son la carpeta y los nombres de los libros de excel, igual que
+    en 'MarketSnapshot.cargar'.
+
+    RESULTADO
+    -------
+    grafo: Grafo.
+    Descripción: Tiene las entradas con los nombres de los parámetros, los
+    archivos 'archivo_bonos', 'archivo_curvas', 'archivo_cer', 'archivo_tc' y
+    'archivo_rem', y los nodos 'bonos', 'curvas', 'serie_cer', 'serie_tca3500',
+    'rem', 'tasabadlar', 'tabla_infla', 'tabla_dev', 'tabla_infla_esc',
+    'tabla_dev_esc', 'analisis_rt' y 'analisis_rt_esc', y los nodos por ticket
+    'cronograma', 'flujobono_act', 'capflujos' y 'p_reventa'. Los escenarios
+    ('tabla_infla_esc' y 'tabla_dev_esc') parten de los nodos 'tabla_infla' y
+    'tabla_dev', por lo que no vuelven a calcularlos.
+
+    """
+    from calendario import fecha_calculo
+
+    grafo=Grafo()
+
+    # La fecha de cálculo se fija al armar el grafo, así los resultados que
+    # se recuerdan no dependen del momento en que se piden.
+    as_of=fecha_calculo(as_of)
+    parametros=dict(fecha1=fecha1,f_horizonte=f_horizonte,i_cer_hoy=i_cer_hoy,
+                    tcn_hoy=tcn_hoy,tipo=tipo,tcn_rofex=tcn_rofex,ticket_usd=ticket_usd,
+                    ticket_cer=ticket_cer,ticket_dl=ticket_dl,ticket_pesos=ticket_pesos,
+                    f_limite=f_limite,meses_tabla=meses_tabla,
+                    monto_invertido=monto_invertido,tem_base=tem_base,t_var_tem=t_var_tem,
+                    t_tc_base=t_tc_base,var_t_tc=var_t_tc,n_jobs=n_jobs,as_of=as_of)
+    for nombre,valor in parametros.items():
+        grafo.entrada(nombre,valor)
+
+    for nombre,archivo in [('archivo_bonos',nombre_archivo),
+                           ('archivo_curvas',nombre_archivo_curvas),
+                           ('archivo_cer',nombre_archivo_cer),
+                           ('archivo_tc',nombre_archivo_tc),
+                           ('archivo_rem',nombre_archivo_rem)]:
+        grafo.archivo(nombre,None if archivo is None else f'{directorio}/{archivo}.xlsx')
+
+    grafo.nodo('bonos',_bonos)
+    grafo.nodo('curvas',_curvas)
+    grafo.nodo('serie_cer',lambda archivo_cer: _leer_indice(archivo_cer))
+    grafo.nodo('serie_tca3500',lambda archivo_tc: _leer_indice(archivo_tc))
+    grafo.nodo('rem',_rem)
+    grafo.nodo('ahora',_ahora)
+    grafo.nodo('limite',_limite)
+    grafo.nodo('meses',_meses)
+
+    grafo.nodo('tasabadlar',_tasabadlar)
+    grafo.nodo('tabla_infla',_tabla_infla)
+    grafo.nodo('tabla_dev',_tabla_dev)
+    grafo.nodo('tabla_infla_esc',_tabla_infla_esc)
+    grafo.nodo('tabla_dev_esc',_tabla_dev_esc)
+
+    grafo.nodo('cronograma',_cronograma,por_clave=True)
+    grafo.nodo('flujobono_act',_flujobono_act,por_clave=True)
+    grafo.nodo('capflujos',_capflujos,por_clave=True)
+    grafo.nodo('p_reventa',_p_reventa,por_clave=True)
+
+    grafo.nodo('analisis_rt',_analisis_rt)
+    grafo.nodo('analisis_rt_esc',_analisis_rt_esc)
+
+    return grafo
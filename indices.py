@@ -0,0 +1,185 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                   PROYECCION DIARIA DE LOS INDICES CER Y A3500
+#
+#             Convierte una tabla mensual de inflación (o de dep/dev)
+#          esperada en un array diario con el índice proyectado, interpo-
+#          lando dentro de cada mes según su cantidad de días. Con el
+#          rezago de cada índice (10 días para el CER y 3 días para el
+#          tcA3500) se obtiene el índice que corresponde a cualquier vector
+#          de fechas de cobro, sin volver a recorrer la tabla. Lo utilizan
+#                   las funciones 'flujobono_act' y 'p_reventa'.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+# Rezago, en días, con el que se aplica cada índice sobre la fecha de cobro.
+REZAGO_CER=10
+REZAGO_TC=3
+
+# Proyecciones ya construidas, por (hash de la tabla, índice de hoy, rezago).
+_proyecciones={}
+
+
+class ProyeccionIndice:
+    """
+    Es el índice (CER o tcA3500) proyectado día a día a partir de una tabla
+    mensual. Se construye con 'proyectar_indice'.
+
+    El valor del día 'd' de un mes con tasa 'r', cantidad de días 'n' e índice
+    acumulado 'a' es: hoy*(1+a)/(1+r)*(1+r)**(d/n). Es decir, el índice al
+    cierre del mes anterior capitalizado por la fracción del mes transcurrida.
+
+    Los días se cuentan con la cantidad de días de cada mes que indica la
+    tabla, de modo que el rezago que cae en el mes anterior se descuenta de los
+    días de ese mes según la tabla.
+
+    PARAMETROS
+    ----------
+    valores: array de Floats.
+    Descripción: Es el índice proyectado de cada día de la tabla, un mes tras
+    otro.
+
+    inicio_mes: array de Integers.
+    Descripción: Es la posición en 'valores' del primer día de cada mes.
+
+    meses: array de datetime64[M].
+    Descripción: Son los meses de la tabla.
+
+    cierres: array de Floats.
+    Descripción: Es el índice al cierre de cada mes de la tabla, hoy*(1+a).
+
+    rezago: Integer.
+    Descripción: Son los días corridos que se restan a cada fecha de cobro.
+
+    """
+
+    def __init__(self,valores,inicio_mes,meses,cierres,rezago):
+        self.valores=valores
+        self.inicio_mes=inicio_mes
+        self.meses=meses
+        self.cierres=cierres
+        self.rezago=rezago
+
+    def indice(self,fechas):
+        """
+        Devuelve el índice proyectado que se aplica a cada fecha de cobro, es
+        decir, el del día 'rezago' días antes de cada fecha.
+
+        """
+        return self.valores[self._posicion(fechas)]
+
+    def ubicar(self,fechas):
+        """
+        Devuelve, para el día 'rezago' días antes de cada fecha de cobro, la
+        posición de su mes en la tabla y la fracción del mes transcurrida. Con
+        ellas se puede evaluar el índice con otras tasas sobre los mismos meses
+        (ver 'escenarios.py').
+
+        """
+        import numpy as np
+
+        posicion=self._posicion(fechas)
+        mes=np.searchsorted(self.inicio_mes,posicion,side='right')-1
+        largo=np.diff(np.append(self.inicio_mes,self.valores.size))
+
+        return mes,(posicion-self.inicio_mes[mes]+1)/largo[mes]
+
+    def _posicion(self,fechas):
+        import numpy as np
+
+        fechas=np.asarray(fechas,dtype='datetime64[D]')
+        meses=fechas.astype('datetime64[M]')
+        mes=(meses-self.meses[0]).astype(int)
+        if (mes<0).any() or (mes>=self.meses.size).any():
+            raise ValueError('Hay fechas de cobro fuera del período de la tabla '
+                             'de inflación o de dep/dev.')
+        dia=(fechas-meses.astype('datetime64[D]')).astype(int)+1
+        posicion=self.inicio_mes[mes]+dia-1-self.rezago
+        if (posicion<0).any():
+            raise ValueError('Hay fechas de cobro fuera del período de la tabla '
+                             'de inflación o de dep/dev.')
+
+        return posicion
+
+    def indice_fin_de_mes(self,fechas):
+        """
+        Devuelve el índice al cierre del mes de cada fecha, sin rezago ni
+        interpolación diaria.
+
+        """
+        import numpy as np
+
+        meses=np.asarray(fechas,dtype='datetime64[M]')
+        posicion=(meses-self.meses[0]).astype(int)
+        if (posicion<0).any() or (posicion>=self.meses.size).any():
+            raise ValueError('Hay fechas fuera del período de la tabla de '
+                             'inflación o de dep/dev.')
+
+        return self.cierres[posicion]
+
+
+def proyectar_indice(tabla,valor_hoy,rezago):
+    """
+    Construye la proyección diaria de un índice a partir de una tabla mensual.
+    El resultado se recuerda, de modo que volver a pedir la misma proyección
+    (misma tabla, índice de hoy, y rezago) no repite el cálculo.
+
+    PARAMETROS
+    ----------
+    tabla: DataFrame o TablaMensual, obligatorio.
+    Descripción: Es la tabla mensual con el último día de cada mes como índice,
+    la tasa mensual en la primera columna y la tasa acumulada en la última (ver
+    'tabla_infla', 'tabla_dev', 'tabla_infla_esc' y 'tabla_dev_esc'), o la
+    misma tabla como 'TablaMensual' (ver 'tablas.py').
+
+    valor_hoy: Float, obligatorio.
+    Descripción: Es el índice CER o el tcA3500 de hoy.
+
+    rezago: Integer, obligatorio.
+    Descripción: Son los días de rezago del índice, 'REZAGO_CER' o 'REZAGO_TC'.
+
+    RESULTADO
+    -------
+    proyeccion: ProyeccionIndice.
+    Descripción: Es el índice proyectado día a día.
+
+    """
+    import hashlib
+    import numpy as np
+    from tablas import TablaMensual
+
+    if not isinstance(tabla,TablaMensual):
+        tabla=TablaMensual.desde_tabla(tabla)
+    tasas=tabla.tasas
+    largo=tabla.dias
+
+    clave=(hashlib.sha1(np.int64(tabla.mes_inicial).tobytes()+tasas.tobytes()+
+                        tabla.acumuladas.tobytes()+largo.tobytes()).hexdigest(),
+           float(valor_hoy),int(rezago))
+    if clave in _proyecciones:
+        return _proyecciones[clave]
+
+    cierres=valor_hoy*(1+tabla.acumuladas)
+
+    # Cada mes tiene la cantidad de días que indica la tabla (el día de su
+    # índice), y dentro del mes se interpola según el día transcurrido.
+    inicio_mes=np.concatenate([[0],np.cumsum(largo)[:-1]])
+    posicion=np.repeat(np.arange(largo.size),largo)
+    dia=np.arange(posicion.size)-inicio_mes[posicion]+1
+
+    r=tasas[posicion]
+    valores=cierres[posicion]/(1+r)*(1+r)**(dia/largo[posicion])
+
+    proyeccion=ProyeccionIndice(valores,inicio_mes,tabla.meses,cierres,int(rezago))
+    _proyecciones[clave]=proyeccion
+
+    return proyeccion
+
+
+def limpiar_proyecciones():
+    """
+    Borra de la memoria todas las proyecciones construidas.
+
+    """
+    _proyecciones.clear()
@@ -0,0 +1,154 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                        FOTO DEL MERCADO (MarketSnapshot)
+#
+#             Reúne en un único objeto todos los datos de mercado que
+#          utilizan las funciones de 'funciones.py': las características
+#          de los bonos, las cuatro curvas (CER, Pesos, DL, y USD) de una
+#          fecha, la serie CER, la serie del A3500, y la tabla del REM con
+#          la tasa badlar esperada. Cada libro de excel se lee una sola vez
+#          y luego el objeto se pasa a las funciones a través del argumento
+#                                  'mercado'.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+class MarketSnapshot:
+    """
+    Contiene los datos de mercado de una fecha determinada, ya importados de
+    sus libros de excel. Las funciones de la librería que reciben el argumento
+    'mercado' toman de aquí sus datos en lugar de volver a leer los archivos.
+
+    Lo habitual es construirlo con 'MarketSnapshot.cargar', aunque también se
+    puede armar a mano con DataFrames que tengan el mismo formato que los
+    archivos de excel.
+
+    PARAMETROS
+    ----------
+    bonos: DataFrame, obligatorio.
+    Descripción: Son las características de los bonos (el contenido de
+    'Bonoscaracteristicas.xlsx') con la columna 'Ticket' como índice.
+
+    curvas: Diccionario, obligatorio.
+    Descripción: Contiene las curvas de la fecha, es decir, las pestañas de
+    'Bonoscurvas.xlsx'. Sus claves son 'CER', 'Pesos', 'DL', y 'USD'.
+
+    fecha: String, opcional.
+    Descripción: Es la fecha de las pestañas de las curvas, por ejemplo,
+    '17-01-23'.
+
+    serie_cer: DataFrame, opcional.
+    Descripción: Es la serie del índice CER con la columna 'Fecha' como índice.
+
+    serie_tca3500: DataFrame, opcional.
+    Descripción: Es la serie del tipo de cambio A3500 con la columna 'Fecha'
+    como índice.
+
+    rem: DataFrame, opcional.
+    Descripción: Es la tabla de tasa badlar del REM tal como se importa en la
+    función 'tasabadlar'.
+
+    """
+
+    def __init__(self,bonos,curvas,fecha=None,serie_cer=None,serie_tca3500=None,
+                 rem=None):
+        self.bonos=bonos
+        self.curvas=curvas
+        self.fecha=fecha
+        self.serie_cer=serie_cer
+        self.serie_tca3500=serie_tca3500
+        self.rem=rem
+
+    @classmethod
+    def cargar(cls,fecha1,directorio='.',nombre_archivo='Bonoscaracteristicas',
+               nombre_archivo_curvas='Bonoscurvas',nombre_archivo_cer='Serie CER',
+               nombre_archivo_tc=None,nombre_archivo_rem=None):
+        """
+        Lee una sola vez cada uno de los libros de excel y devuelve la foto del
+        mercado correspondiente a la fecha 'fecha1'.
+
+        PARAMETROS
+        ----------
+        fecha1: String, obligatorio.
+        Descripción: Es la fecha de las pestañas de 'Bonoscurvas' que se van a
+        importar. Por ejemplo, '17-01-23'.
+
+        directorio: String, opcional.
+        Descripción: Es la carpeta donde se encuentran los archivos de excel.
+        Por defecto es la carpeta actual.
+
+        nombre_archivo: String, opcional.
+        Descripción: Es el nombre del excel con las características de los bonos.
+        Por defecto es 'Bonoscaracteristicas'.
+
+        nombre_archivo_curvas: String, opcional.
+        Descripción: Es el nombre del excel con las curvas TIR-DM. Por defecto
+        es 'Bonoscurvas'.
+
+        nombre_archivo_cer: String, opcional.
+        Descripción: Es el nombre del excel con la serie CER. Por defecto es
+        'Serie CER'. Si es None, la serie no se importa.
+
+        nombre_archivo_tc: String, opcional.
+        Descripción: Es el nombre del excel con la serie del A3500. Si es None,
+        la serie no se importa.
+
+        nombre_archivo_rem: String, opcional.
+        Descripción: Es el nombre del excel del REM descargado del BCRA. Si es
+        None, la tabla no se importa.
+
+        RESULTADO
+        -------
+        mercado: MarketSnapshot.
+        Descripción: Es la foto del mercado con todos los datos ya importados.
+
+        """
+        from cache import leer_excel
+
+        bonos=leer_excel(f'{directorio}/{nombre_archivo}.xlsx').set_index('Ticket')
+
+        # Las cuatro pestañas de la fecha se leen en una sola pasada sobre el
+        # libro de curvas.
+        pestañas={tipo:f'{fecha1} {tipo}' for tipo in ['CER','Pesos','DL','USD']}
+        hojas=leer_excel(f'{directorio}/{nombre_archivo_curvas}.xlsx',
+                            sheet_name=list(pestañas.values()))
+        curvas={tipo:hojas[hoja] for tipo,hoja in pestañas.items()}
+
+        serie_cer=None
+        if nombre_archivo_cer is not None:
+            serie_cer=leer_excel(f'{directorio}/{nombre_archivo_cer}.xlsx'
+                                    ).set_index('Fecha')
+
+        serie_tca3500=None
+        if nombre_archivo_tc is not None:
+            serie_tca3500=leer_excel(f'{directorio}/{nombre_archivo_tc}.xlsx'
+                                        ).set_index('Fecha')
+
+        rem=None
+        if nombre_archivo_rem is not None:
+            rem=leer_excel(f'{directorio}/{nombre_archivo_rem}.xlsx',
+                              sheet_name='Resultados TOP 10',header=31,
+                              usecols='B:D',nrows=8)
+
+        return cls(bonos,curvas,fecha=fecha1,serie_cer=serie_cer,
+                   serie_tca3500=serie_tca3500,rem=rem)
+
+    def curva(self,tipo):
+        """
+        Devuelve la curva TIR-DM del tipo indicado: 'CER', 'Pesos', 'DL' o 'USD'.
+
+        """
+        return self.curvas[tipo]
+
+    def condiciones(self,ticket):
+        """
+        Devuelve las condiciones de emisión del ticket con los nombres de los
+        argumentos de 'ffbonocap' y 'ffbonodesc', de modo que el flujo de fondos
+        se obtiene así: ffbonocap(**mercado.condiciones(ticket),f_horizonte=...).
+
+        """
+        bono=self.bonos.loc[ticket]
+        return {'cupon1':bono.cupon1,'cupon2':bono.cupon2,
+                'f_vencimiento':bono.f_vencimiento,
+                't_cupon':bono.tasa_cupon_anual,'tipo':bono.tipo_bono1,
+                'c_cupones':bono.tipo_bono3}
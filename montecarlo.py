@@ -0,0 +1,314 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#               SIMULACION DE MONTE CARLO DE INFLACION Y DEP/DEV
+#
+#             Simula caminos aleatorios de inflación y de dep/dev que
+#          vuelven a la media, alrededor de las tasas de las tablas
+#          ('tabla_infla' y 'tabla_dev', o sus escenarios), con shocks
+#          correlacionados entre las dos. Los flujos de los bonos se arman
+#          una sola vez (ver 'EvaluadorRT' en 'escenarios.py') y los caminos
+#          se evalúan por bloques de tamaño fijo: de cada bloque sólo se
+#          guardan los cuantiles acumulados, de modo que la memoria no
+#          crece con la cantidad de caminos. Cada bloque tiene su propia
+#          semilla, derivada de la semilla general, así que el resultado es
+#             el mismo con uno o con varios procesos en paralelo.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+# Contexto de cada proceso del pool: el evaluador y los parámetros del modelo.
+_contexto_mc=None
+
+
+class CuantilesAcumulados:
+    """
+    Resume la distribución de cada columna de una secuencia de bloques de
+    valores con una cantidad fija de puntos, y la media de cada columna. Mien-
+    tras haya menos de 'puntos' valores se guardan todos; luego, al agregar un
+    bloque se juntan los puntos guardados (cada uno con su peso) con los del
+    bloque y se vuelven a resumir en 'puntos' cuantiles equiespaciados. El
+    error de los cuantiles es del orden de 1/puntos.
+
+    PARAMETROS
+    ----------
+    columnas: Integer.
+    Descripción: Es la cantidad de columnas de cada bloque (por ejemplo, una
+    por ticket).
+
+    puntos: Integer, opcional.
+    Descripción: Es la cantidad de puntos que se guardan por columna. Por
+    defecto es de 1000.
+
+    """
+
+    def __init__(self,columnas,puntos=1000):
+        import numpy as np
+
+        self.puntos=int(puntos)
+        self.valores=np.empty((0,columnas))
+        self.peso=1.0
+        self.cantidad=0
+        self.suma=np.zeros(columnas)
+
+    def agregar(self,valores):
+        """
+        Agrega un bloque de valores, con una fila por observación.
+
+        """
+        import numpy as np
+
+        valores=np.asarray(valores,dtype=float)
+        self.cantidad+=valores.shape[0]
+        self.suma+=valores.sum(axis=0)
+
+        todos=np.concatenate([self.valores,valores])
+        pesos=np.concatenate([np.full(self.valores.shape[0],self.peso),
+                              np.ones(valores.shape[0])])
+        orden=np.argsort(todos,axis=0)
+        todos=np.take_along_axis(todos,orden,axis=0)
+        if todos.shape[0]<=self.puntos:
+            self.valores=todos
+            return
+
+        # Se resume cada columna en 'puntos' cuantiles, cada uno con el mismo
+        # peso.
+        objetivo=(np.arange(self.puntos)+0.5)/self.puntos
+        resumen=np.empty((self.puntos,todos.shape[1]))
+        for j in range(todos.shape[1]):
+            w=pesos[orden[:,j]]
+            cdf=(np.cumsum(w)-w/2)/self.cantidad
+            resumen[:,j]=np.interp(objetivo,cdf,todos[:,j])
+        self.valores=resumen
+        self.peso=self.cantidad/self.puntos
+
+    def media(self):
+        """
+        Devuelve la media de cada columna.
+
+        """
+        return self.suma/self.cantidad
+
+    def cuantiles(self,q):
+        """
+        Devuelve los cuantiles 'q' (entre 0 y 1) de cada columna, con un
+        cuantil por fila.
+
+        """
+        import numpy as np
+
+        # Los puntos guardados tienen todos el mismo peso.
+        q=np.atleast_1d(np.asarray(q,dtype=float))
+        cdf=(np.arange(self.valores.shape[0])+0.5)/self.valores.shape[0]
+        resultado=np.empty((q.size,self.valores.shape[1]))
+        for j in range(self.valores.shape[1]):
+            resultado[:,j]=np.interp(q,cdf,self.valores[:,j])
+
+        return resultado
+
+
+def simular_caminos(plantilla_inf,plantilla_dev,n_caminos,generador,reversion=0.2,
+                    vol_infla=0.005,vol_dev=0.01,correlacion=0.5):
+    """
+    Simula caminos de inflación y de dep/dev sobre los meses de las tablas
+    plantilla. En cada tabla, los dos primeros meses (el mes anterior y el
+    actual) no cambian; desde el tercero, la tasa de cada mes es la de la
+    plantilla más un desvío que vuelve a cero:
+
+        x(t) = (1-reversion)*x(t-1) + vol*e(t)
+
+    donde los shocks 'e' de inflación y de dep/dev de un mismo mes calendario
+    son normales estándar con correlación 'correlacion'.
+
+    PARAMETROS
+    ----------
+    plantilla_inf, plantilla_dev: TablaMensual, obligatorio.
+    Descripción: Son las tablas de inflación y de dep/dev alrededor de las
+    cuales se simula.
+
+    n_caminos: Integer, obligatorio.
+    Descripción: Es la cantidad de caminos.
+
+    generador: numpy.random.Generator, obligatorio.
+    Descripción: Es el generador de números aleatorios.
+
+    reversion: Float, opcional.
+    Descripción: Es la fracción del desvío que se corrige cada mes. Por defecto
+    es de 0.2.
+
+    vol_infla, vol_dev: Floats, opcional.
+    Descripción: Son los desvíos estándar mensuales de los shocks de inflación
+    y de dep/dev. Por defecto son de 0.005 y 0.01.
+
+    correlacion: Float, opcional.
+    Descripción: Es la correlación entre los shocks de inflación y de dep/dev.
+    Por defecto es de 0.5.
+
+    RESULTADO
+    -------
+    tasas_inf, acum_inf, tasas_dev, acum_dev: arrays de Floats.
+    Descripción: Son las tasas mensuales y acumuladas de cada camino, con un
+    camino por fila y un mes de la plantilla por columna.
+
+    """
+    import numpy as np
+
+    # Shocks correlacionados sobre todos los meses calendario de las dos tablas.
+    inicio=min(plantilla_inf.mes_inicial,plantilla_dev.mes_inicial)
+    fin=max(plantilla_inf.mes_inicial+len(plantilla_inf),
+            plantilla_dev.mes_inicial+len(plantilla_dev))
+    z1=generador.standard_normal((n_caminos,fin-inicio))
+    z2=generador.standard_normal((n_caminos,fin-inicio))
+    shocks={'inf':z1,'dev':correlacion*z1+np.sqrt(1-correlacion**2)*z2}
+
+    caminos=[]
+    for plantilla,clave,vol in [(plantilla_inf,'inf',vol_infla),
+                                (plantilla_dev,'dev',vol_dev)]:
+        e=shocks[clave][:,plantilla.mes_inicial-inicio:
+                        plantilla.mes_inicial-inicio+len(plantilla)]
+        desvio=np.zeros((n_caminos,len(plantilla)))
+        for k in range(2,len(plantilla)):
+            desvio[:,k]=(1-reversion)*desvio[:,k-1]+vol*e[:,k]
+        tasas=np.maximum(plantilla.tasas+desvio,-0.99)
+
+        # La tasa acumulada es la de la plantilla, corregida por el cociente
+        # entre las tasas del camino y las de la plantilla desde el tercer mes.
+        acum=np.tile(plantilla.acumuladas,(n_caminos,1))
+        acum[:,2:]=(1+plantilla.acumuladas[2:])*np.cumprod(
+            (1+tasas[:,2:])/(1+plantilla.tasas[2:]),axis=1)-1
+        caminos+=[tasas,acum]
+
+    return tuple(caminos)
+
+
+def _iniciar_mc(contexto):
+    global _contexto_mc
+    _contexto_mc=contexto
+
+
+def _bloque_mc_pool(semilla,n_caminos):
+    return _bloque_mc(semilla,n_caminos,**_contexto_mc)
+
+
+def _bloque_mc(semilla,n_caminos,evaluador,concepto,parametros):
+    """
+    Simula un bloque de caminos y devuelve el concepto pedido, con un camino
+    por fila y un ticket por columna.
+
+    """
+    import numpy as np
+    from escenarios import CONCEPTOS
+
+    generador=np.random.default_rng(semilla)
+    tasas_inf,acum_inf,tasas_dev,acum_dev=simular_caminos(
+        evaluador.plantilla_inf,evaluador.plantilla_dev,n_caminos,generador,
+        **parametros)
+    valores=evaluador.rendimiento(evaluador.caminos_inflacion(tasas_inf,acum_inf),
+                                  evaluador.caminos_dev(tasas_dev,acum_dev))
+
+    return valores[CONCEPTOS.index(concepto)]
+
+
+def simular_rt(infla_tabla,deva_tabla,int_tabla,f_horizonte,i_cer_hoy,tcn_hoy,
+               fecha1,n_caminos=10_000,tamaño_bloque=1_000,reversion=0.2,
+               vol_infla=0.005,vol_dev=0.01,correlacion=0.5,
+               cuantiles=(0.05,0.25,0.5,0.75,0.95),concepto='RT_Anual_Esp',
+               semilla=None,n_jobs=1,puntos=1000,monto_invertido=50_000,
+               mercado=None,as_of=None):
+    """
+    Estima la distribución del rendimiento total de los bonos bullet y letras
+    a la fecha horizonte, simulando caminos de inflación y de dep/dev alrede-
+    dor de las tablas (ver 'simular_caminos').
+
+    PARAMETROS
+    ----------
+    infla_tabla, deva_tabla, int_tabla, f_horizonte, i_cer_hoy, tcn_hoy, fecha1:
+    Descripción: Son los mismos argumentos de 'analisis_rt'. Las tablas de
+    inflación y de dep/dev son el centro de la simulación.
+
+    n_caminos: Integer, opcional.
+    Descripción: Es la cantidad de caminos simulados. Por defecto es de 10_000.
+
+    tamaño_bloque: Integer, opcional.
+    Descripción: Es la cantidad de caminos que se evalúan a la vez. La memoria
+    utilizada depende de este valor y no de 'n_caminos'. Por defecto es de
+    1_000.
+
+    reversion, vol_infla, vol_dev, correlacion: Floats, opcional.
+    Descripción: Son los parámetros del modelo (ver 'simular_caminos').
+
+    cuantiles: lista de Floats, opcional.
+    Descripción: Son los cuantiles (entre 0 y 1) que se informan. Por defecto
+    son (0.05, 0.25, 0.5, 0.75, 0.95).
+
+    concepto: String, opcional.
+    Descripción: Es la columna de 'analisis_rt' cuya distribución se estima:
+    'RT_Anual_Esp' (por defecto), 'Cupones', 'Int_Reinv' o 'Capital_o_Reventa'.
+
+    semilla: Integer, opcional.
+    Descripción: Es la semilla de los números aleatorios. Con la misma semilla
+    se obtiene el mismo resultado, cualquiera sea 'n_jobs'.
+
+    n_jobs: Integer, opcional.
+    Descripción: Es la cantidad de procesos que evalúan bloques en paralelo.
+    Con -1 o None se usan todos los procesadores. Por defecto es 1.
+
+    puntos: Integer, opcional.
+    Descripción: Es la cantidad de puntos con que se resume la distribución de
+    cada ticket (ver 'CuantilesAcumulados'). Por defecto es de 1000.
+
+    monto_invertido, mercado, as_of:
+    Descripción: Son los mismos argumentos de 'analisis_rt'.
+
+    RESULTADO
+    -------
+    distribucion: DataFrame.
+    Descripción: Tiene un ticket por fila, y la media y los cuantiles del
+    concepto (en porcentaje, igual que en 'analisis_rt') en las columnas
+    'media', 'p5', 'p25', etc.
+
+    """
+    import os
+    import numpy as np
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+    from escenarios import CONCEPTOS, EvaluadorRT
+
+    if concepto not in CONCEPTOS:
+        raise ValueError(f'El concepto debe ser uno de {CONCEPTOS}.')
+
+    evaluador=EvaluadorRT(infla_tabla,deva_tabla,int_tabla,f_horizonte,i_cer_hoy,
+                          tcn_hoy,fecha1,monto_invertido,mercado,as_of)
+    parametros=dict(reversion=reversion,vol_infla=vol_infla,vol_dev=vol_dev,
+                    correlacion=correlacion)
+    contexto=dict(evaluador=evaluador,concepto=concepto,parametros=parametros)
+
+    # Un bloque por cada 'tamaño_bloque' caminos, cada uno con su semilla.
+    tamaños=[tamaño_bloque]*(n_caminos//tamaño_bloque)
+    if n_caminos%tamaño_bloque:
+        tamaños.append(n_caminos%tamaño_bloque)
+    semillas=np.random.SeedSequence(semilla).spawn(len(tamaños))
+
+    acumulado=CuantilesAcumulados(len(evaluador.tickets),puntos)
+    if n_jobs is None or n_jobs<0:
+        n_jobs=os.cpu_count()
+    if n_jobs==1 or len(tamaños)<=1:
+        for s,n in zip(semillas,tamaños):
+            acumulado.agregar(_bloque_mc(s,n,**contexto))
+    else:
+        # Se envían pocos bloques por vez, para que los resultados pendientes
+        # no ocupen memoria, y se agregan en orden.
+        with ProcessPoolExecutor(max_workers=n_jobs,initializer=_iniciar_mc,
+                                 initargs=(contexto,)) as pool:
+            for inicio in range(0,len(tamaños),2*n_jobs):
+                tandas=[pool.submit(_bloque_mc_pool,s,n) for s,n in
+                        zip(semillas[inicio:inicio+2*n_jobs],
+                            tamaños[inicio:inicio+2*n_jobs])]
+                for tanda in tandas:
+                    acumulado.agregar(tanda.result())
+
+    q=np.asarray(cuantiles,dtype=float)
+    distribucion=pd.DataFrame(np.vstack([acumulado.media(),acumulado.cuantiles(q)]).T,
+                              index=pd.Index(evaluador.tickets,name='Ticket'),
+                              columns=['media']+[f'p{100*x:g}' for x in q])
+
+    return np.round(distribucion*100,2)
@@ -0,0 +1,363 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                      MEDICION DEL TIEMPO DE CADA ETAPA
+#
+#             Registra, sólo cuando se pide, el tiempo de cada etapa del
+#          cálculo ('cronograma_bono', 'flujobono_act', 'capflujos',
+#          'p_reventa', 'leer_excel', 'ajustar_curva', etc.), la cantidad de
+#          llamadas, las filas producidas, y el ticket que se estaba calcu-
+#          lando. Se activa con el administrador de contexto 'Perfil':
+#
+#              with Perfil() as perfil:
+#                  analisis_rt(...)
+#              perfil.resumen()
+#              perfil.exportar_chrome('traza.json')
+#
+#             Las funciones medidas llevan el decorador 'medido'. Cuando no
+#          hay un Perfil activo, el decorador sólo agrega la consulta de una
+#          variable global a cada llamada. Los tiempos de los procesos de un
+#          pool no se registran: para medir 'analisis_rt' se usa n_jobs=1 o
+#          executor='hilos'.
+#
+#             Con Perfil(memoria=True) se registra además, con tracemalloc,
+#          la memoria máxima reservada durante cada etapa y la que queda
+#          reservada al terminar. 'escalamiento_memoria' mide cómo crece la
+#          memoria de cada etapa con el plazo de la fecha horizonte y marca
+#                      las que crecen más que linealmente.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+# Perfil activo, o None si no se está midiendo.
+_activo=None
+
+
+def _filas(resultado):
+    """
+    Devuelve la cantidad de filas de un DataFrame o Series, o la suma de las
+    filas de una tupla de ellos. Para otros resultados devuelve None.
+
+    """
+    if isinstance(resultado,tuple):
+        filas=[_filas(r) for r in resultado]
+        filas=[f for f in filas if f is not None]
+        return sum(filas) if filas else None
+    if hasattr(resultado,'shape') and hasattr(resultado,'index'):
+        return len(resultado)
+
+    return None
+
+
+class Perfil:
+    """
+    Registra las etapas medidas mientras está activo (dentro del bloque 'with').
+    Cada etapa es un evento con su nombre, el ticket, el momento de inicio y la
+    duración (en segundos, desde que se activó el perfil), el tiempo propio
+    (sin las etapas internas), las filas producidas y el hilo.
+
+    Los perfiles se pueden anidar: al salir de uno vuelve a quedar activo el
+    anterior.
+
+    PARAMETROS
+    ----------
+    memoria: Boolean, opcional.
+    Descripción: Si es True, cada evento registra además la memoria máxima
+    reservada durante la etapa ('pico', en bytes, por encima de la reservada
+    al empezar) y la que queda reservada al terminar ('retenido'). Usa
+    tracemalloc, que hace más lento el cálculo, y la cuenta es global: con
+    varios hilos la memoria de uno se suma a la etapa de otro, por lo que
+    conviene medir con n_jobs=1. Por defecto es False.
+
+    """
+
+    def __init__(self,memoria=False):
+        import threading
+
+        self.memoria=memoria
+        self.eventos=[]
+        self._local=threading.local()
+        self._inicio=None
+        self._anterior=None
+        self._detener=False
+
+    def __enter__(self):
+        import time
+        import tracemalloc
+
+        global _activo
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._detener=True
+        self._anterior=_activo
+        self._inicio=time.perf_counter()
+        _activo=self
+        return self
+
+    def __exit__(self,*excepcion):
+        import tracemalloc
+
+        global _activo
+        _activo=self._anterior
+        if self._detener:
+            tracemalloc.stop()
+            self._detener=False
+        return False
+
+    def _pila(self):
+        pila=getattr(self._local,'pila',None)
+        if pila is None:
+            pila=self._local.pila=[]
+        return pila
+
+    @contextmanager
+    def medir(self,etapa,ticket=None):
+        """
+        Administrador de contexto que registra el bloque como la etapa 'etapa'.
+        Devuelve un diccionario donde se pueden indicar las filas producidas
+        ('filas'). Si no se indica el ticket, se toma el de la etapa que la
+        contiene.
+
+        """
+        import time
+        import threading
+        import tracemalloc
+
+        pila=self._pila()
+        if ticket is None and pila:
+            ticket=pila[-1]['ticket']
+        marco={'ticket':ticket,'internas':0.,'filas':None}
+        memoria=self.memoria and tracemalloc.is_tracing()
+        if memoria:
+            # El pico de tracemalloc es uno solo: antes de reiniciarlo para
+            # esta etapa se guarda en la etapa que la contiene.
+            actual,pico=tracemalloc.get_traced_memory()
+            if pila:
+                pila[-1]['pico']=max(pila[-1]['pico'],pico)
+            tracemalloc.reset_peak()
+            marco.update(reservado=actual,pico=actual)
+        pila.append(marco)
+        inicio=time.perf_counter()
+        try:
+            yield marco
+        finally:
+            duracion=time.perf_counter()-inicio
+            pila.pop()
+            if pila:
+                pila[-1]['internas']+=duracion
+            evento={'etapa':etapa,'ticket':ticket,'inicio':inicio-self._inicio,
+                    'duracion':duracion,'propio':duracion-marco['internas'],
+                    'filas':marco['filas'],'hilo':threading.get_ident(),
+                    'pico':None,'retenido':None}
+            if memoria and tracemalloc.is_tracing():
+                actual,pico=tracemalloc.get_traced_memory()
+                pico=max(marco['pico'],pico)
+                if pila:
+                    pila[-1]['pico']=max(pila[-1]['pico'],pico)
+                evento.update(pico=pico-marco['reservado'],
+                              retenido=actual-marco['reservado'])
+            self.eventos.append(evento)
+
+    def registrar(self,etapa,funcion,ticket=None):
+        """
+        Ejecuta 'funcion' (sin argumentos) como la etapa 'etapa' y devuelve su
+        resultado.
+
+        """
+        with self.medir(etapa,ticket) as marco:
+            resultado=funcion()
+            marco['filas']=_filas(resultado)
+
+        return resultado
+
+    def tabla(self):
+        """
+        Devuelve todos los eventos registrados como DataFrame.
+
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.eventos,columns=['etapa','ticket','inicio','duracion',
+                                                  'propio','filas','hilo','pico',
+                                                  'retenido'])
+
+    def resumen(self,por_ticket=False):
+        """
+        Devuelve una tabla con la cantidad de llamadas, el tiempo total, el
+        tiempo propio (sin las etapas internas) y las filas producidas de cada
+        etapa, ordenada de mayor a menor tiempo propio. Si 'por_ticket' es True,
+        la tabla se abre además por ticket.
+
+        Si el perfil mide la memoria, la tabla tiene también la memoria máxima
+        de una llamada ('pico_bytes') y la memoria retenida por todas las
+        llamadas ('retenido_bytes'), y se ordena de mayor a menor pico.
+
+        """
+        tabla=self.tabla()
+        claves=['etapa','ticket'] if por_ticket else ['etapa']
+        grupos=tabla.groupby(claves,dropna=False)
+        resumen=grupos.agg(llamadas=('duracion','size'),segundos=('duracion','sum'),
+                           segundos_propios=('propio','sum'))
+        resumen['filas']=grupos.filas.sum(min_count=1)
+        resumen['porcentaje']=resumen.segundos_propios/resumen.segundos_propios.sum()*100
+        if not self.memoria:
+            return resumen.sort_values('segundos_propios',ascending=False)
+
+        resumen['pico_bytes']=grupos.pico.max()
+        resumen['retenido_bytes']=grupos.retenido.sum(min_count=1)
+
+        return resumen.sort_values('pico_bytes',ascending=False)
+
+    def exportar_json(self,ruta):
+        """
+        Guarda los eventos y el resumen por etapa en un archivo JSON.
+
+        """
+        import json
+
+        resumen=self.resumen().reset_index()
+        with open(ruta,'w',encoding='utf-8') as archivo:
+            json.dump({'eventos':self.eventos,
+                       'resumen':resumen.to_dict(orient='records')},
+                      archivo,indent=1,default=str)
+
+        return ruta
+
+    def exportar_chrome(self,ruta):
+        """
+        Guarda los eventos con el formato de trazas de Chrome, que se abre en
+        'chrome://tracing' o en 'https://ui.perfetto.dev'.
+
+        """
+        import os
+        import json
+
+        eventos=[{'name':e['etapa'],'cat':'renta_fija','ph':'X','pid':os.getpid(),
+                  'tid':e['hilo'],'ts':e['inicio']*1e6,'dur':e['duracion']*1e6,
+                  'args':{'ticket':e['ticket'],'filas':e['filas'],'pico':e['pico'],
+                          'retenido':e['retenido']}}
+                 for e in self.eventos]
+        with open(ruta,'w',encoding='utf-8') as archivo:
+            json.dump({'traceEvents':eventos,'displayTimeUnit':'ms'},archivo,default=str)
+
+        return ruta
+
+
+def medido(etapa=None,ticket=None):
+    """
+    Decorador que registra cada llamada a la función como una etapa del Perfil
+    activo. Sin un Perfil activo, la función se llama directamente.
+
+    PARAMETROS
+    ----------
+    etapa: String, opcional.
+    Descripción: Es el nombre de la etapa. Por defecto, el de la función.
+
+    ticket: String, opcional.
+    Descripción: Es el nombre del argumento de la función que tiene el ticket,
+    por ejemplo, 'ticket'. Las etapas que se llaman desde la función quedan
+    asociadas a ese ticket.
+
+    """
+    def decorador(funcion):
+        nombre=etapa or funcion.__name__
+        # Posición del argumento con el ticket, si se pasa por posición (en la
+        # función original, si ya tiene otro decorador).
+        original=funcion
+        while hasattr(original,'__wrapped__'):
+            original=original.__wrapped__
+        codigo=original.__code__
+        posicion=codigo.co_varnames[:codigo.co_argcount].index(ticket) \
+            if ticket is not None else None
+
+        @wraps(funcion)
+        def medida(*args,**kwargs):
+            perfil=_activo
+            if perfil is None:
+                return funcion(*args,**kwargs)
+            valor=None
+            if ticket in kwargs:
+                valor=kwargs[ticket]
+            elif posicion is not None and posicion<len(args):
+                valor=args[posicion]
+            return perfil.registrar(nombre,lambda: funcion(*args,**kwargs),valor)
+
+        return medida
+
+    return decorador
+
+
+def etapa(nombre,ticket=None):
+    """
+    Administrador de contexto que registra un bloque de código como una etapa
+    del Perfil activo:
+
+        with etapa('armar tabla'):
+            ...
+
+    Sin un Perfil activo no registra nada.
+
+    """
+    perfil=_activo
+    if perfil is None:
+        return nullcontext()
+
+    return perfil.medir(nombre,ticket)
+
+
+def escalamiento_memoria(correr,plazos,umbral=1.2):
+    """
+    Mide la memoria máxima de cada etapa para distintos plazos de la fecha
+    horizonte y estima cómo crece con el plazo.
+
+    PARAMETROS
+    ----------
+    correr: Función, obligatorio.
+    Descripción: Es una función que recibe un plazo y ejecuta el cálculo a
+    medir con ese plazo, por ejemplo, 'tabla_infla', 'tabla_dev' y
+    'analisis_rt' con la fecha horizonte a ese plazo.
+
+    plazos: lista de Integers o Floats, obligatorio.
+    Descripción: Son los plazos a medir (en meses, días, etc.). Se necesitan
+    al menos dos.
+
+    umbral: Float, opcional.
+    Descripción: Es el exponente a partir del cual el crecimiento se considera
+    más que lineal. Por defecto es 1.2.
+
+    RESULTADO
+    -------
+    escalamiento: DataFrame.
+    Descripción: Tiene una fila por etapa, con la memoria máxima de una
+    llamada (en bytes) para cada plazo, el exponente 'exponente' de la
+    regresión log-log de la memoria contra el plazo (1 es crecimiento lineal,
+    2 cuadrático) y la marca 'superlineal' si el exponente supera el umbral.
+
+    """
+    import numpy as np
+    import pandas as pd
+
+    # La primera ejecución no se mide: incluye las importaciones y las tablas
+    # que se arman una sola vez.
+    correr(plazos[0])
+    picos={}
+    for plazo in plazos:
+        with Perfil(memoria=True) as perfil:
+            correr(plazo)
+        picos[plazo]=perfil.resumen().pico_bytes
+
+    escalamiento=pd.DataFrame(picos).astype(float)
+    log_plazos=np.log(np.asarray(plazos,dtype=float))
+    exponentes={}
+    for etapa,fila in escalamiento.iterrows():
+        validos=np.asarray(fila>0)
+        if validos.sum()<2:
+            exponentes[etapa]=np.nan
+            continue
+        exponentes[etapa]=np.polyfit(log_plazos[validos],np.log(fila.values[validos]),1)[0]
+    escalamiento['exponente']=pd.Series(exponentes)
+    escalamiento['superlineal']=escalamiento.exponente>umbral
+
+    return escalamiento.sort_values('exponente',ascending=False)
@@ -0,0 +1,124 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                  ACTUALIZACION DEL RENDIMIENTO CON NUEVOS PRECIOS
+#
+#             En 'analisis_rt' el precio de cada bono sólo entra en el
+#          valor nominal que se compra, vn = monto_invertido/precio*100, y
+#          todos los flujos son proporcionales a ese valor nominal. Aquí se
+#          calculan una sola vez los cupones, el capital, el valor futuro de
+#          lo cobrado y el precio de reventa por cada 100 de valor nominal;
+#          con cada nuevo vector de precios sólo se recalculan el rendimien-
+#          to total y el orden de la tabla, sin volver a armar los flujos ni
+#                           las tablas de inflación y de dep/dev.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+
+class RepreciadorRT:
+    """
+    Guarda los resultados por cada 100 de valor nominal de los bonos bullet y
+    letras de 'analisis_rt', y arma la misma tabla para cualquier vector de
+    precios. Las participaciones de los cupones, los intereses por reinversión
+    y el capital o la reventa no dependen del precio; el rendimiento total es
+    (lo cobrado por cada 100 de valor nominal)/precio, anualizado.
+
+    PARAMETROS
+    ----------
+    infla_tabla, deva_tabla, int_tabla, f_horizonte, i_cer_hoy, tcn_hoy, fecha1,
+    mercado, as_of:
+    Descripción: Son los mismos argumentos de 'analisis_rt'. El monto invertido
+    no cambia el resultado, por lo que no se pide.
+
+    """
+
+    def __init__(self,infla_tabla,deva_tabla,int_tabla,f_horizonte,i_cer_hoy,tcn_hoy,
+                 fecha1,mercado=None,as_of=None):
+        import numpy as np
+        import pandas as pd
+        from mercado import MarketSnapshot
+        from escenarios import EvaluadorRT
+
+        if mercado is None:
+            mercado=MarketSnapshot.cargar(fecha1,nombre_archivo_cer=None)
+        bonoss=mercado.bonos
+
+        # Se evalúa un único camino, el de las tablas, y se lleva cada resultado
+        # a 100 de valor nominal.
+        monto=100.
+        evaluador=EvaluadorRT(infla_tabla,deva_tabla,int_tabla,f_horizonte,i_cer_hoy,
+                              tcn_hoy,fecha1,monto,mercado,as_of)
+        tpl_inf,tpl_dev=evaluador.plantilla_inf,evaluador.plantilla_dev
+        inf=evaluador.caminos_inflacion(tpl_inf.tasas[None,:],tpl_inf.acumuladas[None,:])
+        dev=evaluador.caminos_dev(tpl_dev.tasas[None,:],tpl_dev.acumuladas[None,:])
+        cupones,capital,futuro,reventa=[np.where(evaluador.es_dl,d[0],i[0])
+                                        for i,d in zip(inf,dev)]
+
+        self.tickets=pd.Index(evaluador.tickets,name='Ticket')
+        precios=np.asarray(bonoss.precio.reindex(self.tickets),dtype=float)
+        escala=precios/monto
+        cap_o_reventa=np.where(evaluador.vencido,capital,reventa)*escala
+        int_reinv=(futuro-(cupones+capital))*escala
+        cupones=cupones*escala
+
+        self.cobrado=cupones+int_reinv+cap_o_reventa
+        self.participaciones=pd.DataFrame(
+            np.round(np.vstack([cupones,int_reinv,cap_o_reventa]).T/self.cobrado[:,None]*100,2),
+            index=self.tickets,columns=['Cupones','Int_Reinv','Capital_o_Reventa'])
+        self.dias=evaluador.dias
+        self.precios=pd.Series(precios,index=self.tickets,name='precio')
+
+        # Pares de bonos duales: se identifican por el ticket sin el sufijo.
+        dual=np.asarray(bonoss.DUAL.reindex(self.tickets))=='si'
+        self.grupo=pd.Series([t[:t.find('-')] if d else t for t,d in
+                              zip(self.tickets,dual)],index=self.tickets)
+
+    def rendimiento(self,precios=None):
+        """
+        Devuelve el rendimiento total anual (en tanto por uno) de cada ticket
+        con los precios indicados, o con los guardados si no se indican.
+
+        """
+        import numpy as np
+        import pandas as pd
+
+        if precios is None:
+            precios=self.precios
+        precios=np.asarray(pd.Series(precios).reindex(self.tickets),dtype=float)
+
+        return pd.Series((self.cobrado/precios)**(365/self.dias)-1,index=self.tickets,
+                         name='RT_Anual_Esp')
+
+    def actualizar(self,precios):
+        """
+        Reemplaza los precios de los tickets indicados (una Series o un
+        diccionario con el ticket como clave) y devuelve la tabla con los
+        precios actualizados.
+
+        """
+        import pandas as pd
+
+        precios=pd.Series(precios,dtype=float)
+        desconocidos=precios.index.difference(self.tickets)
+        if len(desconocidos):
+            raise KeyError(f'Hay tickets que no están en la tabla: {list(desconocidos)}.')
+        self.precios.loc[precios.index]=precios.values
+
+        return self.tabla()
+
+    def tabla(self,precios=None):
+        """
+        Devuelve la tabla de 'analisis_rt' con los precios indicados, o con los
+        guardados si no se indican: de cada par de bonos duales queda el de
+        mayor rendimiento, y los tickets se ordenan de mayor a menor rendimiento.
+
+        """
+        import numpy as np
+
+        tabla=self.participaciones.copy()
+        tabla.insert(0,'RT_Anual_Esp',np.round(self.rendimiento(precios)*100,2))
+
+        mejores=tabla.RT_Anual_Esp.groupby(self.grupo,sort=False).idxmax()
+        tabla=tabla.loc[mejores.values]
+
+        return tabla.sort_values('RT_Anual_Esp',ascending=False,kind='mergesort')
@@ -0,0 +1,428 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                         DATOS DE MERCADO SINTETICOS
+#
+#             Genera una foto del mercado (MarketSnapshot) con la misma
+#          estructura que los libros 'Bonoscaracteristicas', 'Bonoscurvas',
+#          'Serie CER', 'A3500' y el REM, pero con la cantidad de bonos que
+#          se quiera. Los datos dependen sólo de la semilla, de modo que dos
+#          corridas con los mismos argumentos dan exactamente el mismo
+#          mercado. Se utiliza para medir el rendimiento de la librería sin
+#          depender de los archivos reales. También escribe esos libros, con
+#          una pestaña de curvas por día hábil, en excel y en Parquet, para
+#                     probar la librería con muchos bonos y fechas.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+# Proporción de cada clase de bono en el universo generado.
+CLASES={'pesos-bullet':0.25,'pesos-letra':0.25,'CER-bullet':0.2,'DL-bullet':0.15,
+        'DUAL':0.15}
+
+# Curvas TIR = a + b*ln(DM) de cada tipo: tipo de bono ('tipo_bono2'), a y b.
+CURVAS={'CER':('CER',0.05,0.01),'Pesos':('pesos',0.30,-0.02),'DL':('DL',0.02,0.01),
+        'USD':(None,0.10,0.005)}
+
+# Cantidad mínima de bonos en cada curva, para que el ajuste TIR-DM sea estable.
+MINIMO_CURVA=6
+
+
+def _series(generador,hoy,años_historia=3):
+    """
+    Devuelve las series diarias del índice CER y del tcA3500, desde
+    'años_historia' años antes de 'hoy' hasta 'hoy'.
+
+    """
+    import numpy as np
+    import pandas as pd
+
+    fechas=pd.date_range(hoy-pd.DateOffset(years=años_historia),hoy,freq='D',name='Fecha')
+    # Inflación y devaluación mensual de alrededor del 3% y el 2%, con ruido.
+    cer=300*np.cumprod(1+generador.normal(0.03,0.005,len(fechas))/30)
+    tc=800*np.cumprod(1+generador.normal(0.02,0.01,len(fechas))/30)
+
+    return (pd.DataFrame({'CER':cer},index=fechas),
+            pd.DataFrame({'A3500':tc},index=fechas))
+
+
+def _valor(tipo,tasa,plazo,curva):
+    """
+    Devuelve el valor por cada 100 de valor nominal (sin actualizar por CER ni
+    por tipo de cambio) de un bono bullet o letra, descontado con la TIR de su
+    curva para el plazo al vencimiento (en años).
+
+    """
+    import numpy as np
+
+    _,a,b=CURVAS[curva]
+    tir=a+b*np.log(max(plazo*0.9,0.05))
+    if tipo=='bullet':
+        tiempos=plazo-0.5*np.arange(int(np.ceil(plazo*2)))
+        tiempos=tiempos[tiempos>0]
+        flujos=np.full(tiempos.size,tasa/2)
+        flujos[0]+=100
+    else:
+        tiempos=np.array([plazo])
+        flujos=np.array([100+tasa])
+
+    return float((flujos/(1+tir)**tiempos).sum())
+
+
+def _bonos(generador,n_tickets,hoy,años,cer_hoy,tc_hoy):
+    """
+    Devuelve las características de 'n_tickets' bonos bullet y letras, con
+    vencimientos entre un mes y 'años' años desde 'hoy'. Los precios son los
+    de las curvas, con un error de hasta el 2%.
+
+    """
+    import numpy as np
+    import pandas as pd
+
+    clases=generador.choice(list(CLASES),size=n_tickets,p=list(CLASES.values()))
+    # Como en el mercado real, siempre hay al menos un par de bonos duales.
+    if n_tickets>=2:
+        clases[0]='DUAL'
+    # Las patas de los duales se guardan aparte: como en la planilla, van al
+    # final, primero todas las patas CER y después las DL en el mismo orden
+    # (así las empareja 'analisis_rt').
+    filas=[]
+    duales_cer=[]
+    duales_dl=[]
+    i=0
+    while len(filas)+len(duales_cer)+len(duales_dl)<n_tickets:
+        clase=clases[i]
+        i+=1
+        moneda,tipo=(clase.split('-')+['letra'])[:2]
+
+        # Fechas de cupón, separadas seis meses, y vencimiento en una de ellas.
+        mes=int(generador.integers(1,7))
+        dia=int(generador.integers(1,29))
+        plazo=generador.uniform(1/12,años)
+        venc=hoy+pd.DateOffset(days=int(plazo*365))
+        meses_cupon=[mes,mes+6]
+        mes_venc=min(meses_cupon,key=lambda m:abs(m-venc.month))
+        venc=pd.Timestamp(venc.year,mes_venc,dia)
+        if venc<=hoy+pd.DateOffset(days=30):
+            venc=venc+pd.DateOffset(years=1)
+        plazo=(venc-hoy).days/365
+        error=generador.uniform(0.98,1.02)
+
+        fila=dict(cupon1=f'{mes:02d}-{dia:02d}',cupon2=f'{mes+6:02d}-{dia:02d}',
+                  f_vencimiento=venc.strftime('%Y-%m-%d'),tipo_bono1=tipo,
+                  tipo_bono3=0,indice_inicial=0.,tc_inicial=0.,DUAL='no')
+        if tipo=='letra':
+            fila.update(cupon1=np.nan,cupon2=np.nan)
+
+        if moneda=='pesos':
+            if tipo=='letra':
+                capitaliza=int(generador.integers(0,2))
+                tasa=round(float(generador.uniform(20,40)),2)*capitaliza
+                fila.update(tipo_bono3=capitaliza)
+            else:
+                tasa=round(float(generador.uniform(10,40)),2)
+            precio=_valor(tipo,tasa,plazo,'Pesos')*error
+            filas.append(dict(fila,Ticket=f'P{i:04d}',tasa_cupon_anual=tasa,
+                              tipo_bono2='pesos',precio=round(precio,2)))
+        elif moneda=='CER':
+            emision=cer_hoy/generador.uniform(1,3)
+            tasa=round(float(generador.uniform(0.5,4)),2)
+            precio=_valor(tipo,tasa,plazo,'CER')*cer_hoy/emision*error
+            filas.append(dict(fila,Ticket=f'X{i:04d}',tasa_cupon_anual=tasa,
+                              tipo_bono2='CER',indice_inicial=round(emision,4),
+                              precio=round(precio,2)))
+        elif moneda=='DL':
+            tasa=round(float(generador.uniform(0,1)),2)
+            precio=_valor(tipo,tasa,plazo,'DL')*tc_hoy*error
+            filas.append(dict(fila,Ticket=f'V{i:04d}',tasa_cupon_anual=tasa,
+                              tipo_bono2='DL',tc_inicial=round(tc_hoy,4),
+                              precio=round(precio,2)))
+        else:
+            # Par de letras duales: una pata CER y una pata DL, con el mismo
+            # vencimiento.
+            emision=cer_hoy/generador.uniform(1,2)
+            fila.update(tipo_bono1='letra',cupon1=np.nan,cupon2=np.nan,DUAL='si',
+                        tasa_cupon_anual=0.)
+            if len(filas)+len(duales_cer)+len(duales_dl)+2<=n_tickets:
+                duales_cer.append(dict(fila,Ticket=f'D{i:04d}-CER',tipo_bono2='CER',
+                                       indice_inicial=round(emision,4),
+                                       precio=round(_valor('letra',0,plazo,'CER')*cer_hoy
+                                                    /emision*error,2)))
+                duales_dl.append(dict(fila,Ticket=f'D{i:04d}-DL',tipo_bono2='DL',
+                                      tc_inicial=round(tc_hoy,4),
+                                      precio=round(_valor('letra',0,plazo,'DL')*tc_hoy
+                                                   *error,2)))
+            else:
+                filas.append(dict(fila,Ticket=f'P{i:04d}',tasa_cupon_anual=0.,
+                                  tipo_bono2='pesos',DUAL='no',
+                                  precio=round(_valor('letra',0,plazo,'Pesos')*error,2)))
+
+    columnas=['Ticket','cupon1','cupon2','f_vencimiento','tasa_cupon_anual','tipo_bono1',
+              'tipo_bono2','tipo_bono3','indice_inicial','tc_inicial','precio','DUAL']
+    return pd.DataFrame(filas+duales_cer+duales_dl,columns=columnas).set_index('Ticket')
+
+
+def _curvas(generador,bonos,hoy,desplazamiento=0.):
+    """
+    Devuelve las curvas TIR-DM de los bonos CER, en pesos, DL y USD. Cada curva
+    sigue la forma TIR = a + b*ln(DM), con ruido, y se completa con bonos
+    ficticios hasta tener 'MINIMO_CURVA' observaciones.
+
+    """
+    import numpy as np
+    import pandas as pd
+
+    vencimientos=pd.to_datetime(bonos.f_vencimiento)
+    curvas={}
+    for tipo,(tipo_bono,a,b) in CURVAS.items():
+        propios=bonos.loc[bonos.tipo_bono2==tipo_bono]
+        dm=np.maximum((vencimientos.loc[propios.index]-hoy).dt.days.values/365*0.9,0.05)
+        tickets=list(propios.index)
+        precios=list(propios.precio)
+        faltantes=max(MINIMO_CURVA-len(tickets),0)
+        dm=np.concatenate([dm,generador.uniform(0.1,5,faltantes)])
+        tickets+=[f'{tipo[:2].upper()}{k}' for k in range(faltantes)]
+        precios+=[100.]*faltantes
+        tir=a+desplazamiento+b*np.log(dm)+generador.normal(0,0.003,dm.size)
+        curvas[tipo]=pd.DataFrame({'ticket':tickets,'precio':precios,'TIR_anual':tir,
+                                   'DMdias':dm})
+
+    return curvas
+
+
+def _rem(hoy):
+    """
+    Devuelve la tabla de tasas badlar del REM, con el formato de la pestaña
+    'Resultados TOP 10': seis meses desde el mes anterior a 'hoy', y los
+    promedios de los próximos 12 y 24 meses.
+
+    """
+    import numpy as np
+    import pandas as pd
+    from calendario import fines_de_mes
+
+    mes=np.datetime64(pd.Timestamp(hoy).to_datetime64(),'M')
+    meses=fines_de_mes(mes-1,mes+4)
+    periodos=[m.to_pydatetime() for m in meses]+['próx. 12 meses','próx. 24 meses']
+    mediana=[30.+i for i in range(6)]+[33.,32.]
+    promedio=[31.+i*0.5 for i in range(6)]+[33.5,32.5]
+
+    return pd.DataFrame({'Período':periodos,'Mediana':mediana,'Promedio':promedio})
+
+
+def mercado_sintetico(n_tickets=60,fecha1='16-10-26',años=10,semilla=0,años_historia=3):
+    """
+    Genera una foto del mercado sintética, con la misma estructura que la que
+    se obtiene con 'MarketSnapshot.cargar' de los archivos reales.
+
+    PARAMETROS
+    ----------
+    n_tickets: Integer, opcional.
+    Descripción: Es la cantidad de bonos bullet y letras (en pesos, CER, DL y
+    duales). Por defecto es 60, como en los libros reales.
+
+    fecha1: String, opcional.
+    Descripción: Es la fecha de la foto, con el formato de las pestañas de
+    'Bonoscurvas', por ejemplo, '17-01-23'. Las series CER y tcA3500 terminan
+    ese día.
+
+    años: Integer o Float, opcional.
+    Descripción: Es el plazo máximo de los vencimientos, en años. Por defecto
+    es 10.
+
+    semilla: Integer, opcional.
+    Descripción: Es la semilla del generador de números aleatorios. Con la
+    misma semilla y los mismos argumentos se obtiene el mismo mercado.
+
+    años_historia: Integer, opcional.
+    Descripción: Es la cantidad de años de las series CER y tcA3500 antes de
+    'fecha1'. Por defecto es 3.
+
+    RESULTADO
+    -------
+    mercado: MarketSnapshot.
+    Descripción: Es la foto del mercado, con bonos, curvas, series y REM.
+
+    """
+    import numpy as np
+    import pandas as pd
+    from datetime import datetime
+    from mercado import MarketSnapshot
+
+    generador=np.random.default_rng(semilla)
+    hoy=pd.Timestamp(datetime.strptime(fecha1,'%d-%m-%y'))
+
+    serie_cer,serie_tca3500=_series(generador,hoy,años_historia)
+    bonos=_bonos(generador,n_tickets,hoy,años,serie_cer.iloc[-1,0],
+                 serie_tca3500.iloc[-1,0])
+    curvas=_curvas(generador,bonos,hoy)
+
+    return MarketSnapshot(bonos,curvas,fecha=fecha1,serie_cer=serie_cer,
+                          serie_tca3500=serie_tca3500,rem=_rem(hoy))
+
+
+def historia_sintetica(n_tickets=60,fecha1='16-10-26',n_fechas=20,años=10,semilla=0):
+    """
+    Genera el mercado sintético de 'fecha1' (ver 'mercado_sintetico') y las
+    curvas de los 'n_fechas' días hábiles que terminan en 'fecha1'. Hacia
+    atrás, el nivel de las curvas sigue un camino aleatorio y el precio de
+    cada bono cambia con su curva.
+
+    PARAMETROS
+    ----------
+    n_fechas: Integer, opcional.
+    Descripción: Es la cantidad de fechas (días hábiles) con curvas. Por
+    defecto es 20.
+
+    (El resto de los parámetros se describe en 'mercado_sintetico'.)
+
+    RESULTADO
+    -------
+    mercado: MarketSnapshot.
+    Descripción: Es la foto del mercado de 'fecha1'.
+
+    curvas: diccionario.
+    Descripción: Tiene la fecha de cada pestaña (por ejemplo, '17-01-23') como
+    clave y, como valor, el diccionario de curvas de esa fecha, de la más
+    antigua a 'fecha1'.
+
+    """
+    import numpy as np
+    import pandas as pd
+    from datetime import datetime
+
+    hoy=pd.Timestamp(datetime.strptime(fecha1,'%d-%m-%y'))
+    dias=pd.bdate_range(end=hoy,periods=n_fechas)
+    años_historia=max(3,int(np.ceil((hoy-dias[0]).days/365))+2)
+    mercado=mercado_sintetico(n_tickets,fecha1,años,semilla,años_historia)
+
+    # Las fechas anteriores usan un generador propio, de modo que 'fecha1'
+    # coincide con 'mercado_sintetico' con la misma semilla.
+    generador=np.random.default_rng([semilla,1])
+    desplazamientos=np.concatenate([np.cumsum(generador.normal(0,0.001,n_fechas-1))[::-1],
+                                    [0.]])
+    vencimientos=pd.to_datetime(mercado.bonos.f_vencimiento)
+    curvas={}
+    for dia,desplazamiento in zip(dias[:-1],desplazamientos[:-1]):
+        # El precio cambia por la variación de la TIR durante el plazo al
+        # vencimiento (que se aproxima con la DM).
+        dm=np.maximum((vencimientos-dia).dt.days/365*0.9,0.05)
+        bonos=mercado.bonos.assign(
+            precio=(mercado.bonos.precio*np.exp(-dm*desplazamiento)).round(2))
+        curvas[dia.strftime('%d-%m-%y')]=_curvas(generador,bonos,dia,desplazamiento)
+    curvas[fecha1]=mercado.curvas
+
+    return mercado,curvas
+
+
+def escribir_mercado(directorio='.',n_tickets=60,fecha1='16-10-26',n_fechas=20,años=10,
+                     semilla=0,formatos=('xlsx','parquet')):
+    """
+    Escribe un mercado sintético (ver 'historia_sintetica') con la estructura
+    de los archivos reales, para correr toda la librería (por ejemplo,
+    'backtest_rt' o 'MarketSnapshot.cargar') con muchos bonos y fechas:
+
+    - 'Bonoscaracteristicas.xlsx', con los precios de 'fecha1'.
+    - 'Bonoscurvas.xlsx', con las pestañas '{fecha} CER', 'Pesos', 'DL' y 'USD'
+      de cada fecha.
+    - 'Serie CER.xlsx' y 'A3500.xlsx', con las series diarias.
+    - 'REM.xlsx', con la pestaña 'Resultados TOP 10' de las tasas badlar.
+
+    En formato Parquet se escriben las mismas tablas en la carpeta 'parquet':
+    'bonos', 'curvas' (todas las fechas y tipos en una sola tabla), 'serie_cer',
+    'a3500' y 'rem'. Se leen con 'cargar_parquet'.
+
+    PARAMETROS
+    ----------
+    directorio: String, opcional.
+    Descripción: Es la carpeta donde se escriben los archivos. Por defecto es
+    la carpeta actual.
+
+    formatos: lista de Strings, opcional.
+    Descripción: Son los formatos a escribir: 'xlsx' y/o 'parquet'.
+
+    (El resto de los parámetros se describe en 'historia_sintetica'.)
+
+    RESULTADO
+    -------
+    directorio: String.
+    Descripción: Es la carpeta donde se escribieron los archivos.
+
+    """
+    import os
+    import pandas as pd
+
+    mercado,curvas=historia_sintetica(n_tickets,fecha1,n_fechas,años,semilla)
+    os.makedirs(directorio,exist_ok=True)
+
+    if 'xlsx' in formatos:
+        mercado.bonos.reset_index().to_excel(f'{directorio}/Bonoscaracteristicas.xlsx',
+                                             index=False)
+        with pd.ExcelWriter(f'{directorio}/Bonoscurvas.xlsx') as libro:
+            for fecha,curvas_fecha in curvas.items():
+                for tipo,curva in curvas_fecha.items():
+                    curva.to_excel(libro,sheet_name=f'{fecha} {tipo}',index=False)
+        mercado.serie_cer.reset_index().to_excel(f'{directorio}/Serie CER.xlsx',index=False)
+        mercado.serie_tca3500.reset_index().to_excel(f'{directorio}/A3500.xlsx',index=False)
+        # La tabla del REM empieza en la fila 32, columna B, como en el archivo
+        # del BCRA.
+        with pd.ExcelWriter(f'{directorio}/REM.xlsx') as libro:
+            pd.DataFrame({'REM':['Relevamiento de Expectativas de Mercado (sintético)']}
+                         ).to_excel(libro,sheet_name='Resultados TOP 10',index=False,
+                                    header=False)
+            mercado.rem.to_excel(libro,sheet_name='Resultados TOP 10',index=False,
+                                 startrow=31,startcol=1)
+
+    if 'parquet' in formatos:
+        carpeta=f'{directorio}/parquet'
+        os.makedirs(carpeta,exist_ok=True)
+        mercado.bonos.reset_index().to_parquet(f'{carpeta}/bonos.parquet')
+        pd.concat([curva.assign(fecha=fecha,tipo=tipo)
+                   for fecha,curvas_fecha in curvas.items()
+                   for tipo,curva in curvas_fecha.items()],ignore_index=True
+                  ).to_parquet(f'{carpeta}/curvas.parquet')
+        mercado.serie_cer.reset_index().to_parquet(f'{carpeta}/serie_cer.parquet')
+        mercado.serie_tca3500.reset_index().to_parquet(f'{carpeta}/a3500.parquet')
+        mercado.rem.astype({'Período':str}).to_parquet(f'{carpeta}/rem.parquet')
+
+    return directorio
+
+
+def cargar_parquet(fecha1,directorio='.'):
+    """
+    Lee el mercado de una fecha de los archivos Parquet de 'escribir_mercado'.
+
+    PARAMETROS
+    ----------
+    fecha1: String, obligatorio.
+    Descripción: Es la fecha de las curvas, por ejemplo, '17-01-23'.
+
+    directorio: String, opcional.
+    Descripción: Es la carpeta donde se escribieron los archivos (la que
+    contiene la carpeta 'parquet').
+
+    RESULTADO
+    -------
+    mercado: MarketSnapshot.
+    Descripción: Es la foto del mercado, igual a la de 'MarketSnapshot.cargar'
+    con los libros de excel.
+
+    """
+    import pandas as pd
+    from mercado import MarketSnapshot
+
+    carpeta=f'{directorio}/parquet'
+    bonos=pd.read_parquet(f'{carpeta}/bonos.parquet').set_index('Ticket')
+    curvas=pd.read_parquet(f'{carpeta}/curvas.parquet',filters=[('fecha','==',fecha1)])
+    if curvas.empty:
+        raise KeyError(f'No hay curvas de la fecha {fecha1}.')
+    curvas={tipo:curvas.loc[curvas.tipo==tipo].drop(columns=['fecha','tipo']
+                                                     ).reset_index(drop=True)
+            for tipo in ['CER','Pesos','DL','USD']}
+    serie_cer=pd.read_parquet(f'{carpeta}/serie_cer.parquet').set_index('Fecha')
+    serie_tca3500=pd.read_parquet(f'{carpeta}/a3500.parquet').set_index('Fecha')
+    rem=pd.read_parquet(f'{carpeta}/rem.parquet')
+    rem['Período']=[pd.Timestamp(p).to_pydatetime() if i<6 else p
+                    for i,p in enumerate(rem['Período'])]
+
+    return MarketSnapshot(bonos,curvas,fecha=fecha1,serie_cer=serie_cer,
+                          serie_tca3500=serie_tca3500,rem=rem)
@@ -0,0 +1,121 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                      TABLAS MENSUALES CON ACCESO DIRECTO
+#
+#             Guarda las tablas mensuales de inflación y de dep/dev
+#          ('tabla_infla', 'tabla_dev', 'tabla_infla_esc' y 'tabla_dev_esc')
+#          en arrays contiguos indexados por la cantidad de meses desde
+#          enero de 1970. Así, la tasa mensual, la tasa acumulada, y los
+#          días de cualquier mes se obtienen con una resta y un acceso al
+#          array, en lugar de filtrar el DataFrame por año y mes.
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+
+class TablaMensual:
+    """
+    Es una tabla mensual (tasa del mes y tasa acumulada) donde el mes 'm' ocupa
+    la posición m-mes_inicial de cada array, con 'm' contado en meses desde
+    enero de 1970. Se construye con 'TablaMensual.desde_tabla', o pidiendo
+    'mensual=True' a las funciones que generan las tablas.
+
+    PARAMETROS
+    ----------
+    mes_inicial: Integer.
+    Descripción: Es el primer mes de la tabla, en meses desde enero de 1970.
+
+    tasas: array de Floats.
+    Descripción: Es la tasa de cada mes.
+
+    acumuladas: array de Floats.
+    Descripción: Es la tasa acumulada hasta cada mes.
+
+    dias: array de Integers.
+    Descripción: Es la cantidad de días de cada mes, según el día de la fecha
+    de la tabla (el último del mes).
+
+    """
+
+    def __init__(self,mes_inicial,tasas,acumuladas,dias):
+        self.mes_inicial=int(mes_inicial)
+        self.tasas=tasas
+        self.acumuladas=acumuladas
+        self.dias=dias
+
+    @classmethod
+    def desde_tabla(cls,tabla):
+        """
+        Construye la tabla a partir de un DataFrame con el último día de cada
+        mes como índice, la tasa mensual en la primera columna, y la tasa acu-
+        mulada en la última. Los meses que falten quedan con tasas NaN.
+
+        """
+        import numpy as np
+
+        fin_mes=np.asarray(tabla.index,dtype='datetime64[D]')
+        meses=fin_mes.astype('datetime64[M]')
+        numeros=meses.astype(int)
+
+        mes_inicial=numeros.min()
+        cantidad=numeros.max()-mes_inicial+1
+        posicion=numeros-mes_inicial
+
+        tasas=np.full(cantidad,np.nan)
+        acumuladas=np.full(cantidad,np.nan)
+        tasas[posicion]=np.asarray(tabla.iloc[:,0],dtype=float)
+        acumuladas[posicion]=np.asarray(tabla.iloc[:,-1],dtype=float)
+
+        # Días de calendario de cada mes, reemplazados por los de la tabla.
+        todos=np.arange(mes_inicial,mes_inicial+cantidad).astype('datetime64[M]')
+        dias=((todos+1).astype('datetime64[D]')-todos.astype('datetime64[D]')).astype(int)
+        dias[posicion]=(fin_mes-meses.astype('datetime64[D]')).astype(int)+1
+
+        return cls(mes_inicial,tasas,acumuladas,dias)
+
+    def __len__(self):
+        return self.tasas.size
+
+    @property
+    def meses(self):
+        """
+        Devuelve los meses de la tabla como datetime64[M].
+
+        """
+        import numpy as np
+
+        return np.arange(self.mes_inicial,self.mes_inicial+len(self)).astype('datetime64[M]')
+
+    def posicion(self,fechas):
+        """
+        Devuelve la posición en los arrays del mes de cada fecha.
+
+        """
+        import numpy as np
+
+        posicion=np.asarray(fechas,dtype='datetime64[M]').astype(int)-self.mes_inicial
+        if (posicion<0).any() or (posicion>=len(self)).any():
+            raise ValueError('Hay fechas fuera del período de la tabla mensual.')
+
+        return posicion
+
+    def tasa(self,fechas):
+        """
+        Devuelve la tasa del mes de cada fecha.
+
+        """
+        return self.tasas[self.posicion(fechas)]
+
+    def acumulada(self,fechas):
+        """
+        Devuelve la tasa acumulada hasta el mes de cada fecha.
+
+        """
+        return self.acumuladas[self.posicion(fechas)]
+
+    def dias_mes(self,fechas):
+        """
+        Devuelve la cantidad de días del mes de cada fecha.
+
+        """
+        return self.dias[self.posicion(fechas)]
@@ -0,0 +1,44 @@
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+#                    PRESUPUESTO DE TIEMPO DE IMPORTACION
+#
+#             Corre las comprobaciones de 'benchmarks/importacion.py' con
+#          pytest: importar la librería cabe en el presupuesto de tiempo y
+#          no importa paquetes pesados (matplotlib, statsmodels, patsy ni
+#                                     scipy).
+#
+#          Uso: python -m pytest tests
+#
+# ----------------------------------------------------------------------------
+# ----------------------------------------------------------------------------
+
+import os
+import subprocess
+import sys
+
+RAIZ=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,os.path.join(RAIZ,'benchmarks'))
+
+import importacion
+
+
+def test_presupuesto_de_importacion():
+    tiempos,_=importacion.medir_importacion()
+    propios=sum(tiempos.get(m,0) for m in importacion.MODULOS)/1000
+
+    assert propios<=importacion.PRESUPUESTO_MS, \
+        f'La importación tarda {propios:.1f} ms, más que el presupuesto.'
+
+
+def test_funciones_no_importa_paquetes_pesados():
+    codigo=(f'import sys; sys.path.insert(0,{RAIZ!r}); import funciones; '
+            f'print(sorted({{m.split(".")[0] for m in sys.modules}} & '
+            f'{set(importacion.PESADOS)!r}))')
+    salida=subprocess.run([sys.executable,'-c',codigo],capture_output=True,text=True,
+                          check=True).stdout
+
+    assert salida.strip()=='[]', f'Se importan paquetes pesados: {salida.strip()}.'
+
+
+def test_calculo_sin_imports_de_terceros():
+    assert importacion.revisar_fuentes()==[]